@@ -7,13 +7,17 @@ based on a defined DataModel.
 
 Key Features:
 - Iterates through a specified directory for .zip files containing 3GPP documents.
-- Extracts .doc/.docx files from zip archives.
-- Loads document content and checks against a token limit (default 65,536 tokens).
+- Reads .doc/.docx files from zip archives in memory (or extracts them to temp dirs).
+- Prunes boilerplate (copyright, ToC, revision history, ...) to cut LLM input tokens.
+- Loads document content and checks against a token limit (default 65,536 tokens); larger
+  documents are split into chunks, extracted in parallel and merged (map-reduce).
 - Uses DeepSeek LLM (reasoner for main task, chat for formatting) to analyze content and extract structured data.
 - Handles JSON formatting and validation, with fallback mechanisms for malformed output.
 - Converts local file paths to corresponding 3GPP FTP URLs.
-- Supports concurrent processing using ThreadPoolExecutor.
-- Tracks processed files to enable resuming operations.
+- Supports concurrent processing using ThreadPoolExecutor, an asyncio engine, or a staged
+  pipeline that parses in a process pool and calls the LLM from a separate stage.
+- Tracks every document of every ZIP in a SQLite ledger so re-runs only redo what failed.
+- Caches LLM extraction results on disk, keyed by document text, schema and model.
 - Exports extracted data to JSON files.
 
 Usage:
@@ -25,106 +29,360 @@ import os
 import zipfile
 import tempfile
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import multiprocessing
+import threading
 from llama_index.llms.deepseek import DeepSeek
 from DataModel.datamodel import DataModel, DataModelEncoder
 from langchain_community.document_loaders import UnstructuredWordDocumentLoader
+from unstructured.partition.docx import partition_docx
 import json
 from dotenv import load_dotenv
 import time
-from utils.utils import setup_logging
-from typing import Union, Dict, Any
+from utils.utils import setup_logging, split_document_by_tokens, fingerprint_bytes, fingerprint_file
+from utils.llm_cache import LLMResponseCache, make_cache_key
+from utils.text_cache import ExtractedTextCache
+from utils.rate_limit import RateBudget, AIMDController, is_rate_limit_error
+from utils.pipeline import Stage, StagedPipeline
+from utils.ledger import IngestionLedger, DONE, FAILED, SKIPPED
+from utils.docx_text import extract_docx_text
+from utils.merge import merge_extractions
+from utils.boilerplate import BoilerplatePruner
+from utils.json_fix import repair_json, coerce_to_schema, is_empty_extraction, FallbackStats
+from typing import Union, Dict, Any, List, NamedTuple, Optional, Tuple, Callable
 import tiktoken
 import shutil
 import re
+import asyncio
+import atexit
+import io
 
 
 
 load_dotenv()
 logger = setup_logging()
-primary_llm = DeepSeek(model="deepseek-reasoner")
-formatter_llm = DeepSeek(model="deepseek-chat")
+PRIMARY_MODEL = "deepseek-reasoner"
+FORMATTER_MODEL = "deepseek-chat"
+primary_llm = DeepSeek(model=PRIMARY_MODEL)
+formatter_llm = DeepSeek(model=FORMATTER_MODEL)
 # sllm = llm.as_structured_llm(DataModel)
-PROCESSED_FILES_PATH = "processed_files.json"
-
-def load_processed_files() -> set:
-    if not os.path.exists(PROCESSED_FILES_PATH):
-        return set()
-    with open(PROCESSED_FILES_PATH, "r") as f:
-        return set(json.load(f))
-
-def save_processed_file(file_path: Path):
-    processed = load_processed_files()
-    processed.add(str(file_path.resolve()))
-    with open(PROCESSED_FILES_PATH, "w") as f:
-        json.dump(list(processed), f, indent=4)
-
-def safe_complete(data: str) -> Union[Dict[str, Any], None]:
-    try:
-        # First attempt with structured LLM
-        sllm = primary_llm.as_structured_llm(DataModel)
-        response = sllm.complete(data)
-        return response
-    except Exception as e:
-        logger.warning(f"Primary LLM structured output failed: {e}")
-        
-        try:
-            # Create a more explicit formatting prompt with clear JSON structure
-            reasoner_prompt = f"""
+PROCESSED_FILES_PATH = "processed_files.json"  # legacy ZIP-level tracking, imported into the ledger
+LEDGER_PATH = "ingestion_ledger.db"
+
+# Read ZIP members into memory and parse .docx from the bytes; only legacy .doc
+# touches disk, through one reused scratch dir per worker. False restores the
+# old one-temp-dir-per-document extraction.
+IN_MEMORY_ZIP = True
+
+# "unstructured" (UnstructuredWordDocumentLoader / partition_docx) or "native"
+# (streaming extractor in utils/docx_text.py). Legacy .doc always uses Unstructured.
+DOCX_EXTRACTOR = "unstructured"
+_scratch = threading.local()
+
+# Extracted text (and its token count) keyed by a fingerprint of the whole Word
+# file plus the extractor, so re-tokenizing, re-chunking or re-running extraction
+# with a new prompt never parses the same document again. Bump TEXT_CACHE_VERSION
+# when an extractor's output changes for the same file.
+TEXT_CACHE = True
+TEXT_CACHE_DIR = "text_cache"
+TEXT_CACHE_MAX_BYTES = 5 * 1024**3
+TEXT_CACHE_VERSION = 1
+text_cache = ExtractedTextCache(TEXT_CACHE_DIR, max_bytes=TEXT_CACHE_MAX_BYTES)
+
+# Extraction results keyed by (document text, DataModel schema, model name), so a
+# re-run only pays for documents whose text or the schema actually changed.
+LLM_CACHE_DIR = "llm_cache"
+LLM_CACHE_MAX_BYTES = 2 * 1024**3
+LLM_CACHE_MAX_AGE_DAYS = 90
+DATA_MODEL_SCHEMA = DataModel.model_json_schema()
+llm_cache = LLMResponseCache(LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, max_age_days=LLM_CACHE_MAX_AGE_DAYS)
+
+# Provider budget for the async extraction mode. Token budget is charged with the
+# document's count_tokens() result plus an estimate of the completion size.
+DEEPSEEK_REQUESTS_PER_MINUTE = 600
+DEEPSEEK_TOKENS_PER_MINUTE = 4_000_000
+EXPECTED_OUTPUT_TOKENS = 4000
+RATE_LIMIT_MAX_RETRIES = 6
+
+# Documents over max_tokens (session notes, Feature Lead summaries) are split into
+# token-bounded chunks that are extracted in parallel and merged, instead of being
+# skipped. Each chunk is prefixed with the start of the document so the LLM still
+# sees the tdoc number, title and source on every chunk.
+CHUNK_OVERSIZED = True
+CHUNK_TOKENS = 32000
+CHUNK_OVERLAP_TOKENS = 500
+CHUNK_HEADER_CHARS = 2000
+MAX_CHUNKS = 32
+CHUNK_WORKERS = 8
+
+# Rule-based removal of cover-page copyright, foreword, ToC, revision history and
+# repeated headers, and compression of long pasted spec excerpts, before the text
+# is counted and sent to the LLM. Tune or disable single rules via BOILERPLATE_RULES
+# (see utils/boilerplate.DEFAULT_RULES).
+PRUNE_BOILERPLATE = True
+BOILERPLATE_RULES = {}
+boilerplate_pruner = BoilerplatePruner(BOILERPLATE_RULES)
+
+# Which fallback tier of safe_complete produced each result (structured output,
+# plain reasoner JSON, local repair, formatter LLM), with cumulative latency per tier.
+fallback_stats = FallbackStats()
+
+def open_ledger() -> IngestionLedger:
+    # processed_files.json is only read once, to seed a fresh ledger with the ZIPs it lists
+    # With chunking on, documents skipped earlier for size get their turn
+    return IngestionLedger(LEDGER_PATH, legacy_json_path=PROCESSED_FILES_PATH, retry_skipped=CHUNK_OVERSIZED)
+
+def build_reasoner_prompt(data: str) -> str:
+    # Create a more explicit formatting prompt with clear JSON structure
+    return f"""
             Analyze this document and extract structured data according to the schema below.
             IMPORTANT: Ensure all JSON is properly formatted and all arrays are properly closed.
             
-            Schema: {json.dumps(DataModel.model_json_schema(), indent=2)}
+            Schema: {json.dumps(DATA_MODEL_SCHEMA, indent=2)}
             
             Document: {data}
             
             Return ONLY valid, complete JSON.
             """
-            
-            # Get raw completion from primary LLM
-            raw_response = primary_llm.complete(reasoner_prompt)
-            
-            # Extract JSON from the response (in case the LLM includes explanatory text)
-            json_match = re.search(r'``````|(\{[\s\S]*\})', raw_response.raw)
-            if json_match:
-                json_str = json_match.group(1) or json_match.group(2)
-            else:
-                json_str = raw_response
-            
-            # Clean up potential JSON issues
-            json_str = json_str.strip()
-            
-            # Attempt to validate and fix common JSON issues
-            try:
-                formatted_json = json.loads(json_str)
-                return {"raw": formatted_json}
-            except json.JSONDecodeError as json_err:
-                logger.warning(f"Initial JSON parsing failed: {json_err}")
-                
-                # Use formatter LLM as fallback for complex formatting issues
-                formatting_prompt = f"""
+
+def build_formatting_prompt(json_str: str) -> str:
+    return f"""
                 Fix this invalid JSON to strictly follow the schema:
-                {json.dumps(DataModel.model_json_schema(), indent=2)}
+                {json.dumps(DATA_MODEL_SCHEMA, indent=2)}
                 
                 Invalid JSON:
                 {json_str}
                 
                 Return ONLY the corrected JSON.
                 """
-                
-                formatted_json_str = formatter_llm.complete(formatting_prompt)
-                try:
-                    formatted_json = json.loads(formatted_json_str)
-                    return {"raw": formatted_json}
-                except json.JSONDecodeError as second_err:
-                    logger.error(f"Formatter failed to fix JSON: {second_err}")
-                    return None
+
+def extract_json_str(text: str) -> str:
+    # Extract JSON from the response (in case the LLM includes explanatory text or a code fence)
+    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)```|(\{[\s\S]*\})', text)
+    if json_match:
+        text = json_match.group(1) or json_match.group(2)
+    return text.strip()
+
+def parse_reasoner_json(json_str: str):
+    """
+    Parse reasoner output locally. Returns (tier, data) with tier "reasoner_json" when
+    it was valid JSON, "local_repair" when utils/json_fix had to fix it, or (None, None)
+    when only the formatter LLM can help. Either way the data is coerced to DataModel;
+    a result with nothing in any section (wrapper object, misnamed keys, truncated
+    output) counts as a failed parse.
+    """
+    try:
+        parsed = coerce_to_schema(json.loads(json_str), DataModel)
+        if not is_empty_extraction(parsed):
+            return "reasoner_json", parsed
+        logger.warning("Reasoner JSON has no items in any DataModel section")
+        return None, None
+    except json.JSONDecodeError as json_err:
+        logger.warning(f"Initial JSON parsing failed: {json_err}")
+    repaired = coerce_to_schema(repair_json(json_str), DataModel)
+    if is_empty_extraction(repaired):
+        return None, None
+    return "local_repair", repaired
+
+
+def parse_formatter_json(text: str) -> Union[Dict[str, Any], None]:
+    json_str = extract_json_str(text)
+    try:
+        parsed = coerce_to_schema(json.loads(json_str), DataModel)
+    except json.JSONDecodeError as err:
+        logger.warning(f"Formatter output is not valid JSON, repairing locally: {err}")
+        parsed = coerce_to_schema(repair_json(json_str), DataModel)
+    return None if is_empty_extraction(parsed) else parsed
+
+
+def safe_complete(data: str) -> Union[Dict[str, Any], None]:
+    start = time.monotonic()
+    try:
+        # First attempt with structured LLM
+        sllm = primary_llm.as_structured_llm(DataModel)
+        response = sllm.complete(data)
+        fallback_stats.record("structured", time.monotonic() - start)
+        return response
+    except Exception as e:
+        logger.warning(f"Primary LLM structured output failed: {e}")
+        
+        try:
+            # Get raw completion from primary LLM
+            raw_response = primary_llm.complete(build_reasoner_prompt(data))
+            json_str = extract_json_str(raw_response.text)
+            
+            # Parse, and if needed repair, locally before paying for another LLM call
+            tier, parsed = parse_reasoner_json(json_str)
+            if parsed is not None:
+                fallback_stats.record(tier, time.monotonic() - start)
+                return {"raw": parsed}
+
+            # Use formatter LLM only when local repair could not recover the JSON
+            formatted_response = formatter_llm.complete(build_formatting_prompt(json_str))
+            parsed = parse_formatter_json(formatted_response.text)
+            if parsed is not None:
+                fallback_stats.record("formatter_llm", time.monotonic() - start)
+                return {"raw": parsed}
+            logger.error("Formatter failed to fix JSON")
                     
         except Exception as formatter_err:
             logger.error(f"Formatter error: {formatter_err}")
+        fallback_stats.record("failed", time.monotonic() - start)
+        return None
+
+
+async def async_safe_complete(data: str) -> Union[Dict[str, Any], None]:
+    """Async twin of safe_complete. Rate-limit errors are re-raised so the caller can back off and retry."""
+    start = time.monotonic()
+    try:
+        sllm = primary_llm.as_structured_llm(DataModel)
+        response = await sllm.acomplete(data)
+        fallback_stats.record("structured", time.monotonic() - start)
+        return response
+    except Exception as e:
+        if is_rate_limit_error(e):
+            raise
+        logger.warning(f"Primary LLM structured output failed: {e}")
+
+        try:
+            raw_response = await primary_llm.acomplete(build_reasoner_prompt(data))
+            json_str = extract_json_str(raw_response.text)
+
+            tier, parsed = parse_reasoner_json(json_str)
+            if parsed is not None:
+                fallback_stats.record(tier, time.monotonic() - start)
+                return {"raw": parsed}
+
+            formatted_response = await formatter_llm.acomplete(build_formatting_prompt(json_str))
+            parsed = parse_formatter_json(formatted_response.text)
+            if parsed is not None:
+                fallback_stats.record("formatter_llm", time.monotonic() - start)
+                return {"raw": parsed}
+            logger.error("Formatter failed to fix JSON")
+
+        except Exception as formatter_err:
+            if is_rate_limit_error(formatter_err):
+                raise
+            logger.error(f"Formatter error: {formatter_err}")
+        fallback_stats.record("failed", time.monotonic() - start)
+        return None
+
+
+def response_to_dict(response) -> Dict[str, Any]:
+    # Structured responses carry a DataModel in .raw; the fallbacks return {"raw": dict}
+    raw = response["raw"] if isinstance(response, dict) else response.raw
+    return json.loads(json.dumps(raw, cls=DataModelEncoder))
+
+
+def cached_complete(data: str) -> Union[Dict[str, Any], None]:
+    """safe_complete behind the on-disk LLM cache; returns the extracted data as a plain dict."""
+    key = make_cache_key(data, DATA_MODEL_SCHEMA, PRIMARY_MODEL)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        logger.debug(f"LLM cache hit: {key}")
+        return cached
+
+    response = safe_complete(data)
+    if response is None:
+        return None
+
+    response_dict = response_to_dict(response)
+    if not is_empty_extraction(response_dict):  # an empty result is retried next run, not cached for 90 days
+        llm_cache.put(key, response_dict)
+    return response_dict
+
+
+async def async_cached_complete(data: str, token_count: int, budget: RateBudget,
+                                controller: AIMDController) -> Union[Dict[str, Any], None]:
+    """
+    async_safe_complete behind the LLM cache, paced by the request/token budget and
+    the adaptive concurrency limit. 429s shrink the limit and the call is retried.
+    """
+    key = make_cache_key(data, DATA_MODEL_SCHEMA, PRIMARY_MODEL)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        logger.debug(f"LLM cache hit: {key}")
+        return cached
+
+    for attempt in range(1, RATE_LIMIT_MAX_RETRIES + 1):
+        await budget.acquire(token_count + EXPECTED_OUTPUT_TOKENS)
+        await controller.acquire()
+        start = time.monotonic()
+        try:
+            response = await async_safe_complete(data)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                await controller.release()
+                raise
+            await controller.release(rate_limited=True)
+            delay = min(60, 2 ** attempt)
+            logger.warning(f"Rate limited (attempt {attempt}), concurrency now {controller.limit}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            continue
+        await controller.release(latency=time.monotonic() - start, token_count=token_count)
+
+        if response is None:
             return None
+        response_dict = response_to_dict(response)
+        if not is_empty_extraction(response_dict):
+            llm_cache.put(key, response_dict)
+        return response_dict
+
+    logger.error(f"Giving up after {RATE_LIMIT_MAX_RETRIES} rate-limited attempts")
+    return None
+
+
+def no_response_error(response_dict: Optional[Dict[str, Any]]) -> str:
+    # Both are recorded as FAILED, so the document is retried on the next run
+    return "no valid LLM response" if response_dict is None else "empty extraction"
+
+
+def build_chunk_inputs(content: str) -> List[str]:
+    chunks = split_document_by_tokens(content, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+    if len(chunks) > MAX_CHUNKS:
+        raise ValueError(f"Document needs {len(chunks)} chunks (limit {MAX_CHUNKS})")
+    header = content[:CHUNK_HEADER_CHARS]
+    return [
+        chunk if i == 0 else (
+            f"Beginning of the document (for identification only):\n{header}\n\n"
+            f"Part {i + 1} of {len(chunks)} of the document:\n{chunk}"
+        )
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def merge_chunk_results(partials: List[Optional[Dict[str, Any]]]) -> Union[Dict[str, Any], None]:
+    """
+    Merge the chunk extractions, or None if any chunk failed, so the document is
+    recorded as failed rather than done with parts missing. The chunks that did
+    succeed are in the LLM cache, so the retry only pays for the failed ones.
+    """
+    failed = sum(p is None for p in partials)
+    if failed:
+        logger.warning(f"{failed} of {len(partials)} chunks failed; the document will be retried")
+        return None
+    return merge_extractions(partials)
+
+
+def extract_chunked(content: str) -> Union[Dict[str, Any], None]:
+    """Map-reduce extraction for documents over the token limit: chunks in parallel, then merge."""
+    chunk_inputs = build_chunk_inputs(content)
+    logger.info(f"Extracting oversized document in {len(chunk_inputs)} chunks")
+    with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunk_inputs))) as executor:
+        partials = list(executor.map(cached_complete, chunk_inputs))
+    return merge_chunk_results(partials)
+
+
+async def async_extract_chunked(content: str, budget: RateBudget,
+                                controller: AIMDController) -> Union[Dict[str, Any], None]:
+    chunk_inputs = build_chunk_inputs(content)
+    logger.info(f"Extracting oversized document in {len(chunk_inputs)} chunks")
+    partials = await asyncio.gather(*(
+        async_cached_complete(chunk, count_tokens(chunk), budget, controller) for chunk in chunk_inputs
+    ))
+    return merge_chunk_results(partials)
+
 
-        
 def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
   
     try:
@@ -138,27 +396,117 @@ def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
         return int(words / 0.75)
 
 
-def doc_loader(file_path: Path, max_tokens: int = 65536):
-
-    logger.info(f"Loading document: {file_path}")
-    loader = UnstructuredWordDocumentLoader(str(file_path))
-    content = loader.load()[0].page_content
-    
-    # Count tokens
-    token_count = count_tokens(content)
+def prune_boilerplate(content: str, label, token_count: Optional[int] = None):
+    """Drop cover/copyright/ToC/history boilerplate; returns the pruned text and its token count."""
+    pruned, removed = boilerplate_pruner.prune(content)
+    tokens_before = token_count if token_count is not None else count_tokens(content)
+    tokens_after = count_tokens(pruned) if removed else tokens_before
+    boilerplate_pruner.record(tokens_before, tokens_after, removed)
+    if removed:
+        saved = tokens_before - tokens_after
+        logger.info(f"Pruned {saved} of {tokens_before} tokens ({saved / max(tokens_before, 1):.1%}) from {label}: {removed}")
+    return pruned, tokens_after
+
+
+def check_token_limit(content: str, label, max_tokens: int, token_count: Optional[int] = None):
+    if PRUNE_BOILERPLATE:
+        content, token_count = prune_boilerplate(content, label, token_count)
+    elif token_count is None:
+        # Count tokens
+        token_count = count_tokens(content)
     within_limit = token_count < max_tokens
     
     if not within_limit:
-        logger.warning(f"Document exceeds token limit: {file_path}, tokens: {token_count}")
+        logger.warning(f"Document exceeds token limit: {label}, tokens: {token_count}")
     
     return content, token_count, within_limit
 
 
+def text_cache_salt(name: str) -> str:
+    """Extractor identity mixed into the fingerprint, so switching DOCX_EXTRACTOR misses the cache."""
+    extractor = DOCX_EXTRACTOR if name.lower().endswith(".docx") else "unstructured"
+    return f"{extractor}:v{TEXT_CACHE_VERSION}"
+
+
+def cached_extract(key: str, label, extract: Callable[[], str]) -> Tuple[str, int]:
+    """Return (text, token_count) from the extracted-text cache, or run extract() and store it."""
+    if TEXT_CACHE:
+        cached = text_cache.get_text(key)
+        if cached is not None:
+            logger.debug(f"Extracted-text cache hit: {label}")
+            return cached
+    content = extract()
+    token_count = count_tokens(content)
+    if TEXT_CACHE:
+        text_cache.put_text(key, content, token_count)
+    return content, token_count
+
+
+def extract_text(file_path: Path) -> str:
+    if DOCX_EXTRACTOR == "native" and file_path.suffix.lower() == ".docx":
+        return extract_docx_text(str(file_path))
+    loader = UnstructuredWordDocumentLoader(str(file_path))
+    return loader.load()[0].page_content
+
+
+def doc_loader(file_path: Path, max_tokens: int = 65536):
+
+    logger.info(f"Loading document: {file_path}")
+    key = fingerprint_file(str(file_path), text_cache_salt(file_path.name))
+    content, token_count = cached_extract(key, file_path, lambda: extract_text(file_path))
+    return check_token_limit(content, file_path, max_tokens, token_count)
+
+
+def worker_scratch_dir() -> Path:
+    """One scratch directory per worker thread, reused for every legacy .doc it parses."""
+    scratch = getattr(_scratch, "path", None)
+    if scratch is None:
+        scratch = Path(tempfile.mkdtemp(prefix="3gpp_doc_"))
+        _scratch.path = scratch
+        atexit.register(shutil.rmtree, scratch, True)
+    return scratch
+
+
+def extract_text_from_bytes(name: str, data: bytes) -> str:
+    """
+    .docx is parsed straight from the bytes; legacy .doc needs a file on disk
+    for the LibreOffice conversion, so it goes through the worker's scratch dir.
+    """
+    if name.lower().endswith(".docx"):
+        if DOCX_EXTRACTOR == "native":
+            return extract_docx_text(data)
+        elements = partition_docx(file=io.BytesIO(data))
+        # Same joining as UnstructuredWordDocumentLoader in "single" mode
+        return "\n\n".join(str(element) for element in elements)
+
+    scratch_path = worker_scratch_dir() / Path(name).name
+    scratch_path.write_bytes(data)
+    try:
+        return extract_text(scratch_path)
+    finally:
+        scratch_path.unlink(missing_ok=True)
+
+
+def doc_loader_from_bytes(name: str, data: bytes, max_tokens: int = 65536):
+    """Parse a Word document held in memory, going through the extracted-text cache first."""
+    logger.info(f"Loading document from memory: {name}")
+    key = fingerprint_bytes(data, text_cache_salt(name))
+    content, token_count = cached_extract(key, name, lambda: extract_text_from_bytes(name, data))
+    return check_token_limit(content, name, max_tokens, token_count)
+
+
 def export_json(response, output_file_path: Path):
     logger.info(f"Exporting JSON to: {output_file_path}")
     with output_file_path.open("w") as f:
         json.dump(response, f, indent=4, cls=DataModelEncoder)
 
+def export_document_result(response_dict: Dict[str, Any], zip_url: str, token_count: int, output_file_path: Path):
+    for doc in response_dict.get("documents", []):
+        doc["source_path"] = zip_url
+        # Optionally add token count for reference
+        doc["token_count"] = token_count
+    export_json(response_dict, output_file_path)
+
 def convert_local_path_to_3gpp_url(local_path: Path) -> str:
     try:
         path_parts = local_path.resolve().parts
@@ -169,6 +517,56 @@ def convert_local_path_to_3gpp_url(local_path: Path) -> str:
         logger.warning(f"Path does not contain 'DATA': {local_path}")
         return str(local_path)
 
+class ZipMember(NamedTuple):
+    """A Word document inside a ZIP, either read into memory or extracted to a temp dir."""
+    name: str
+    data: Optional[bytes] = None
+    path: Optional[Path] = None
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+
+def is_doc_member(filename: str) -> bool:
+    if "__MACOSX" in filename or filename.startswith("._"):
+        return False
+    return filename.lower().endswith(('.doc', '.docx'))
+
+
+def read_doc_members_from_zip(zip_path: Path) -> List[ZipMember]:
+    """Read every .doc/.docx member into memory in one sequential pass over the archive."""
+    members = []
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for file_info in zip_ref.infolist():
+                if is_doc_member(file_info.filename):
+                    members.append(ZipMember(Path(file_info.filename).name, data=zip_ref.read(file_info)))
+    except zipfile.BadZipFile:
+        logger.warning(f"Bad zip file encountered: {zip_path}")
+    return members
+
+
+def open_zip_members(zip_path: Path) -> List[ZipMember]:
+    if IN_MEMORY_ZIP:
+        return read_doc_members_from_zip(zip_path)
+    extracted_paths, _ = extract_doc_files_from_zip(zip_path)
+    return [ZipMember(path.name, path=path) for path in extracted_paths]
+
+
+def load_zip_member(member: ZipMember, max_tokens: int = 65536):
+    if member.path is not None:
+        return doc_loader(member.path, max_tokens)
+    return doc_loader_from_bytes(member.name, member.data, max_tokens)
+
+
+def release_zip_member(member: ZipMember):
+    # Clean up the temporary directory for this document (temp-dir mode only)
+    if member.path is not None:
+        shutil.rmtree(member.path.parent, ignore_errors=True)
+        logger.info(f"Cleaned up temporary directory: {member.path.parent}")
+
+
 def extract_doc_files_from_zip(zip_path: Path):
     extracted_paths = []
     temp_dirs = []  # Keep track of temporary directories created
@@ -176,10 +574,7 @@ def extract_doc_files_from_zip(zip_path: Path):
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             for file_info in zip_ref.infolist():
-                if "__MACOSX" in file_info.filename or file_info.filename.startswith("._"):
-                        continue
-                    
-                if file_info.filename.lower().endswith(('.doc', '.docx')):
+                if is_doc_member(file_info.filename):
                     temp_dir = tempfile.mkdtemp()
                     temp_dirs.append(temp_dir)
                     extracted_path = zip_ref.extract(file_info, temp_dir)
@@ -189,64 +584,62 @@ def extract_doc_files_from_zip(zip_path: Path):
         
     return extracted_paths, temp_dirs
 
-def process_zip(zip_file: Path, output_directory: Path, processed_files: set, max_tokens: int = 65536):
+def process_zip(zip_file: Path, output_directory: Path, ledger: IngestionLedger, max_tokens: int = 65536):
     try:
-        if str(zip_file.resolve()) in processed_files:
+        if ledger.is_zip_done(zip_file):
             logger.info(f"Skipping already processed zip: {zip_file}")
             return
 
-        doc_files, temp_dirs = extract_doc_files_from_zip(zip_file)
-        if not doc_files:
+        members = open_zip_members(zip_file)
+        if not members:
             logger.warning(f"No .doc/.docx files found in: {zip_file}")
-            for temp_dir in temp_dirs:
-                shutil.rmtree(temp_dir, ignore_errors=True)
             return
 
         zip_url = convert_local_path_to_3gpp_url(zip_file)
-        successful_exports = 0
 
-        for doc_file in doc_files:
+        for member in members:
+            if ledger.is_done(zip_file, member.name):
+                logger.info(f"Skipping already processed document: {member.name} in {zip_file}")
+                release_zip_member(member)
+                continue
+
+            start = time.monotonic()
+            token_count = None
             try:
                 # Get content and check token count
-                content, token_count, within_limit = doc_loader(doc_file, max_tokens)
+                content, token_count, within_limit = load_zip_member(member, max_tokens)
                 
-                # Skip documents that exceed the token limit
-                if not within_limit:
-                    logger.info(f"Skipping document with {token_count} tokens (limit: {max_tokens}): {doc_file}")
+                # Skip documents that exceed the token limit, unless they can be chunked
+                if not within_limit and not CHUNK_OVERSIZED:
+                    logger.info(f"Skipping document with {token_count} tokens (limit: {max_tokens}): {member.name} in {zip_file}")
+                    ledger.record(zip_file, member.name, SKIPPED, token_count=token_count)
                     continue
 
-                # Process documents that are within the token limit
-                response = safe_complete(content)
+                response_dict = cached_complete(content) if within_limit else extract_chunked(content)
 
-                if response is None:
-                    logger.warning(f"No valid response for: {doc_file}")
+                if is_empty_extraction(response_dict):
+                    logger.warning(f"No valid response for: {member.name} in {zip_file}")
+                    ledger.record(zip_file, member.name, FAILED, token_count=token_count,
+                                  duration=time.monotonic() - start, error=no_response_error(response_dict))
                     continue
 
-                response_dict = json.loads(json.dumps(response.raw, cls=DataModelEncoder))
-
-                for doc in response_dict.get("documents", []):
-                    doc["source_path"] = zip_url
-                    # Optionally add token count for reference
-                    doc["token_count"] = token_count
-
-                output_file_path = output_directory / (doc_file.stem + ".json")
-                export_json(response_dict, output_file_path)
-                successful_exports += 1
+                output_file_path = output_directory / (member.stem + ".json")
+                export_document_result(response_dict, zip_url, token_count, output_file_path)
+                ledger.record(zip_file, member.name, DONE, token_count=token_count,
+                              duration=time.monotonic() - start, output_path=output_file_path)
 
             except Exception as e:
                 logger.error(f"Error processing document in {zip_file}: {e}", exc_info=True)
+                ledger.record(zip_file, member.name, FAILED, token_count=token_count,
+                              duration=time.monotonic() - start, error=str(e))
             finally:
-                # Clean up the temporary directory for this document
-                temp_dir = doc_file.parent
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                logger.info(f"Cleaned up temporary directory: {temp_dir}")
-
-        # Only mark the zip as processed if at least one file was successfully exported
-        if successful_exports > 0:
-            save_processed_file(zip_file)
+                release_zip_member(member)
+
+        # The zip is only done once every document in it is; failed ones are retried next run
+        if ledger.finish_zip(zip_file, [member.name for member in members]):
             logger.info(f"Finished processing zip: {zip_file}")
         else:
-            logger.warning(f"No successful exports from zip: {zip_file}")
+            logger.warning(f"Some documents failed in zip: {zip_file}")
 
     except Exception as e:
         logger.error(f"Error processing zip file {zip_file}: {e}", exc_info=True)
@@ -260,11 +653,11 @@ def list_zip_files(directory_path: Path):
 def process_files_in_directory(directory_path: Path, output_directory: Path, max_tokens: int = 65536, max_threads: int = 100):
     os.makedirs(output_directory, exist_ok=True)
     zip_files = list_zip_files(directory_path)
-    processed_files = load_processed_files()
+    ledger = open_ledger()
 
     with ThreadPoolExecutor(max_workers=max_threads) as executor:
         future_to_file = {
-            executor.submit(process_zip, zip_file, output_directory, processed_files, max_tokens): zip_file
+            executor.submit(process_zip, zip_file, output_directory, ledger, max_tokens): zip_file
             for zip_file in zip_files
         }
 
@@ -274,17 +667,244 @@ def process_files_in_directory(directory_path: Path, output_directory: Path, max
                 future.result()
             except Exception as e:
                 logger.error(f"Failed processing {file}: {e}")
+    logger.info(f"Ledger: {ledger.summary()}")
+
+async def process_zip_async(zip_file: Path, output_directory: Path, ledger: IngestionLedger, budget: RateBudget,
+                            controller: AIMDController, max_tokens: int = 65536):
+    try:
+        if ledger.is_zip_done(zip_file):
+            logger.info(f"Skipping already processed zip: {zip_file}")
+            return
+
+        # Unzip and Word parsing are blocking, keep them off the event loop
+        members = await asyncio.to_thread(open_zip_members, zip_file)
+        if not members:
+            logger.warning(f"No .doc/.docx files found in: {zip_file}")
+            return
+
+        zip_url = convert_local_path_to_3gpp_url(zip_file)
+
+        async def process_doc(member: ZipMember):
+            if ledger.is_done(zip_file, member.name):
+                release_zip_member(member)
+                return
+            start = time.monotonic()
+            token_count = None
+            try:
+                content, token_count, within_limit = await asyncio.to_thread(load_zip_member, member, max_tokens)
+                if not within_limit and not CHUNK_OVERSIZED:
+                    logger.info(f"Skipping document with {token_count} tokens (limit: {max_tokens}): {member.name} in {zip_file}")
+                    ledger.record(zip_file, member.name, SKIPPED, token_count=token_count)
+                    return
+
+                if within_limit:
+                    response_dict = await async_cached_complete(content, token_count, budget, controller)
+                else:
+                    response_dict = await async_extract_chunked(content, budget, controller)
+                if is_empty_extraction(response_dict):
+                    logger.warning(f"No valid response for: {member.name} in {zip_file}")
+                    ledger.record(zip_file, member.name, FAILED, token_count=token_count,
+                                  duration=time.monotonic() - start, error=no_response_error(response_dict))
+                    return
+
+                output_file_path = output_directory / (member.stem + ".json")
+                export_document_result(response_dict, zip_url, token_count, output_file_path)
+                ledger.record(zip_file, member.name, DONE, token_count=token_count,
+                              duration=time.monotonic() - start, output_path=output_file_path)
+            except Exception as e:
+                logger.error(f"Error processing document in {zip_file}: {e}", exc_info=True)
+                ledger.record(zip_file, member.name, FAILED, token_count=token_count,
+                              duration=time.monotonic() - start, error=str(e))
+            finally:
+                release_zip_member(member)
+
+        await asyncio.gather(*(process_doc(member) for member in members))
+
+        if ledger.finish_zip(zip_file, [member.name for member in members]):
+            logger.info(f"Finished processing zip: {zip_file}")
+        else:
+            logger.warning(f"Some documents failed in zip: {zip_file}")
+
+    except Exception as e:
+        logger.error(f"Error processing zip file {zip_file}: {e}", exc_info=True)
+
+
+async def process_files_in_directory_async(directory_path: Path, output_directory: Path, max_tokens: int = 65536,
+                                           max_concurrency: int = 64):
+    """
+    Asyncio extraction mode. Calls are admitted by a requests/min + tokens/min
+    budget, and the number in flight follows an AIMD limit that backs off on
+    429s and rising latency instead of a fixed pool of 100 threads.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    zip_files = list_zip_files(directory_path)
+    ledger = open_ledger()
+
+    budget = RateBudget(DEEPSEEK_REQUESTS_PER_MINUTE, DEEPSEEK_TOKENS_PER_MINUTE)
+    controller = AIMDController(initial=8, max_limit=max_concurrency)
+    # Bound how many ZIPs are unpacked ahead of the LLM stage
+    zip_slots = asyncio.Semaphore(max_concurrency)
+
+    async def run(zip_file: Path):
+        async with zip_slots:
+            await process_zip_async(zip_file, output_directory, ledger, budget, controller, max_tokens)
+
+    await asyncio.gather(*(run(zip_file) for zip_file in zip_files))
+    logger.info(
+        f"Async extraction finished: final concurrency {controller.limit}, "
+        f"{controller.rate_limited} rate-limited calls, {controller.slowdowns} latency back-offs"
+    )
+    logger.info(f"Ledger: {ledger.summary()}")
+
+def parse_zip(zip_file: Path, max_tokens: int = 65536, skip_members: frozenset = frozenset()):
+    """
+    Unzip and parse every Word document of a ZIP. Runs inside the staged pipeline's process pool.
+
+    Returns (all members, [(member, stem, content, token_count, error)]) for the members not in skip_members.
+    """
+    members = open_zip_members(zip_file)
+    parsed = []
+    for member in members:
+        try:
+            if member.name in skip_members:
+                continue
+            content, token_count, _ = load_zip_member(member, max_tokens)
+            parsed.append((member.name, member.stem, content, token_count, None))
+        except Exception as e:
+            logger.error(f"Error parsing document in {zip_file}: {e}", exc_info=True)
+            parsed.append((member.name, member.stem, None, None, str(e)))
+        finally:
+            release_zip_member(member)
+    return [member.name for member in members], parsed
+
+
+def process_files_staged(directory_path: Path, output_directory: Path, max_tokens: int = 65536,
+                         parse_workers: int = os.cpu_count() or 4, llm_workers: int = 64,
+                         export_workers: int = 2, queue_size: int = 200):
+    """
+    Staged ingestion: ZIP discovery -> parse (process pool) -> token filter -> LLM -> JSON export.
+
+    Stages are connected by bounded queues, each with its own worker count, so
+    Word parsing no longer competes for the GIL with threads waiting on the
+    network. Queue depths are logged periodically and summarised at the end.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    ledger = open_ledger()
+    # Per-ZIP bookkeeping for the export stage: (documents still in flight, all members of the zip)
+    zip_progress: Dict[Path, list] = {}
+    progress_lock = threading.Lock()
+
+    def finish_zip(zip_file: Path, members):
+        if ledger.finish_zip(zip_file, members):
+            logger.info(f"Finished processing zip: {zip_file}")
+        else:
+            logger.warning(f"Some documents failed in zip: {zip_file}")
+
+    def discover():
+        for zip_file in list_zip_files(directory_path):
+            if ledger.is_zip_done(zip_file):
+                logger.info(f"Skipping already processed zip: {zip_file}")
+                continue
+            yield zip_file
+
+    # spawn, not fork: the pool is started while pipeline threads are already running
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+
+        def parse_stage(zip_file: Path):
+            # Hand the already-done members to the worker so it doesn't parse them again
+            done_members = frozenset(ledger.done_members(zip_file))
+            members, parsed = pool.submit(parse_zip, zip_file, max_tokens, done_members).result()
+            if not members:
+                logger.warning(f"No .doc/.docx files found in: {zip_file}")
+                return []
+            return [(zip_file, members, parsed)]
+
+        def token_filter_stage(item):
+            zip_file, members, parsed = item
+            kept = []
+            for member, doc_name, content, token_count, error in parsed:
+                if error is not None:
+                    ledger.record(zip_file, member, FAILED, error=error)
+                    continue
+                if token_count >= max_tokens and not CHUNK_OVERSIZED:
+                    logger.info(f"Skipping document with {token_count} tokens (limit: {max_tokens}): {doc_name} in {zip_file}")
+                    ledger.record(zip_file, member, SKIPPED, token_count=token_count)
+                    continue
+                kept.append((zip_file, member, doc_name, content, token_count))
+            if kept:
+                with progress_lock:
+                    zip_progress[zip_file] = [len(kept), members]
+            else:
+                finish_zip(zip_file, members)
+            return kept
+
+        def llm_stage(item):
+            zip_file, member, doc_name, content, token_count = item
+            start = time.monotonic()
+            try:
+                response_dict = cached_complete(content) if token_count < max_tokens else extract_chunked(content)
+            except Exception as e:
+                logger.error(f"Error processing document {doc_name} in {zip_file}: {e}", exc_info=True)
+                response_dict = None
+            if is_empty_extraction(response_dict):
+                logger.warning(f"No valid response for: {doc_name} in {zip_file}")
+            return [(zip_file, member, doc_name, token_count, response_dict, time.monotonic() - start)]
+
+        def export_stage(item):
+            zip_file, member, doc_name, token_count, response_dict, duration = item
+            try:
+                if is_empty_extraction(response_dict):
+                    ledger.record(zip_file, member, FAILED, token_count=token_count, duration=duration,
+                                  error=no_response_error(response_dict))
+                else:
+                    zip_url = convert_local_path_to_3gpp_url(zip_file)
+                    output_file_path = output_directory / (doc_name + ".json")
+                    export_document_result(response_dict, zip_url, token_count, output_file_path)
+                    ledger.record(zip_file, member, DONE, token_count=token_count, duration=duration,
+                                  output_path=output_file_path)
+            except Exception as e:
+                ledger.record(zip_file, member, FAILED, token_count=token_count, duration=duration, error=str(e))
+                raise
+            finally:
+                with progress_lock:
+                    progress = zip_progress[zip_file]
+                    progress[0] -= 1
+                    zip_done, members = progress[0] == 0, progress[1]
+                    if zip_done:
+                        del zip_progress[zip_file]
+                if zip_done:
+                    finish_zip(zip_file, members)
+
+        pipeline = StagedPipeline([
+            Stage("parse", parse_stage, workers=parse_workers, queue_size=queue_size),
+            Stage("token_filter", token_filter_stage, workers=1, queue_size=queue_size),
+            Stage("llm", llm_stage, workers=llm_workers, queue_size=queue_size),
+            Stage("export", export_stage, workers=export_workers, queue_size=queue_size),
+        ], logger)
+        pipeline.run(discover())
+    logger.info(f"Ledger: {ledger.summary()}")
+
 
 def main():
     start = time.time()
     directory_path = Path("/git_folder/udbhav/DATA/tsg_ran/WG1_RL1/TSGR1_118/Docs")
     output_directory = Path("/git_folder/udbhav/code/Graph-3GPP/Results/TSG_118/Docs")
     max_tokens = 65000  # Set your token limit here
+    mode = "threads"  # "threads", "async" (rate-limit-aware asyncio engine) or "staged" (process-pool parsing)
 
     logger.info("Starting zip file processing.")
-    process_files_in_directory(directory_path, output_directory, max_tokens)
+    if mode == "async":
+        asyncio.run(process_files_in_directory_async(directory_path, output_directory, max_tokens))
+    elif mode == "staged":
+        process_files_staged(directory_path, output_directory, max_tokens)
+    else:
+        process_files_in_directory(directory_path, output_directory, max_tokens)
 
     end = time.time()
+    llm_cache.report(logger)
+    text_cache.report(logger)
+    boilerplate_pruner.report(logger)
+    fallback_stats.report(logger)
     logger.info(f"Total time taken: {end - start:.2f} seconds.")
     logger.info("Zip file processing completed.")
 
@@ -0,0 +1,115 @@
+"""
+Benchmark: native .docx extractor vs. Unstructured
+==================================================
+
+Reads the .docx members of a sample of ZIPs from one meeting directory and
+extracts each with both Unstructured (partition_docx, as used by
+Process_3GPP_Docs.py) and utils/docx_text.extract_docx_text.
+
+Reports total and per-document time for each extractor, and text
+equivalence as the word-level similarity (difflib ratio over the
+whitespace-split word sequence), listing the least similar documents so
+differences can be inspected by hand.
+
+Usage:
+    python benchmark_docx_extractors.py /path/to/DATA/tsg_ran/WG1_RL1/TSGR1_118/Docs [sample_size]
+"""
+
+import io
+import sys
+import time
+import random
+import zipfile
+import difflib
+import statistics
+from pathlib import Path
+
+from utils.docx_text import extract_docx_text
+
+DEFAULT_SAMPLE_SIZE = 200
+WORST_TO_SHOW = 10
+
+
+def load_sample(directory: Path, sample_size: int, seed: int = 0):
+    zip_files = sorted(p for p in directory.iterdir() if p.suffix == ".zip")
+    random.Random(seed).shuffle(zip_files)
+    sample = []
+    for zip_path in zip_files:
+        try:
+            with zipfile.ZipFile(zip_path) as z:
+                for info in z.infolist():
+                    name = info.filename
+                    if "__MACOSX" in name or name.startswith("._") or not name.lower().endswith(".docx"):
+                        continue
+                    sample.append((f"{zip_path.name}/{name}", z.read(info)))
+        except zipfile.BadZipFile:
+            continue
+        if len(sample) >= sample_size:
+            break
+    return sample[:sample_size]
+
+
+def unstructured_text(data: bytes) -> str:
+    from unstructured.partition.docx import partition_docx
+    return "\n\n".join(str(el) for el in partition_docx(file=io.BytesIO(data)))
+
+
+def word_similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a.split(), b.split(), autojunk=False).ratio()
+
+
+def timed(func, data):
+    start = time.perf_counter()
+    try:
+        return func(data), time.perf_counter() - start
+    except Exception as e:
+        print(f"  extractor error: {e}")
+        return None, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    directory = Path(sys.argv[1])
+    sample_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SAMPLE_SIZE
+
+    # Time the import separately: it is paid once per worker process in the pipeline
+    start = time.perf_counter()
+    import unstructured.partition.docx  # noqa: F401
+    import_seconds = time.perf_counter() - start
+
+    sample = load_sample(directory, sample_size)
+    print(f"Benchmarking {len(sample)} .docx documents from {directory}")
+
+    rows = []
+    for name, data in sample:
+        ref, ref_t = timed(unstructured_text, data)
+        fast, fast_t = timed(extract_docx_text, data)
+        if ref is None or fast is None:
+            continue
+        rows.append((name, ref_t, fast_t, word_similarity(ref, fast), len(ref.split()), len(fast.split())))
+
+    if not rows:
+        print("No documents could be extracted by both extractors.")
+        return
+
+    ref_total = sum(r[1] for r in rows)
+    fast_total = sum(r[2] for r in rows)
+    similarities = [r[3] for r in rows]
+
+    print(f"\nUnstructured import time:  {import_seconds:.2f}s (one-off)")
+    print(f"Unstructured total:        {ref_total:.2f}s  ({ref_total / len(rows) * 1000:.1f} ms/doc)")
+    print(f"Native total:              {fast_total:.2f}s  ({fast_total / len(rows) * 1000:.1f} ms/doc)")
+    print(f"Speed-up:                  {ref_total / fast_total if fast_total else float('inf'):.1f}x")
+    print(f"Word similarity mean:      {statistics.mean(similarities):.4f}")
+    print(f"Word similarity median:    {statistics.median(similarities):.4f}")
+    print(f"Documents >= 0.99 similar: {sum(s >= 0.99 for s in similarities)}/{len(rows)}")
+
+    print(f"\nLeast similar {WORST_TO_SHOW}:")
+    for name, _, _, sim, ref_words, fast_words in sorted(rows, key=lambda r: r[3])[:WORST_TO_SHOW]:
+        print(f"  {sim:.3f}  words unstructured={ref_words:<6} native={fast_words:<6} {name}")
+
+
+if __name__ == "__main__":
+    main()
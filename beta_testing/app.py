@@ -1,20 +1,44 @@
 from typing import Any
-from neo4j import GraphDatabase
 import pandas as pd
 import requests
 import os
-import zipfile
+import sys
 import shutil
 import json
 import gradio as gr
 from datetime import datetime
 import urllib.parse
 import logging
+import time
+import tempfile
 from spire.doc import Document, FileFormat
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_client import get_client
+from bm25_search import get_engine
+from utils.query_cache import QueryCache
+from utils.doc_store import DocumentStore
+
 
 FEEDBACK_FILE = "feedback_log.csv"
 LOG_FILE = "beta_testing.log"
+# "neo4j": the graph server (search_client.py); "bm25": embedded index over the generated CSVs (bm25_search.py)
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "neo4j")
+# Ranked documents and generated answers per (normalized query, meeting), dropped when the graph version changes
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 256))
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", 3600))
+GRAPH_VERSION_CHECK_SECONDS = 30
+# Sanitized documents of downloaded ZIPs, linked into the uploads dir instead of refetched per query
+DOC_STORE_DIR = os.environ.get("DOC_STORE_DIR", "doc_store")
+DOC_STORE_MAX_GB = float(os.environ.get("DOC_STORE_MAX_GB", 10))
+DOC_STORE_REVALIDATE_HOURS = float(os.environ.get("DOC_STORE_REVALIDATE_HOURS", 24))
+# By default documents go straight into UPLOADS_ROOT, which the generator reads, and searches run one at a
+# time. With GENERATOR_SCOPED_UPLOADS=1 (the generator reads the payload's upload_dir) each request gets its
+# own workspace under UPLOADS_ROOT and up to SEARCH_CONCURRENCY searches run in parallel
+UPLOADS_ROOT = os.environ.get("UPLOADS_ROOT", "/git_folder/udbhav/code/RAG/uploads")
+GENERATOR_SCOPED_UPLOADS = os.environ.get("GENERATOR_SCOPED_UPLOADS", "0") == "1"
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", 4)) if GENERATOR_SCOPED_UPLOADS else 1
+RESULTS_CSV = "search_results.csv"
 
 logging.basicConfig(
     filename=LOG_FILE,
@@ -29,6 +53,90 @@ formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 console.setFormatter(formatter)
 logging.getLogger().addHandler(console)
 
+query_cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+doc_store = DocumentStore(DOC_STORE_DIR, max_bytes=int(DOC_STORE_MAX_GB * 1024**3),
+                          revalidate_seconds=DOC_STORE_REVALIDATE_HOURS * 3600)
+_version_checked_at = 0.0
+
+
+def get_searcher():
+    """Shared pooled driver (search_client.py), or the in-process BM25 index with the same ranking"""
+    return get_engine() if SEARCH_BACKEND == "bm25" else get_client()
+
+
+def refresh_graph_version():
+    """Re-read the graph version at most every GRAPH_VERSION_CHECK_SECONDS; a new version clears the cache"""
+    global _version_checked_at
+    now = time.monotonic()
+    if now - _version_checked_at < GRAPH_VERSION_CHECK_SECONDS:
+        return
+    _version_checked_at = now
+    try:
+        version = get_searcher().graph_version()
+    except Exception as e:
+        logging.error(f"Graph version check failed: {e}")
+        return
+    if query_cache.set_version(version):
+        logging.info(f"Graph version {version}: query cache cleared")
+
+
+def cache_statistics():
+    """Hit rates of the query cache as markdown"""
+    stats = query_cache.stats()
+    lines = [
+        f"**Entries:** {stats['entries']}/{stats['max_entries']} · **TTL:** {stats['ttl']:.0f}s · "
+        f"**Graph version:** {stats['version']} · **Invalidations:** {stats['invalidations']}",
+        "",
+        "| Entry | Hits | Misses | Hit rate | Expired | Evicted |",
+        "|---|---|---|---|---|---|",
+    ]
+    for kind, c in stats["kinds"].items():
+        lines.append(f"| {kind} | {c['hits']} | {c['misses']} | {c['hit_rate']:.0%} | {c['expired']} | {c['evictions']} |")
+    return "\n".join(lines)
+
+
+def sanitize_document(src_path):
+    """Convert .doc/.docm to a macro-free .docx; other files are kept as they are. None if conversion failed."""
+    fname = os.path.basename(src_path)
+    if not fname.lower().endswith((".doc", ".docm")):
+        return src_path
+    try:
+        document = Document()
+        document.LoadFromFile(src_path)
+
+        if document.IsContainMacro:
+            logging.info(f"[{fname}] contains macros — removing...")
+            document.ClearMacros()
+
+        clean_path = os.path.splitext(src_path)[0] + ".docx"
+        document.SaveToFile(clean_path, FileFormat.Docx2016)
+        document.Close()
+
+        logging.info(f"Cleaned: {clean_path}")
+        return clean_path
+    except Exception as e:
+        logging.error(f"Spire.Doc failed for {fname}: {e}")
+        return None
+
+
+def create_workspace():
+    """Upload directory for one request: its own dir under UPLOADS_ROOT, or UPLOADS_ROOT cleared for it"""
+    if not GENERATOR_SCOPED_UPLOADS:
+        # Searches run one at a time in this mode, so no other request is using the directory
+        clear_directory(UPLOADS_ROOT)
+        return UPLOADS_ROOT
+    os.makedirs(UPLOADS_ROOT, exist_ok=True)
+    return tempfile.mkdtemp(prefix=datetime.now().strftime("%Y%m%d-%H%M%S-"), dir=UPLOADS_ROOT)
+
+
+def save_results(df):
+    """Write the latest results atomically, so concurrent requests never interleave rows"""
+    tmp_path = f"{RESULTS_CSV}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, RESULTS_CSV)
+    logging.info(f"Saved results to {RESULTS_CSV}")
+
+
 def clear_directory(path):
 
     """Clear all files and directories in the specified path"""
@@ -97,89 +205,26 @@ def save_feedback(name, query, score, remarks, ai_response, progress=gr.Progress
 
 def search_and_generate(name_input,query_str, meeting_id, progress=gr.Progress()):
     """Main function that searches Neo4j, downloads documents, and generates response"""
-    output_dir = "downloaded_docs"
-    uri = "bolt://172.26.189.83:7687"
-    uploads_dir = "/git_folder/udbhav/code/RAG/uploads"
     generate_uri = "http://172.26.189.83:4005/generate"
     stats_uri = "http://172.26.189.83:4004/v1/statistics"
-    uname = "neo4j"
-    pswd = "login123"
     logging.info(f"Received search request: {name_input}, {query_str}, {meeting_id}")
     progress(0, desc="Initializing...")
     logging.info(f"Starting search process: {query_str}, {meeting_id}")
     yield None, None  # matches (df_output, response_output)
 
-    os.makedirs(output_dir, exist_ok=True)
-    clear_directory(output_dir)
-    clear_directory("/git_folder/udbhav/code/RAG/uploads")
-    logging.info(f"Directories prepared: {output_dir}, /git_folder/udbhav/code/RAG/uploads")
+    workspace = create_workspace()
+    logging.info(f"Workspace prepared: {workspace}")
     progress(0.1, desc="Connecting to database...")
 
-    query = """
-    CALL () {
-      CALL db.index.fulltext.queryNodes("docIndex", $query)
-      YIELD node, score
-      WHERE $meeting IS NULL OR node.meeting_id CONTAINS $meeting
-      RETURN
-        collect(node.doc_id) AS direct_doc_ids,
-        collect({doc_id: node.doc_id, score: score}) AS direct_docs
-    }
-    WITH direct_doc_ids, direct_docs
-    CALL (direct_doc_ids) {
-      WITH direct_doc_ids
-      CALL db.index.fulltext.queryNodes("agendaIndex", $query)
-      YIELD node, score AS agenda_score
-      MATCH (node)<-[:APPEARS_IN]-(d:Document)
-      WITH d,
-           CASE
-             WHEN d.doc_id IN direct_doc_ids THEN agenda_score * 2.3
-             ELSE agenda_score * 0.8
-           END AS agenda_rel_score
-      RETURN collect({doc_id: d.doc_id, score: agenda_rel_score}) AS agenda_docs
-    }
-    WITH direct_docs, agenda_docs
-    CALL() {
-      CALL db.index.fulltext.queryNodes("techEntityIndex", $query)
-      YIELD node, score AS entity_score
-      MATCH (d:Document)-[:MENTIONS]->(node)
-      RETURN collect({doc_id: d.doc_id, score: entity_score * 0.7}) AS entity_docs
-    }
-    WITH direct_docs, agenda_docs, entity_docs
-    WITH direct_docs + agenda_docs + entity_docs AS all_docs
-    UNWIND all_docs AS doc_entry
-    WITH doc_entry.doc_id AS doc_id, sum(doc_entry.score) AS total_score
-    MATCH (d:Document {doc_id: doc_id})
-    WITH d, total_score,
-    CASE
-      WHEN d.title CONTAINS 'Feature Lead Summary' THEN total_score * 2.0
-      WHEN d.title CONTAINS 'Feature Lead' THEN total_score * 1.5
-      ELSE total_score
-    END AS boosted_score
-    RETURN
-      d.doc_id,
-      d.title,
-      d.source_path,
-      d.meeting_id,
-      d.release,
-      total_score,
-      boosted_score
-    ORDER BY boosted_score DESC
-    LIMIT 15;
-    """
-
     try:
-        driver = GraphDatabase.driver(uri, auth=(uname, pswd))
-        logging.info(f"Connected to Neo4j: {uri}")
-        progress(0.2, desc="Executing Neo4j query...")
-
-        meeting = meeting_id.strip() if meeting_id and meeting_id.strip() else None
-        params = {"query": query_str, "meeting": meeting}
-
-        with driver.session() as session:
-            result = session.run(query, params)
-            data = [record.data() for record in result]
-
-        driver.close()
+        refresh_graph_version()
+        data = query_cache.get("docs", query_str, meeting_id)
+        if data is None:
+            progress(0.2, desc="Executing Neo4j query...")
+            data = get_searcher().search(query_str, meeting_id, limit=15)
+            query_cache.put("docs", query_str, meeting_id, data)
+        else:
+            logging.info("Search results served from cache")
         logging.info(f"Found {len(data)} documents")
 
         if not data:
@@ -188,61 +233,26 @@ def search_and_generate(name_input,query_str, meeting_id, progress=gr.Progress()
             return
 
         df = pd.DataFrame(data)
-        progress(0.3, desc="Downloading matched documents...")
         yield df, None
 
+        cached_response = query_cache.get("answer", query_str, meeting_id)
+        if cached_response is not None:
+            logging.info(f"Answer served from cache; {query_cache.stats()['kinds']}")
+            save_results(df)
+            progress(1.0, desc="Complete! (cached)")
+            yield df, cached_response
+            return
+
+        progress(0.3, desc="Downloading matched documents...")
+
         import concurrent.futures
 
         def download_and_extract(row):
             url, doc_id, title = row._3, row._1, row._2[:50].replace("/", "_")
-            dest_path = os.path.join(output_dir, f"{doc_id} - {title}.zip")
-            temp_extract_dir = os.path.join("/tmp/extracted_docs", str(doc_id))
-            os.makedirs(temp_extract_dir, exist_ok=True)
-            
-
             try:
+                # Served from the document store when cached; downloaded and sanitized otherwise
                 encoded_url = urllib.parse.quote(url, safe=':/')
-                r = requests.get(encoded_url, timeout=20)
-                r.raise_for_status()
-                with open(dest_path, "wb") as f:
-                    f.write(r.content)
-                with zipfile.ZipFile(dest_path, 'r') as zip_ref:
-                    for member in zip_ref.namelist():
-                        if not (member.startswith('__MACOSX/') or member.endswith('.DS_Store')):
-                            
-                            zip_ref.extract(member, temp_extract_dir)
-                os.remove(dest_path)
-                for root, _, files in os.walk(temp_extract_dir):
-                    for fname in files:
-                        src_path = os.path.join(root, fname)
-                        dst_path = os.path.join(uploads_dir, fname)
-
-                        # --- Handle .doc/.docm securely ---
-                        if fname.lower().endswith((".doc", ".docm")):
-                            try:
-                                document = Document()
-                                document.LoadFromFile(src_path)
-
-                                if document.IsContainMacro:
-                                    logging.info(f"[{fname}] contains macros — removing...")
-                                    document.ClearMacros()
-
-                                # Save as .docx clean file in uploads/
-                                clean_path = os.path.splitext(dst_path)[0] + ".docx"
-                                document.SaveToFile(clean_path, FileFormat.Docx2016)
-                                document.Close()
-
-                                logging.info(f"Cleaned and moved safely: {clean_path}")
-                            except Exception as e:
-                                logging.error(f"Spire.Doc failed for {fname}: {e}")
-
-                        else:
-                            # Safe file — move directly
-                            safe_dst = os.path.join(uploads_dir, fname)
-                            shutil.move(src_path, safe_dst)
-
-                # Remove temp directory
-                shutil.rmtree(temp_extract_dir, ignore_errors=True)
+                doc_store.fetch(encoded_url, doc_id, sanitize_document, workspace)
                 return (title, None)
             except Exception as e:
                 logging.error(f"Error downloading {title}: {e}")
@@ -261,6 +271,7 @@ def search_and_generate(name_input,query_str, meeting_id, progress=gr.Progress()
                 progress(0.3 + (i / total) * 0.3, desc=f"Downloading {i}/{total}")
 
         logging.info(f"Downloaded {len(df) - len(download_errors)}/{len(df)} documents successfully")
+        doc_store.report(logging)
 
 
         import time
@@ -291,18 +302,22 @@ def search_and_generate(name_input,query_str, meeting_id, progress=gr.Progress()
         # ✅ Call AI generator after readiness confirmed
         progress(0.7, desc="Generating AI response...")
         payload = {"query": query_str, "max_tokens": 5000, "num_docs": 10}
+        if GENERATOR_SCOPED_UPLOADS:
+            # The generator reads only this request's documents
+            payload.update(upload_dir=workspace, files=sorted(os.listdir(workspace)))
 
         try:
             response = requests.post(generate_uri, json=payload, timeout=90)
             response.raise_for_status()
             formatted_response = format_response(json.dumps(response.json()))
+            if not download_errors:
+                # An answer from only some of the documents isn't worth serving for the whole TTL
+                query_cache.put("answer", query_str, meeting_id, formatted_response)
         except Exception as e:
             formatted_response = f"❌ Failed to generate response: {e}"
             logging.error(formatted_response)
 
-        csv_path = "search_results.csv"
-        df.to_csv(csv_path, index=False)
-        logging.info(f"Saved results to {csv_path}")
+        save_results(df)
 
         progress(1.0, desc="Complete!")
         yield df, formatted_response
@@ -310,6 +325,12 @@ def search_and_generate(name_input,query_str, meeting_id, progress=gr.Progress()
     except Exception as e:
         logging.error(f"Fatal error in search_and_generate: {e}")
         yield None, f"❌ Error: {e}"
+    finally:
+        # Also runs when the client disconnects and Gradio closes the generator. The shared
+        # UPLOADS_ROOT is left as it is and cleared by the next request, as before
+        if workspace != UPLOADS_ROOT:
+            shutil.rmtree(workspace, ignore_errors=True)
+            logging.info(f"Workspace removed: {workspace}")
 
 
 
@@ -336,14 +357,21 @@ with gr.Blocks(title="Wisdom Lab 3GPP RAG", theme=gr.themes.Soft()) as demo:
     gr.Markdown("---")
     response_output = gr.Markdown(label="🤖 AI Response")
     df_output = gr.DataFrame(label=" Search Results", interactive=False)
+
+    with gr.Accordion("Query cache statistics", open=False):
+        cache_stats_output = gr.Markdown()
+        refresh_stats_btn = gr.Button("Refresh", size="sm")
     
     search_btn.click(
         fn=search_and_generate,
         inputs=[name_input,query_input, meeting_input],
         outputs=[ df_output, response_output],
-        queue=True
+        queue=True,
+        concurrency_limit=SEARCH_CONCURRENCY
     )
 
+    refresh_stats_btn.click(fn=cache_statistics, inputs=[], outputs=[cache_stats_output])
+
     submit_feedback_btn.click(
         fn=save_feedback,
         inputs=[name_input, query_input, score_input, remarks_input, response_output],
@@ -353,5 +381,6 @@ with gr.Blocks(title="Wisdom Lab 3GPP RAG", theme=gr.themes.Soft()) as demo:
     )
 
 if __name__ == "__main__":
-    demo.queue(max_size=15)
+    clear_directory(UPLOADS_ROOT)  # files and workspaces left behind by a previous process
+    demo.queue(max_size=15, default_concurrency_limit=SEARCH_CONCURRENCY)
     demo.launch(server_name="0.0.0.0", server_port=7860, debug=True)
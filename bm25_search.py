@@ -0,0 +1,333 @@
+"""
+Embedded BM25 search over the generated CSVs
+============================================
+
+An in-process stand-in for the Neo4j full-text search: no database round trip,
+and it runs offline (tests, laptops, a box without access to the graph server).
+
+`build` reads documents.csv, agendas.csv and technology_entities.csv (plus
+appears_in.csv and mentions.csv for the joins) and writes one inverted index
+per Neo4j full-text index, with the same fields:
+
+    docIndex         Document          title, summary, keywords, topic, tags
+    agendaIndex      Agenda            topics, descriptions, release
+    techEntityIndex  TechnologyEntity  canonical_name, aliases, description
+
+Scoring follows Lucene's BM25 as the Neo4j indexes use it: k1 = 1.2, b = 0.75,
+idf = ln(1 + (N - df + 0.5) / (df + 0.5)), tf / (tf + k1 * (1 - b + b * dl / avgdl)),
+with N, df and avgdl per field, and each query term scored on every field and
+summed. Text is analyzed like Neo4j's default standard-no-stop-words analyzer
+(Unicode word tokens, lower-cased). Results are then combined exactly like
+search_client.SEARCH_QUERY:
+
+- docIndex hits, filtered by meeting;
+- agendaIndex hits joined to documents through APPEARS_IN, at 2.3x when the
+  document is also a direct hit and 0.8x otherwise;
+- techEntityIndex hits joined through MENTIONS, at 0.7x;
+- summed per document and boosted 2x / 1.5x for 'Feature Lead Summary' /
+  'Feature Lead' titles.
+
+Scores are close to Neo4j's but not bit-identical. Lucene stores field
+lengths lossily, and query syntax (phrases, wildcards, field:term) is treated
+as plain terms. The ranking is the same up to those effects.
+
+Index files (INDEX_FOLDER):
+    <index>.json       fields: doc count, average length, term → (offset, df); node keys
+    <index>.postings   uint32: for each term, its doc ids followed by their term frequencies
+    <index>.norms      float32: k1 * (1 - b + b * dl / avgdl) per field and doc
+    graph.json         document metadata and the APPEARS_IN / MENTIONS joins
+The binary files are memory-mapped on load, so opening an index reads only
+the JSON.
+
+CSVs from older generate_csv.py versions are accepted:
+- agendas with topic/description instead of topics/descriptions;
+- agendas and appears_in without meeting_id;
+- documents without meeting_key;
+- missing files, which give an empty index.
+
+Usage:
+    python bm25_search.py build [csv_folder] [index_folder]
+    python bm25_search.py search "query text" [meeting]
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+import math
+import time
+import threading
+from array import array
+from collections import Counter, defaultdict
+
+from utils.normalize import meeting_key
+
+CSV_FOLDER = "./neo4j_csv_output2"
+INDEX_FOLDER = os.path.join(CSV_FOLDER, "bm25")
+
+K1 = 1.2
+B = 0.75
+DEFAULT_LIMIT = 15
+
+# index → (csv file, node key columns, indexed fields)
+INDEXES = {
+    "docIndex": ("documents.csv", ["doc_id"], ["title", "summary", "keywords", "topic", "tags"]),
+    "agendaIndex": ("agendas.csv", ["agenda_id", "meeting_id"], ["topics", "descriptions", "release"]),
+    "techEntityIndex": ("technology_entities.csv", ["canonical_name"], ["canonical_name", "aliases", "description"]),
+}
+ARRAY_FIELDS = {"tags", "keywords", "aliases"}
+# Column names of agendas.csv before the rename to the plural property names
+LEGACY_COLUMNS = {"topics": "topic", "descriptions": "description"}
+
+# Unicode word tokens; digits around '.' / ',' and letters around apostrophes stay one token
+_TOKEN = re.compile(r"\w+(?:(?:(?<=\d)[.,](?=\d)|(?<=[^\W\d_])['’.](?=[^\W\d_]))\w+)*")
+# Lucene query syntax operators, dropped from the query text
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def analyze(text):
+    return [token.lower() for token in _TOKEN.findall(text or "")]
+
+def analyze_query(query):
+    return analyze(" ".join(word for word in (query or "").split() if word not in _OPERATORS))
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def read_csv(folder, filename):
+    try:
+        with open(os.path.join(folder, filename), newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        print(f"  {filename} not found in {folder}; its index will be empty")
+        return []
+
+def field_text(row, field):
+    value = row.get(field)
+    if value is None and field in LEGACY_COLUMNS:
+        value = row.get(LEGACY_COLUMNS[field])
+    if field in ARRAY_FIELDS and value:
+        return " ".join(value.split("|"))
+    return value or ""
+
+def node_key(row, columns):
+    return "\0".join(row.get(c) or "" for c in columns)
+
+def replace_file(path, write, mode="w"):
+    """Write to a temporary file and rename it over path: a running engine keeps its mmap of the old file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def index_version(folder=INDEX_FOLDER):
+    """mtime of graph.json, written last by build(); changes with every rebuild."""
+    return os.stat(os.path.join(folder, "graph.json")).st_mtime_ns
+
+def build_index(name, rows, key_columns, fields, folder):
+    """Write <name>.json/.postings/.norms; returns the node keys in doc id order."""
+    keys, seen = [], set()
+    tokens_by_field = {field: [] for field in fields}
+    for row in rows:
+        key = node_key(row, key_columns)
+        if not row.get(key_columns[0]) or key in seen:
+            continue  # one node per key, as MERGE gives
+        seen.add(key)
+        keys.append(key)
+        for field in fields:
+            tokens_by_field[field].append(analyze(field_text(row, field)))
+
+    postings = array("I")
+    norms = array("f")
+    meta = {"keys": keys, "fields": {}}
+    for field in fields:
+        lengths = [len(tokens) for tokens in tokens_by_field[field]]
+        doc_count = sum(1 for n in lengths if n)  # Lucene counts documents with at least one term
+        avg_len = sum(lengths) / doc_count if doc_count else 0.0
+        inverted = defaultdict(list)
+        for doc, tokens in enumerate(tokens_by_field[field]):
+            for term, tf in Counter(tokens).items():
+                inverted[term].append((doc, tf))
+        terms = {}
+        for term in sorted(inverted):
+            entries = inverted[term]
+            terms[term] = [len(postings), len(entries)]
+            postings.extend(doc for doc, _ in entries)
+            postings.extend(tf for _, tf in entries)
+        meta["fields"][field] = {
+            "doc_count": doc_count, "avg_len": avg_len, "norms": len(norms), "terms": terms,
+        }
+        norms.extend(K1 * (1 - B + B * n / avg_len) if avg_len else K1 for n in lengths)
+
+    replace_file(os.path.join(folder, f"{name}.postings"), postings.tofile, "wb")
+    replace_file(os.path.join(folder, f"{name}.norms"), norms.tofile, "wb")
+    replace_file(os.path.join(folder, f"{name}.json"),
+                 lambda f: json.dump(meta, f, ensure_ascii=False, separators=(",", ":")))
+    return keys
+
+def build(csv_folder=CSV_FOLDER, index_folder=INDEX_FOLDER):
+    os.makedirs(index_folder, exist_ok=True)
+    start = time.perf_counter()
+    tables = {file: read_csv(csv_folder, file) for file, _, _ in INDEXES.values()}
+    keys = {name: build_index(name, tables[file], key_columns, fields, index_folder)
+            for name, (file, key_columns, fields) in INDEXES.items()}
+
+    # Documents in docIndex order carry what the search returns
+    doc_pos = {doc_id: i for i, doc_id in enumerate(keys["docIndex"])}
+    documents = [None] * len(doc_pos)
+    for row in tables["documents.csv"]:
+        i = doc_pos.get(row.get("doc_id"))
+        if i is not None and documents[i] is None:
+            documents[i] = [row.get("doc_id", ""), row.get("title", ""), row.get("source_path", ""),
+                            row.get("meeting_id", ""), row.get("release", ""),
+                            row.get("meeting_key") or meeting_key(row.get("meeting_id", ""))]
+
+    # APPEARS_IN: agenda → documents, one entry per relationship row. Older
+    # CSVs have no meeting_id on agendas/appears_in; the key is then agenda_id alone.
+    agenda_pos = {key: i for i, key in enumerate(keys["agendaIndex"])}
+    appears_in = defaultdict(list)
+    for row in read_csv(csv_folder, "appears_in.csv"):
+        a = agenda_pos.get(node_key(row, INDEXES["agendaIndex"][1]))
+        d = doc_pos.get(row.get("doc_id"))
+        if a is not None and d is not None:
+            appears_in[a].append(d)
+
+    entity_pos = {name: i for i, name in enumerate(keys["techEntityIndex"])}
+    mentions = defaultdict(list)
+    for row in read_csv(csv_folder, "mentions.csv"):
+        e = entity_pos.get(row.get("entity_name"))
+        d = doc_pos.get(row.get("doc_id"))
+        if e is not None and d is not None:
+            mentions[e].append(d)
+
+    # Written last: its mtime is the index version (index_version)
+    replace_file(os.path.join(index_folder, "graph.json"), lambda f: json.dump(
+        {"documents": documents, "appears_in": appears_in, "mentions": mentions},
+        f, ensure_ascii=False, separators=(",", ":")))
+    print(f"BM25 indexes written to {index_folder} in {time.perf_counter() - start:.1f}s: "
+          + ", ".join(f"{name}={len(k)}" for name, k in keys.items()))
+
+
+# ── Search ────────────────────────────────────────────────────────────────────
+
+class FullTextIndex:
+    """One memory-mapped index; score(terms) gives {doc: BM25 score} like db.index.fulltext.queryNodes."""
+
+    def __init__(self, folder, name):
+        with open(os.path.join(folder, f"{name}.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.keys = meta["keys"]
+        self.fields = meta["fields"]
+        self.postings = self._map(os.path.join(folder, f"{name}.postings"), "I")
+        self.norms = self._map(os.path.join(folder, f"{name}.norms"), "f")
+
+    @staticmethod
+    def _map(path, typecode):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(array(typecode))
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(typecode)
+
+    def score(self, terms):
+        scores = defaultdict(float)
+        for field in self.fields.values():
+            n, base = field["doc_count"], field["norms"]
+            for term in terms:
+                entry = field["terms"].get(term)
+                if entry is None:
+                    continue
+                offset, df = entry
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                docs = self.postings[offset:offset + df]
+                tfs = self.postings[offset + df:offset + 2 * df]
+                norms = self.norms
+                for doc, tf in zip(docs, tfs):
+                    scores[doc] += idf * tf / (tf + norms[base + doc])
+        return scores
+
+
+class BM25Engine:
+
+    def __init__(self, folder=INDEX_FOLDER):
+        self.folder = folder
+        self.version = index_version(folder)  # before reading, so a concurrent rebuild shows up as a newer version
+        self.indexes = {name: FullTextIndex(folder, name) for name in INDEXES}
+        with open(os.path.join(folder, "graph.json"), encoding="utf-8") as f:
+            graph = json.load(f)
+        self.documents = graph["documents"]
+        self.appears_in = {int(a): docs for a, docs in graph["appears_in"].items()}
+        self.mentions = {int(e): docs for e, docs in graph["mentions"].items()}
+
+    def graph_version(self):
+        """The on-disk index version (not the loaded one); stands in for the Neo4j GraphMeta version."""
+        return index_version(self.folder)
+
+    def search(self, query, meeting=None, limit=DEFAULT_LIMIT):
+        """Same rows as search_client.SearchClient.search: d.doc_id, d.title, ..., total_score, boosted_score."""
+        terms = analyze_query(query)
+        if not terms:
+            return []
+        meeting = meeting.strip() if meeting and meeting.strip() else None
+        key = meeting_key(meeting) if meeting else ""
+
+        total = defaultdict(float)
+        direct = set()
+        for doc, score in self.indexes["docIndex"].score(terms).items():
+            _, _, _, meeting_id, _, doc_key = self.documents[doc]
+            if key and doc_key != key or not key and meeting and meeting not in meeting_id:
+                continue
+            direct.add(doc)
+            total[doc] += score
+        for agenda, score in self.indexes["agendaIndex"].score(terms).items():
+            for doc in self.appears_in.get(agenda, ()):
+                total[doc] += score * (2.3 if doc in direct else 0.8)
+        for entity, score in self.indexes["techEntityIndex"].score(terms).items():
+            for doc in self.mentions.get(entity, ()):
+                total[doc] += score * 0.7
+
+        rows = []
+        for doc, score in total.items():
+            doc_id, title, source_path, meeting_id, release, _ = self.documents[doc]
+            boost = 2.0 if "Feature Lead Summary" in title else 1.5 if "Feature Lead" in title else 1.0
+            rows.append({
+                "d.doc_id": doc_id, "d.title": title, "d.source_path": source_path,
+                "d.meeting_id": meeting_id, "d.release": release,
+                "total_score": score, "boosted_score": score * boost,
+            })
+        rows.sort(key=lambda r: (-r["boosted_score"], r["d.doc_id"]))
+        return rows[:limit]
+
+
+_engine = None
+_lock = threading.Lock()
+
+
+def get_engine(folder=INDEX_FOLDER):
+    """The process-wide BM25Engine, loaded on first use and reloaded after a rebuild."""
+    global _engine
+    with _lock:
+        if _engine is None or _engine.version != index_version(folder):
+            _engine = BM25Engine(folder)
+        return _engine
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["build"]:
+        build(*args[1:3])
+    elif args[:1] == ["search"] and len(args) >= 2:
+        engine = get_engine()
+        start = time.perf_counter()
+        rows = engine.search(args[1], args[2] if len(args) > 2 else None)
+        elapsed = time.perf_counter() - start
+        for row in rows:
+            print(f"{row['boosted_score']:8.3f}  {row['d.doc_id']:<14} {row['d.meeting_id']:<12} {row['d.title'][:80]}")
+        print(f"{len(rows)} results in {elapsed * 1000:.2f} ms")
+    else:
+        print(__doc__.split("Usage:")[1])
+
+
+if __name__ == "__main__":
+    main()
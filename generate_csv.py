@@ -25,39 +25,101 @@ Bugs fixed vs. original version
 6. WorkingGroup deduplication keyed on (id, name), not (id, name, description).
    Prevents ~1,400 near-duplicate WorkingGroup rows per meeting.
 
+Incremental mode
+----------------
+Each JSON file is parsed into its own contribution (the tuples it adds to
+the node and relationship sets). Contributions are persisted in STATE_PATH
+together with a manifest of (mtime, size, content hash) per file, so a re-run
+only parses files that are new or changed and drops deleted ones. The global
+sets are then rebuilt from the stored contributions in sorted path order,
+which keeps "first-seen" rules (WorkingGroup description, agenda release)
+deterministic. Pass --full to ignore the saved state and rescan everything.
+
+Parallel parsing
+----------------
+Files to parse are split into contiguous shards of the sorted path list and
+parsed in a process pool (map). Each worker also folds its shard into a
+partial Aggregate; the partials are merged in shard order (reduce), which
+gives exactly the serial result: first-seen WorkingGroup description,
+unioned agenda topics/descriptions, first non-empty agenda release.
+
+Normalized keys
+---------------
+release, meeting_id and type are free text with hundreds of variants
+("Rel-19" / "Release 19" / "R19", "RAN WG1 #118bis" / "RAN1_118b"). Documents,
+meetings and agendas get canonical release_num / meeting_key / doc_class
+columns next to the raw ones (utils/normalize.py), so filters can be exact
+matches on an index. Values that could not be mapped are counted and listed
+in NORMALIZATION_REPORT.
+
+Bounded memory
+--------------
+With --low-memory (or LOW_MEMORY = True) the node and relationship sets are
+SpillSets: at most SPILL_ROWS tuples each are held in memory, full buffers
+are written to a scratch directory as sorted runs, and reading one back is an
+external merge sort (heapq.merge over the runs, duplicates dropped). The
+per-file contributions are kept in an on-disk shelf next to the state file
+instead of the state pickle. Node IDs, meeting ids, releases and other short
+repeated values are interned at parse time. Peak RSS is printed at the end.
+--bulk-import, --delta, --parquet and --load still build their tables in
+memory.
+
 Input:   Results/  (recursive walk for *.json)
 Output:  ./neo4j_csv_output2/
 """
 
 import os
+import sys
 import json
 import csv
+import pickle
+import shelve
+import hashlib
+import heapq
+import tempfile
+import re
+import unicodedata
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial as bind
+from itertools import groupby, islice
+
+from utils.normalize import NORMALIZERS, release_num, meeting_key, doc_class
 
 INPUT_FOLDER = "Results"
 OUTPUT_FOLDER = "./neo4j_csv_output2"
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-
-# ── Node containers ──────────────────────────────────────────────────────────
-authors      = set()   # (name, aliases_pipe)
-documents    = set()   # (doc_id, version, title, release, type, tags, summary,
-                       #  topic, keywords, meeting_id, status, source_path)
-tech_entities = set()  # (canonical_name, aliases_pipe, description)
-meetings     = set()   # (meeting_id, venue, wg, topic)
-
-# WorkingGroup: key=(id, name) → description  (first-seen wins)
-wg_dict: dict = {}
-
-# Agenda: key=(agenda_id, meeting_id) → {'topics': set, 'descriptions': set, 'release': str}
-agenda_dict: dict = defaultdict(lambda: {"topics": set(), "descriptions": set(), "release": ""})
-
-# ── Relationship containers ───────────────────────────────────────────────────
-authored_rels    = set()  # (contributor_name, doc_id, contribution_type)
-mentions_rels    = set()  # (doc_id, entity_name, context, frequency)
-belongs_to_rels  = set()  # (doc_id, wg_name, role_in_group)
-references_rels  = set()  # (source_doc_id, cited_doc_id, type_of_reference, details)
-# appears_in now includes meeting_id for proper Agenda MERGE in LOAD CSV
-appears_in_rels  = set()  # (agenda_id, meeting_id, release, doc_id, page_range)
+STATE_PATH = os.path.join(OUTPUT_FOLDER, ".generate_csv_state.pkl")
+STATE_VERSION = 1
+# --low-memory: per-file contributions live in this shelf instead of the state pickle
+CONTRIBUTIONS_PATH = os.path.join(OUTPUT_FOLDER, ".generate_csv_contributions")
+# Parsing runs in a process pool once there are at least PARALLEL_MIN_FILES
+# files to (re)parse; below that the pool start-up costs more than it saves.
+WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_FILES = 500
+SHARDS_PER_WORKER = 4
+# Bounded-memory aggregation (--low-memory): rows held in memory per container
+# before a sorted run is spilled to disk, and runs per container before they
+# are merged into one (keeps the number of open files down)
+LOW_MEMORY = False
+SPILL_ROWS = 200_000
+SPILL_MAX_RUNS = 64
+# Rewrite MENTIONS/AUTHORED names to their TechnologyEntity/Contributor canonical names
+RESOLVE_ENTITIES = True
+# One row per node key / relationship endpoint pair, no dangling rels or orphan nodes
+COLLAPSE_DUPLICATES = True
+# Typed columnar copy of the CSVs, written with --parquet (and --arrow); needs pyarrow
+PARQUET_FOLDER = os.path.join(OUTPUT_FOLDER, "parquet")
+# Raw release/meeting_id/type values that utils/normalize.py could not map, with row counts
+NORMALIZATION_REPORT = os.path.join(OUTPUT_FOLDER, "normalization_report.csv")
+# Changed rows and apply/retract Cypher against the previous CSVs, written with --delta
+DELTA_FOLDER = os.path.join(OUTPUT_FOLDER, "delta")
+# neo4j-admin bulk-import layout, written with --bulk-import
+BULK_IMPORT_FOLDER = os.path.join(OUTPUT_FOLDER, "bulk_import")
+CSV_FILES = [
+    "authors.csv", "documents.csv", "technology_entities.csv", "working_groups.csv",
+    "meetings.csv", "agendas.csv", "authored.csv", "mentions.csv", "belongs_to.csv",
+    "references.csv", "appears_in.csv",
+]
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -72,6 +134,10 @@ def clean_list(val):
 def safe_str(val):
     return "" if val is None else str(val)
 
+def intern_str(val):
+    """safe_str for IDs and short values repeated across many tuples (doc ids, meeting ids, releases, paths)."""
+    return sys.intern(safe_str(val))
+
 def write_csv(filename, fieldnames, rows):
     path = os.path.join(OUTPUT_FOLDER, filename)
     with open(path, "w", newline="", encoding="utf-8") as f:
@@ -80,276 +146,1321 @@ def write_csv(filename, fieldnames, rows):
         for row in rows:
             writer.writerow(row)
 
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-# ── Main processing loop ──────────────────────────────────────────────────────
+ARRAY_DELIMITER = "|"
 
-for root, dirs, files in os.walk(INPUT_FOLDER):
-    for file in files:
-        if not file.endswith(".json"):
-            continue
+def merge_arrays(*values):
+    items = []
+    for value in values:
+        for item in value.split(ARRAY_DELIMITER) if value else []:
+            item = item.strip()
+            if item and item not in items:
+                items.append(item)
+    return ARRAY_DELIMITER.join(items)
 
-        filepath = os.path.join(root, file)
-        with open(filepath, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"  SKIP (invalid JSON): {filepath} — {e}")
-                continue
+def join_distinct(values):
+    return "; ".join(sorted({v for v in values if v}))
 
-        # ── Authors ──────────────────────────────────────────────────────────
-        for a in data.get("authors", []):
-            if not a.get("name"):
-                continue
-            authors.add((a["name"], "|".join(clean_list(a.get("aliases", [])))))
+def first_nonempty(values):
+    return next((v for v in values if v), "")
 
-        # ── Build a page_range lookup from the LLM's appears_in list ─────────
-        # appears_in entries: {agenda_id, doc_id, page_range}
-        page_range_lookup: dict = {}
-        for ai in data.get("appears_in", []):
-            key = (safe_str(ai.get("agenda_id")), safe_str(ai.get("doc_id")))
-            page_range_lookup[key] = safe_str(ai.get("page_range", ""))
+def new_agenda():
+    return {"topics": set(), "descriptions": set(), "release": ""}
 
-        # ── Documents (and their direct relationships) ────────────────────────
-        doc_ids_in_file = []
 
-        for d in data.get("documents", []):
-            doc_id = d.get("doc_id")
-            if not doc_id:
-                continue
+# ── Per-file parsing ──────────────────────────────────────────────────────────
 
-            doc_ids_in_file.append(doc_id)
-            tags     = "|".join(clean_list(d.get("tags")))
-            keywords = "|".join(clean_list(d.get("keywords")))
-            agenda_ids   = clean_list(d.get("agenda_id"))
-            release      = safe_str(d.get("release"))
-            meeting_id   = safe_str(d.get("meeting_id"))
-            topic        = safe_str(d.get("topic"))
+def parse_file(filepath):
+    """
+    Parse one extraction JSON into its contribution: for each container, the
+    tuples this file adds, in the order the file adds them. Returns None for
+    invalid JSON.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"  SKIP (invalid JSON): {filepath} — {e}")
+            return None
 
-            documents.add((
-                doc_id,
-                safe_str(d.get("version")),
-                safe_str(d.get("title")),
-                release,
-                safe_str(d.get("type")),
-                tags,
-                safe_str(d.get("summary")),
-                topic,
-                keywords,
+    c = {
+        "authors": [],          # (name, aliases_pipe)
+        "documents": [],        # (doc_id, version, title, release, type, tags, summary,
+                                #  topic, keywords, meeting_id, status, source_path)
+        "tech_entities": [],    # (canonical_name, aliases_pipe, description)
+        "meetings": [],         # (meeting_id, venue, wg, topic)
+        "working_groups": [],   # ((id, name), description)
+        "agendas": [],          # ((agenda_id, meeting_id), topic, description, release)
+        "authored": [],         # (contributor_name, doc_id, contribution_type)
+        "mentions": [],         # (doc_id, entity_name, context, frequency)
+        "belongs_to": [],       # (doc_id, wg_name, role_in_group)
+        "references": [],       # (source_doc_id, cited_doc_id, type_of_reference, details)
+        "appears_in": [],       # (agenda_id, meeting_id, release, doc_id, page_range)
+    }
+
+    # ── Authors ──────────────────────────────────────────────────────────────
+    for a in data.get("authors", []):
+        if not a.get("name"):
+            continue
+        c["authors"].append((intern_str(a["name"]), "|".join(clean_list(a.get("aliases", [])))))
+
+    # ── Build a page_range lookup from the LLM's appears_in list ─────────────
+    # appears_in entries: {agenda_id, doc_id, page_range}
+    page_range_lookup: dict = {}
+    for ai in data.get("appears_in", []):
+        key = (intern_str(ai.get("agenda_id")), intern_str(ai.get("doc_id")))
+        page_range_lookup[key] = safe_str(ai.get("page_range", ""))
+
+    # ── Documents (and their direct relationships) ────────────────────────────
+    doc_ids_in_file = []
+
+    for d in data.get("documents", []):
+        doc_id = d.get("doc_id")
+        if not doc_id:
+            continue
+        doc_id = intern_str(doc_id)
+
+        doc_ids_in_file.append(doc_id)
+        tags     = "|".join(clean_list(d.get("tags")))
+        keywords = "|".join(clean_list(d.get("keywords")))
+        agenda_ids   = clean_list(d.get("agenda_id"))
+        release      = intern_str(d.get("release"))
+        meeting_id   = intern_str(d.get("meeting_id"))
+        topic        = safe_str(d.get("topic"))
+
+        c["documents"].append((
+            doc_id,
+            safe_str(d.get("version")),
+            safe_str(d.get("title")),
+            release,
+            intern_str(d.get("type")),
+            tags,
+            safe_str(d.get("summary")),
+            topic,
+            keywords,
+            meeting_id,
+            intern_str(d.get("status")),
+            intern_str(d.get("source_path")),
+        ))
+
+        # APPEARS_IN: Document → Agenda
+        # Use document.agenda_id as the source of truth; look up page_range
+        # from the LLM's appears_in list if available.
+        for agenda_id in agenda_ids:
+            if not agenda_id:
+                continue
+            agenda_id = intern_str(agenda_id)
+            page_range = page_range_lookup.get((agenda_id, doc_id), "")
+            c["appears_in"].append((
+                agenda_id,
                 meeting_id,
-                safe_str(d.get("status")),
-                safe_str(d.get("source_path")),
+                release,
+                doc_id,
+                page_range,
             ))
 
-            # APPEARS_IN: Document → Agenda
-            # Use document.agenda_id as the source of truth; look up page_range
-            # from the LLM's appears_in list if available.
-            for agenda_id in agenda_ids:
-                if not agenda_id:
-                    continue
-                page_range = page_range_lookup.get((safe_str(agenda_id), doc_id), "")
-                appears_in_rels.add((
-                    safe_str(agenda_id),
-                    meeting_id,
-                    release,
-                    doc_id,
-                    page_range,
-                ))
-
-                # Accumulate topic text onto the Agenda node
-                key = (safe_str(agenda_id), meeting_id)
-                if topic:
-                    agenda_dict[key]["topics"].add(topic)
-                if not agenda_dict[key]["release"] and release:
-                    agenda_dict[key]["release"] = release
-
-        # ── References ────────────────────────────────────────────────────────
-        # Bug fix: attribute references to the FIRST document in the file, not
-        # to every document (old code nested this loop inside the doc loop,
-        # creating N copies of every reference for N documents in the file).
-        # Limitation: source_doc_id is not extracted by the LLM so we infer it.
-        references_list = data.get("references", [])
-        if references_list and doc_ids_in_file:
-            source_doc_id = doc_ids_in_file[0]
-            for rel in references_list:
-                cited = safe_str(rel.get("cited_doc_id", ""))
-                if not cited or cited == source_doc_id:
-                    continue  # skip empty or self-reference
-                references_rels.add((
-                    source_doc_id,
-                    cited,
-                    safe_str(rel.get("type_of_reference")),
-                    safe_str(rel.get("details", "")),
-                ))
-
-        # ── Technology Entities ───────────────────────────────────────────────
-        for te in data.get("technology_entities", []):
-            if not te.get("canonical_name"):
-                continue
-            tech_entities.add((
-                te["canonical_name"],
-                "|".join(clean_list(te.get("aliases", []))),
-                safe_str(te.get("description")),
+            # Accumulate topic text onto the Agenda node
+            c["agendas"].append(((agenda_id, meeting_id), topic, "", release))
+
+    # ── References ────────────────────────────────────────────────────────────
+    # Bug fix: attribute references to the FIRST document in the file, not
+    # to every document (old code nested this loop inside the doc loop,
+    # creating N copies of every reference for N documents in the file).
+    # Limitation: source_doc_id is not extracted by the LLM so we infer it.
+    references_list = data.get("references", [])
+    if references_list and doc_ids_in_file:
+        source_doc_id = doc_ids_in_file[0]
+        for rel in references_list:
+            cited = intern_str(rel.get("cited_doc_id", ""))
+            if not cited or cited == source_doc_id:
+                continue  # skip empty or self-reference
+            c["references"].append((
+                source_doc_id,
+                cited,
+                intern_str(rel.get("type_of_reference")),
+                safe_str(rel.get("details", "")),
             ))
 
-        # ── Working Groups (deduplicate by id+name, keep first description) ──
-        for wg in data.get("working_groups", []):
-            wg_id   = safe_str(wg.get("id"))
-            wg_name = safe_str(wg.get("name"))
-            if not wg_id:
-                continue
-            key = (wg_id, wg_name)
-            if key not in wg_dict:
-                wg_dict[key] = safe_str(wg.get("description", ""))
-
-        # ── Meetings ─────────────────────────────────────────────────────────
-        for m in data.get("meetings", []):
-            mid = safe_str(m.get("meeting_id", ""))
-            if not mid:
-                continue
-            meetings.add((mid, safe_str(m.get("venue", "")), safe_str(m.get("wg", "")), safe_str(m.get("topic", ""))))
-
-        # ── Agendas from the LLM's agendas list ──────────────────────────────
-        # Supplement the topic/description aggregation with the LLM's explicit
-        # agenda entries.  meeting_id is inferred from linked documents when
-        # the LLM doesn't fill it in.
-        for a in data.get("agendas", []):
-            agenda_id = safe_str(a.get("agenda_id", ""))
-            if not agenda_id:
-                continue
+    # ── Technology Entities ───────────────────────────────────────────────────
+    for te in data.get("technology_entities", []):
+        if not te.get("canonical_name"):
+            continue
+        c["tech_entities"].append((
+            intern_str(te["canonical_name"]),
+            "|".join(clean_list(te.get("aliases", []))),
+            safe_str(te.get("description")),
+        ))
+
+    # ── Working Groups (deduplicated by id+name when aggregated) ─────────────
+    for wg in data.get("working_groups", []):
+        wg_id   = intern_str(wg.get("id"))
+        wg_name = intern_str(wg.get("name"))
+        if not wg_id:
+            continue
+        c["working_groups"].append(((wg_id, wg_name), safe_str(wg.get("description", ""))))
+
+    # ── Meetings ─────────────────────────────────────────────────────────────
+    for m in data.get("meetings", []):
+        mid = intern_str(m.get("meeting_id", ""))
+        if not mid:
+            continue
+        c["meetings"].append((mid, intern_str(m.get("venue", "")), intern_str(m.get("wg", "")), safe_str(m.get("topic", ""))))
+
+    # ── Agendas from the LLM's agendas list ──────────────────────────────────
+    # Supplement the topic/description aggregation with the LLM's explicit
+    # agenda entries.  meeting_id is inferred from linked documents when
+    # the LLM doesn't fill it in.
+    for a in data.get("agendas", []):
+        agenda_id = intern_str(a.get("agenda_id", ""))
+        if not agenda_id:
+            continue
+
+        # Resolve meeting_id: use field if present, else infer from docs
+        mid = intern_str(a.get("meeting_id", ""))
+        if not mid:
+            for d in data.get("documents", []):
+                if agenda_id in [safe_str(x) for x in clean_list(d.get("agenda_id"))]:
+                    mid = intern_str(d.get("meeting_id", ""))
+                    break
+
+        c["agendas"].append((
+            (agenda_id, mid),
+            safe_str(a.get("topic", "")),
+            safe_str(a.get("description", "")),
+            intern_str(a.get("release", "")),
+        ))
+
+    # ── Authored ─────────────────────────────────────────────────────────────
+    for rel in data.get("authored", []):
+        name = intern_str(rel.get("contributor_name", ""))
+        did  = intern_str(rel.get("doc_id", ""))
+        if not name or not did:
+            continue
+        c["authored"].append((name, did, intern_str(rel.get("contribution_type", ""))))
+
+    # ── Mentions ─────────────────────────────────────────────────────────────
+    for rel in data.get("mentions", []):
+        did    = intern_str(rel.get("doc_id", ""))
+        entity = intern_str(rel.get("entity_name", ""))
+        if not did or not entity:
+            continue
+        c["mentions"].append((did, entity, safe_str(rel.get("context", "")), safe_str(rel.get("frequency", ""))))
+
+    # ── Belongs_to ───────────────────────────────────────────────────────────
+    for rel in data.get("belongs_to", []):
+        did = intern_str(rel.get("doc_id", ""))
+        wg  = intern_str(rel.get("wg_name", ""))
+        if not did or not wg:
+            continue
+        c["belongs_to"].append((did, wg, intern_str(rel.get("role_in_group", ""))))
+
+    return c
 
-            # Resolve meeting_id: use field if present, else infer from docs
-            mid = safe_str(a.get("meeting_id", ""))
-            if not mid:
-                for d in data.get("documents", []):
-                    if agenda_id in [safe_str(x) for x in clean_list(d.get("agenda_id"))]:
-                        mid = safe_str(d.get("meeting_id", ""))
-                        break
-
-            key = (agenda_id, mid)
-            t = safe_str(a.get("topic", ""))
-            desc = safe_str(a.get("description", ""))
-            if t:
-                agenda_dict[key]["topics"].add(t)
+
+# ── Bounded-memory containers ─────────────────────────────────────────────────
+
+def read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                return
+
+
+class SpillSet:
+    """
+    A set of tuples with at most max_rows of them in memory. A full buffer is
+    written to spill_dir as a sorted run; iterating merges the runs and the
+    buffer and skips duplicates, so it yields the distinct tuples in sorted
+    order. Supports the set operations the aggregation uses (add, update, |=,
+    len, iteration).
+    """
+
+    def __init__(self, spill_dir, max_rows=SPILL_ROWS):
+        self.spill_dir = spill_dir
+        self.max_rows = max_rows
+        self.buffer = set()
+        self.runs = []
+        self._len = None
+
+    def empty(self):
+        return SpillSet(self.spill_dir, self.max_rows)
+
+    def add(self, row):
+        self.buffer.add(row)
+        self._len = None
+        if len(self.buffer) >= self.max_rows:
+            self.spill()
+
+    def update(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def __ior__(self, other):
+        """Union in place; other's runs are taken over, so other must not be used afterwards."""
+        if isinstance(other, SpillSet):
+            self.runs.extend(other.runs)
+            other.runs = []
+            rows = other.buffer
+        else:
+            rows = other
+        self.update(rows)
+        self._len = None
+        if len(self.runs) > SPILL_MAX_RUNS:
+            self.compact()
+        return self
+
+    def write_run(self, rows):
+        fd, path = tempfile.mkstemp(suffix=".run", dir=self.spill_dir)
+        with os.fdopen(fd, "wb") as f:
+            rows = iter(rows)
+            while True:
+                chunk = list(islice(rows, 10_000))
+                if not chunk:
+                    break
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    def spill(self):
+        if self.buffer:
+            self.runs.append(self.write_run(sorted(self.buffer)))
+            self.buffer = set()
+        if len(self.runs) > SPILL_MAX_RUNS:
+            self.compact()
+
+    def compact(self):
+        """Merge every run into one."""
+        runs, self.runs = self.runs, []
+        merged = self.write_run(self.merged(runs, []))
+        for path in runs:
+            os.remove(path)
+        self.runs = [merged]
+
+    @staticmethod
+    def merged(runs, buffer):
+        previous = None
+        for row in heapq.merge(*(read_run(path) for path in runs), sorted(buffer)):
+            if row != previous:
+                yield row
+                previous = row
+
+    def __iter__(self):
+        return self.merged(self.runs, self.buffer)
+
+    def __len__(self):
+        if self._len is None:
+            self._len = sum(1 for _ in self)
+        return self._len
+
+    def close(self):
+        for path in self.runs:
+            os.remove(path)
+        self.runs, self.buffer = [], set()
+
+
+def empty_like(rows):
+    return rows.empty() if isinstance(rows, SpillSet) else set()
+
+def release(rows):
+    """Delete a replaced SpillSet's runs (nothing to do for an in-memory set)."""
+    if isinstance(rows, SpillSet):
+        rows.close()
+
+def keep(rows, predicate):
+    """The rows for which predicate holds, in a container of the same kind."""
+    kept = empty_like(rows)
+    kept.update(row for row in rows if predicate(row))
+    release(rows)
+    return kept
+
+def sort_by(rows, key):
+    """Rows ordered by (key(row), row): sorted() for a set, an external merge sort for a SpillSet."""
+    if not isinstance(rows, SpillSet):
+        return sorted(rows, key=lambda row: (key(row), row))
+    keyed = rows.empty()
+    keyed.update((key(row), row) for row in rows)
+    return (row for _, row in keyed)
+
+
+# ── Aggregation ───────────────────────────────────────────────────────────────
+
+class Aggregate:
+    """
+    The global node and relationship containers, built from file contributions.
+    With a spill_dir the node and relationship sets are SpillSets.
+    """
+
+    def __init__(self, spill_dir=None):
+        new_set = bind(SpillSet, spill_dir) if spill_dir else set
+        # ── Node containers ──────────────────────────────────────────────────
+        self.authors       = new_set()
+        self.documents     = new_set()
+        self.tech_entities = new_set()
+        self.meetings      = new_set()
+        # WorkingGroup: key=(id, name) → description  (first-seen wins)
+        self.wg_dict: dict = {}
+        # Agenda: key=(agenda_id, meeting_id) → {'topics': set, 'descriptions': set, 'release': str}
+        self.agenda_dict: dict = defaultdict(new_agenda)
+
+        # ── Relationship containers ──────────────────────────────────────────
+        self.authored_rels   = new_set()
+        self.mentions_rels   = new_set()
+        self.belongs_to_rels = new_set()
+        self.references_rels = new_set()
+        # appears_in includes meeting_id for proper Agenda MERGE in LOAD CSV
+        self.appears_in_rels = new_set()
+
+    def add(self, c):
+        self.authors.update(c["authors"])
+        self.documents.update(c["documents"])
+        self.tech_entities.update(c["tech_entities"])
+        self.meetings.update(c["meetings"])
+        for key, desc in c["working_groups"]:
+            if key not in self.wg_dict:
+                self.wg_dict[key] = desc
+        for key, topic, desc, release in c["agendas"]:
+            agenda = self.agenda_dict[key]
+            if topic:
+                agenda["topics"].add(topic)
             if desc:
-                agenda_dict[key]["descriptions"].add(desc)
-            rel = safe_str(a.get("release", ""))
-            if rel and not agenda_dict[key]["release"]:
-                agenda_dict[key]["release"] = rel
-
-        # ── Authored ─────────────────────────────────────────────────────────
-        for rel in data.get("authored", []):
-            name = safe_str(rel.get("contributor_name", ""))
-            did  = safe_str(rel.get("doc_id", ""))
-            if not name or not did:
-                continue
-            authored_rels.add((name, did, safe_str(rel.get("contribution_type", ""))))
+                agenda["descriptions"].add(desc)
+            if release and not agenda["release"]:
+                agenda["release"] = release
+        self.authored_rels.update(c["authored"])
+        self.mentions_rels.update(c["mentions"])
+        self.belongs_to_rels.update(c["belongs_to"])
+        self.references_rels.update(c["references"])
+        self.appears_in_rels.update(c["appears_in"])
 
-        # ── Mentions ─────────────────────────────────────────────────────────
-        for rel in data.get("mentions", []):
-            did    = safe_str(rel.get("doc_id", ""))
-            entity = safe_str(rel.get("entity_name", ""))
-            if not did or not entity:
-                continue
-            mentions_rels.add((did, entity, safe_str(rel.get("context", "")), safe_str(rel.get("frequency", ""))))
+    def merge(self, other):
+        """
+        Reduce step: fold in the Aggregate of a later shard. Same result as
+        add()-ing the later shard's contributions one by one: sets are unioned,
+        the earlier WorkingGroup description wins, agenda topics/descriptions
+        are unioned and an empty agenda release is filled in from the later one.
+        """
+        self.authors |= other.authors
+        self.documents |= other.documents
+        self.tech_entities |= other.tech_entities
+        self.meetings |= other.meetings
+        for key, desc in other.wg_dict.items():
+            if key not in self.wg_dict:
+                self.wg_dict[key] = desc
+        for key, info in other.agenda_dict.items():
+            agenda = self.agenda_dict[key]
+            agenda["topics"] |= info["topics"]
+            agenda["descriptions"] |= info["descriptions"]
+            if info["release"] and not agenda["release"]:
+                agenda["release"] = info["release"]
+        self.authored_rels |= other.authored_rels
+        self.mentions_rels |= other.mentions_rels
+        self.belongs_to_rels |= other.belongs_to_rels
+        self.references_rels |= other.references_rels
+        self.appears_in_rels |= other.appears_in_rels
+
+
+# ── Entity resolution ─────────────────────────────────────────────────────────
+#
+# The LLM extracts MENTIONS.entity_name and AUTHORED.contributor_name
+# independently of the TechnologyEntity / Contributor nodes, so the same thing
+# often appears as "Channel State Information (CSI)" on one side and "CSI" or
+# "csi" on the other. Names are folded to lower-case alphanumerics and looked
+# up first against canonical names, then against aliases and the parts of a
+# "Long Name (ABBR)" name. A name that matches several different nodes
+# through aliases (e.g. "Moderator") is left as it is.
+
+_LONG_ABBR = re.compile(r"^(.+?)\s*\(([^()]+)\)\s*$")
+
+def fold_name(name):
+    return "".join(ch for ch in unicodedata.normalize("NFKC", name).casefold() if ch.isalnum())
+
+def name_parts(name):
+    m = _LONG_ABBR.match(name)
+    return [m.group(1), m.group(2)] if m else []
+
+
+class AliasIndex:
+    """Folded name → canonical node names, in two tiers: canonical names and aliases."""
+
+    def __init__(self):
+        self.canonical: dict = defaultdict(set)
+        self.alias: dict = defaultdict(set)
+
+    def add(self, canonical, aliases):
+        if fold_name(canonical):
+            self.canonical[fold_name(canonical)].add(canonical)
+        for variant in name_parts(canonical) + [a for alias in aliases for a in [alias] + name_parts(alias)]:
+            if fold_name(variant):
+                self.alias[fold_name(variant)].add(canonical)
+
+    def resolve(self, name):
+        """Return (canonical name or None, how): how is exact/alias/ambiguous/unresolved."""
+        for variants in ([name], name_parts(name)):
+            keys = [fold_name(v) for v in variants if fold_name(v)]
+            exact = set().union(*(self.canonical.get(k, set()) for k in keys))
+            if exact:
+                # Several nodes spelled the same after folding are one entity; pick deterministically
+                return min(exact), "exact" if name in exact else "alias"
+            via_alias = set().union(*(self.alias.get(k, set()) for k in keys))
+            if len(via_alias) == 1:
+                return next(iter(via_alias)), "alias"
+            if via_alias:
+                return None, "ambiguous"
+        return None, "unresolved"
+
+
+def resolve_rels(rels, index, pos):
+    """Rewrite the name at tuple position pos to its canonical name; returns (new set, counts)."""
+    resolved, counts = empty_like(rels), defaultdict(int)
+    for rel in rels:
+        canonical, how = index.resolve(rel[pos])
+        counts[how] += 1
+        if canonical is not None and canonical != rel[pos]:
+            rel = rel[:pos] + (canonical,) + rel[pos + 1:]
+        resolved.add(rel)
+    release(rels)
+    return resolved, counts
+
+def resolve_entities(agg):
+    """Point MENTIONS at TechnologyEntity canonical names and AUTHORED at Contributor names."""
+    entities = AliasIndex()
+    for name, aliases, _ in sorted(agg.tech_entities):
+        entities.add(name, aliases.split("|") if aliases else [])
+    contributors = AliasIndex()
+    for name, aliases in sorted(agg.authors):
+        contributors.add(name, aliases.split("|") if aliases else [])
+
+    agg.mentions_rels, mention_counts = resolve_rels(agg.mentions_rels, entities, 1)
+    agg.authored_rels, authored_counts = resolve_rels(agg.authored_rels, contributors, 0)
+    for label, counts in (("mentions", mention_counts), ("authored", authored_counts)):
+        print(f"  entity resolution ({label}): " + ", ".join(
+            f"{how}={counts.get(how, 0)}" for how in ("exact", "alias", "ambiguous", "unresolved")))
+
+
+# ── Pre-import dedup ──────────────────────────────────────────────────────────
+#
+# The containers are sets of full tuples, so the same node or the same
+# endpoint pair shows up once per distinct property combination (a MENTIONS
+# per context/frequency, a Document per file that extracted it). LOAD CSV's
+# MERGE then creates duplicate edges, which the old post-import cleanup had to
+# find with whole-graph collect() scans. Here every node is collapsed to one
+# row per key and every relationship to one row per endpoint pair, merging
+# their properties; then relationships without both endpoints and nodes left
+# without relationships are dropped, so the CSVs are import-ready as written.
+
+def collapse(rows, key, merge):
+    """Group rows by key(row) and merge each group (rows in sorted order) into one row."""
+    collapsed = empty_like(rows)
+    for _, group in groupby(sort_by(rows, key), key):
+        collapsed.add(merge(list(group)))
+    release(rows)
+    return collapsed
+
+def merge_columns(group, arrays=(), joined=(), maximum=()):
+    """Column-wise merge: arrays unioned, joined columns as distinct '; ' lists, others first non-empty."""
+    merged = []
+    for i, values in enumerate(zip(*group)):
+        if i in arrays:
+            merged.append(merge_arrays(*values))
+        elif i in joined:
+            merged.append(join_distinct(values))
+        elif i in maximum:
+            numbers = [int(float(v)) for v in values if v.replace(".", "", 1).isdigit()]
+            merged.append(str(max(numbers)) if numbers else "")
+        else:
+            merged.append(first_nonempty(values))
+    return tuple(merged)
+
+def collapse_duplicates(agg):
+    before = {name: len(getattr(agg, name)) for name in (
+        "documents", "authors", "tech_entities", "meetings",
+        "authored_rels", "mentions_rels", "belongs_to_rels", "references_rels", "appears_in_rels")}
+
+    # Nodes: one row per key
+    agg.documents = collapse(agg.documents, lambda r: r[0], lambda g: merge_columns(g, arrays=(5, 8)))
+    agg.authors = collapse(agg.authors, lambda r: r[0], lambda g: merge_columns(g, arrays=(1,)))
+    agg.tech_entities = collapse(agg.tech_entities, lambda r: r[0], lambda g: merge_columns(g, arrays=(1,)))
+    agg.meetings = collapse(agg.meetings, lambda r: r[0], merge_columns)
+    # WorkingGroups are MERGEd on id alone: keep the first (id, name) per id
+    wg_dict, seen_ids = {}, set()
+    for (wg_id, wg_name), desc in agg.wg_dict.items():
+        if wg_id not in seen_ids:
+            seen_ids.add(wg_id)
+            wg_dict[(wg_id, wg_name)] = desc
+    agg.wg_dict = wg_dict
+
+    # Relationships: one row per endpoint pair
+    agg.authored_rels = collapse(agg.authored_rels, lambda r: r[:2], lambda g: merge_columns(g, joined=(2,)))
+    agg.mentions_rels = collapse(agg.mentions_rels, lambda r: r[:2],
+                                 lambda g: merge_columns(g, joined=(2,), maximum=(3,)))
+    agg.belongs_to_rels = collapse(agg.belongs_to_rels, lambda r: r[:2], lambda g: merge_columns(g, joined=(2,)))
+    agg.references_rels = collapse(agg.references_rels, lambda r: r[:2], lambda g: merge_columns(g, joined=(2, 3)))
+    agg.appears_in_rels = collapse(agg.appears_in_rels, lambda r: (r[0], r[1], r[3]),
+                                   lambda g: merge_columns(g, joined=(4,)))
+
+    # Relationships need both endpoints (LOAD CSV's MATCH would skip them anyway)
+    docs = {r[0] for r in agg.documents}
+    entities = {r[0] for r in agg.tech_entities}
+    contributors = {r[0] for r in agg.authors}
+    wg_ids = {wg_id for wg_id, _ in agg.wg_dict}
+    agg.authored_rels = keep(agg.authored_rels, lambda r: r[0] in contributors and r[1] in docs)
+    agg.mentions_rels = keep(agg.mentions_rels, lambda r: r[0] in docs and r[1] in entities)
+    agg.belongs_to_rels = keep(agg.belongs_to_rels, lambda r: r[0] in docs and r[1] in wg_ids)
+    agg.references_rels = keep(agg.references_rels, lambda r: r[0] in docs and r[1] in docs and r[0] != r[1])
+    agg.appears_in_rels = keep(agg.appears_in_rels, lambda r: r[3] in docs and (r[0], r[1]) in agg.agenda_dict)
 
-        # ── Belongs_to ───────────────────────────────────────────────────────
-        for rel in data.get("belongs_to", []):
-            did = safe_str(rel.get("doc_id", ""))
-            wg  = safe_str(rel.get("wg_name", ""))
-            if not did or not wg:
+    # Orphans: the same sweeps the post-import cleanup ran
+    mentioned = {r[1] for r in agg.mentions_rels}
+    authoring = {r[0] for r in agg.authored_rels}
+    agg.tech_entities = keep(agg.tech_entities, lambda r: r[0] in mentioned)
+    agg.authors = keep(agg.authors, lambda r: r[0] in authoring)
+    linked = ({r[1] for r in agg.authored_rels} | {r[0] for r in agg.mentions_rels}
+              | {r[0] for r in agg.belongs_to_rels} | {r[3] for r in agg.appears_in_rels}
+              | {r[0] for r in agg.references_rels} | {r[1] for r in agg.references_rels})
+    agg.documents = keep(agg.documents, lambda r: r[0] in linked)
+
+    print("  dedup/orphans removed: " + ", ".join(
+        f"{name}={n - len(getattr(agg, name))}" for name, n in before.items()))
+
+
+# ── Key normalization ─────────────────────────────────────────────────────────
+#
+# The keys themselves are computed per row when the tables are built
+# (document_keys / meeting_keys / the agendas table); this stage only reports
+# how much of each raw column mapped and lists the values that did not.
+
+def report_normalization(agg):
+    counts = {field: defaultdict(int) for field in NORMALIZERS}
+    for row in agg.documents:
+        counts["release"][row[3]] += 1
+        counts["type"][row[4]] += 1
+        counts["meeting_id"][row[9]] += 1
+    for row in agg.meetings:
+        counts["meeting_id"][row[0]] += 1
+    for (_, mid), info in agg.agenda_dict.items():
+        counts["meeting_id"][mid] += 1
+        counts["release"][info["release"]] += 1
+
+    unmapped = []
+    for field, values in counts.items():
+        normalize = NORMALIZERS[field]
+        filled = {value: n for value, n in values.items() if value}
+        missed = {value: n for value, n in filled.items() if not normalize(value)}
+        total = sum(filled.values())
+        if total:
+            print(f"  normalized {field}: {1 - sum(missed.values()) / total:.1%} of {total} non-empty values mapped, "
+                  f"{len(missed)} distinct values unmapped")
+        unmapped += [{"field": field, "value": value, "rows": n}
+                     for value, n in sorted(missed.items(), key=lambda item: (-item[1], item[0]))]
+
+    # Keys must map to themselves, or a user typing the key form matches another meeting
+    unstable = sorted({value for value in counts["meeting_id"] if meeting_key(value)
+                       and meeting_key(meeting_key(value)) != meeting_key(value)})
+    if unstable:
+        print(f"  WARNING: {len(unstable)} meeting_id values give a meeting_key that doesn't map to itself")
+    unmapped += [{"field": "meeting_key round trip", "value": value, "rows": counts["meeting_id"][value]}
+                 for value in unstable]
+
+    with open(NORMALIZATION_REPORT, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["field", "value", "rows"])
+        writer.writeheader()
+        writer.writerows(unmapped)
+
+
+# ── Manifest and persisted state ──────────────────────────────────────────────
+
+def list_json_files(folder):
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        for file in files:
+            if file.endswith(".json"):
+                paths.append(os.path.join(root, file))
+    return paths
+
+def load_state(low_memory=False):
+    try:
+        with open(STATE_PATH, "rb") as f:
+            state = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    if state.get("version") != STATE_VERSION or state.get("input_folder") != INPUT_FOLDER:
+        return None
+    # Contributions saved by the other mode are not where this run looks for them
+    if state.get("low_memory", False) != low_memory:
+        return None
+    return state
+
+def open_contributions(state, low_memory):
+    """path → parse_file() result: the state's dict, or with low_memory the on-disk shelf."""
+    if not low_memory:
+        return state["contributions"] if state else {}
+    return shelve.open(CONTRIBUTIONS_PATH, flag="c" if state else "n", protocol=pickle.HIGHEST_PROTOCOL)
+
+def save_state(manifest, contributions):
+    low_memory = isinstance(contributions, shelve.Shelf)
+    if low_memory:
+        contributions.sync()
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({
+            "version": STATE_VERSION,
+            "input_folder": INPUT_FOLDER,
+            "low_memory": low_memory,
+            "manifest": manifest,            # path → (mtime_ns, size, hash)
+            # path → parse_file() result; in CONTRIBUTIONS_PATH with low_memory
+            "contributions": None if low_memory else contributions,
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, STATE_PATH)
+
+_UNCHANGED = "unchanged"
+
+def parse_shard(items, spill_dir=None):
+    """
+    Map step: hash and parse a contiguous shard of (path, previous_hash) pairs.
+    Returns the per-file results [(path, manifest_entry, contribution)] and a
+    partial Aggregate of the shard's contributions in shard order. Files whose
+    hash matches previous_hash are not parsed (contribution is _UNCHANGED).
+    """
+    results = []
+    partial = Aggregate(spill_dir)
+    for path, previous_hash in items:
+        stat = os.stat(path)
+        digest = file_hash(path)
+        entry = (stat.st_mtime_ns, stat.st_size, digest)
+        if digest == previous_hash:
+            results.append((path, entry, _UNCHANGED))
+            continue
+        contribution = parse_file(path)
+        if contribution is not None:
+            partial.add(contribution)
+        results.append((path, entry, contribution))
+    return results, partial
+
+def shard(items, workers):
+    """Contiguous shards, a few per worker so one slow shard doesn't hold up the pool."""
+    if not items:
+        return []
+    size = max(1, -(-len(items) // (workers * SHARDS_PER_WORKER)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def update_contributions(manifest, contributions, paths, workers=1, spill_dir=None):
+    """
+    Re-parse new and changed files, forget deleted ones. A file whose mtime or
+    size changed but whose content hash did not is not re-parsed. With
+    workers > 1 and at least PARALLEL_MIN_FILES to parse, shards are parsed in
+    a process pool. Returns (added, changed, removed, partial) where partial is
+    the shard Aggregates merged in shard order (spilling to spill_dir if set).
+    """
+    to_parse = []
+    for path in sorted(paths):
+        stat = os.stat(path)
+        entry = manifest.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            continue
+        to_parse.append((path, entry[2] if entry else None))
+
+    shards = shard(to_parse, workers)
+    if workers > 1 and len(to_parse) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shard_results = list(pool.map(bind(parse_shard, spill_dir=spill_dir), shards))  # map keeps shard order
+    else:
+        shard_results = [parse_shard(items, spill_dir) for items in shards]
+
+    added = changed = 0
+    partial = Aggregate(spill_dir)
+    for results, shard_partial in shard_results:
+        partial.merge(shard_partial)
+        for path, entry, contribution in results:
+            if contribution is _UNCHANGED:
+                manifest[path] = entry
                 continue
-            belongs_to_rels.add((did, wg, safe_str(rel.get("role_in_group", ""))))
+            if path in manifest:
+                changed += 1
+            else:
+                added += 1
+            manifest[path] = entry
+            contributions[path] = contribution
+
+    removed = set(manifest) - set(paths)
+    for path in removed:
+        del manifest[path]
+        contributions.pop(path, None)
+    return added, changed, len(removed), partial
+
+
+# ── Write CSVs ────────────────────────────────────────────────────────────────
+
+def to_row(fieldnames, row, keys=None):
+    fields = dict(zip(fieldnames, row))
+    if keys:
+        fields.update(keys(row))
+    return fields
+
+class SortedRows:
+    """CSV rows (dicts) over a SpillSet, re-iterable and already in sorted order."""
+
+    def __init__(self, fieldnames, rows, keys=None):
+        self.fieldnames = fieldnames
+        self.rows = rows
+        self.keys = keys
+
+    def __iter__(self):
+        return (to_row(self.fieldnames, row, self.keys) for row in self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+def table_rows(fieldnames, rows, keys=None):
+    """
+    Tuples whose fields are in fieldnames order → CSV rows. keys(row) returns
+    the derived columns that follow the tuple's fields in fieldnames.
+    """
+    if isinstance(rows, SpillSet):
+        return SortedRows(fieldnames, rows, keys)
+    return [to_row(fieldnames, row, keys) for row in rows]
+
+def document_keys(row):
+    return {"release_num": release_num(row[3]), "meeting_key": meeting_key(row[9]), "doc_class": doc_class(row[4])}
+
+def meeting_keys(row):
+    return {"meeting_key": meeting_key(row[0])}
+
+def csv_tables(agg):
+    """(filename, fieldnames, rows) for each of the 11 CSVs; rows are dicts of strings."""
+    tables = []
+
+    # ── Node CSVs ────────────────────────────────────────────────────────────
+
+    tables.append(("authors.csv", ["name", "aliases"], table_rows(["name", "aliases"], agg.authors)))
+
+    documents_fields = [
+        "doc_id", "version", "title", "release", "type", "tags",
+        "summary", "topic", "keywords", "meeting_id", "status", "source_path",
+        "release_num", "meeting_key", "doc_class",
+    ]
+    tables.append(("documents.csv", documents_fields, table_rows(documents_fields, agg.documents, document_keys)))
+
+    tables.append(("technology_entities.csv", ["canonical_name", "aliases", "description"],
+                   table_rows(["canonical_name", "aliases", "description"], agg.tech_entities)))
+
+    tables.append(("working_groups.csv", ["id", "name", "description"], [
+        {"id": wg_id, "name": wg_name, "description": desc}
+        for (wg_id, wg_name), desc in agg.wg_dict.items()
+    ]))
+
+    tables.append(("meetings.csv", ["meeting_id", "venue", "wg", "topic", "meeting_key"],
+                   table_rows(["meeting_id", "venue", "wg", "topic", "meeting_key"], agg.meetings, meeting_keys)))
+
+    # Agendas: one row per (agenda_id, meeting_id).
+    # topics and descriptions are semicolon-separated unique values aggregated from
+    # all documents that reference this agenda item at this meeting.
+    # Column names are topics/descriptions (plural) to match live Neo4j properties
+    # and the full-text index definition.
+    tables.append(("agendas.csv", [
+        "agenda_id", "meeting_id", "release", "topics", "descriptions", "release_num", "meeting_key",
+    ], [
+        {
+            "agenda_id":    agenda_id,
+            "meeting_id":   meeting_id,
+            "release":      info["release"],
+            "topics":       "; ".join(sorted(info["topics"])),
+            "descriptions": "; ".join(sorted(info["descriptions"])),
+            "release_num":  release_num(info["release"]),
+            "meeting_key":  meeting_key(meeting_id),
+        }
+        for (agenda_id, meeting_id), info in sorted(agg.agenda_dict.items())
+    ]))
+
+    # ── Relationship CSVs ────────────────────────────────────────────────────
+
+    tables.append(("authored.csv", ["contributor_name", "doc_id", "contribution_type"],
+                   table_rows(["contributor_name", "doc_id", "contribution_type"], agg.authored_rels)))
+
+    tables.append(("mentions.csv", ["doc_id", "entity_name", "context", "frequency"],
+                   table_rows(["doc_id", "entity_name", "context", "frequency"], agg.mentions_rels)))
+
+    tables.append(("belongs_to.csv", ["doc_id", "wg_name", "role_in_group"],
+                   table_rows(["doc_id", "wg_name", "role_in_group"], agg.belongs_to_rels)))
+
+    tables.append(("references.csv", ["source_doc_id", "cited_doc_id", "type_of_reference", "details"],
+                   table_rows(["source_doc_id", "cited_doc_id", "type_of_reference", "details"], agg.references_rels)))
+
+    # appears_in now includes meeting_id so LOAD CSV can MERGE Agenda on
+    # the composite key (agenda_id, meeting_id).
+    tables.append(("appears_in.csv", ["agenda_id", "meeting_id", "release", "doc_id", "page_range"],
+                   table_rows(["agenda_id", "meeting_id", "release", "doc_id", "page_range"], agg.appears_in_rels)))
+
+    # Sorted output, so consecutive generations can be diffed line by line
+    # (SortedRows already iterate in this order: fields are in tuple order)
+    for _, fieldnames, rows in tables:
+        if isinstance(rows, list):
+            rows.sort(key=lambda row: tuple(row[f] for f in fieldnames))
+    return tables
+
+
+def write_outputs(tables):
+    for filename, fieldnames, rows in tables:
+        write_csv(filename, fieldnames, rows)
+
+
+# ── Delta against the previous generation ─────────────────────────────────────
+#
+# With --delta the CSVs already in OUTPUT_FOLDER are the previous snapshot.
+# Rows are matched on their node key / relationship endpoints (the whole row
+# when a key is not unique, e.g. with COLLAPSE_DUPLICATES off) and written to
+# DELTA_FOLDER as <table>.added / .removed / .changed_new / .changed_old CSVs.
+# apply.cypher deletes the removed rows and upserts the added and changed_new
+# ones; retract.cypher is the same with the roles swapped, restoring the
+# previous snapshot. Only the touched nodes and edges are written.
 
+# file → (label, key columns)
+DELTA_NODES = {
+    "documents.csv": ("Document", ["doc_id"]),
+    "authors.csv": ("Contributor", ["name"]),
+    "technology_entities.csv": ("TechnologyEntity", ["canonical_name"]),
+    "working_groups.csv": ("WorkingGroup", ["id"]),
+    "meetings.csv": ("Meeting", ["meeting_id"]),
+    "agendas.csv": ("Agenda", ["agenda_id", "meeting_id"]),
+}
+# file → (type, (start label, {node key: column}), (end label, {node key: column}))
+DELTA_RELATIONSHIPS = {
+    "authored.csv": ("AUTHORED", ("Contributor", {"name": "contributor_name"}), ("Document", {"doc_id": "doc_id"})),
+    "mentions.csv": ("MENTIONS", ("Document", {"doc_id": "doc_id"}),
+                     ("TechnologyEntity", {"canonical_name": "entity_name"})),
+    "belongs_to.csv": ("BELONGS_TO", ("Document", {"doc_id": "doc_id"}), ("WorkingGroup", {"id": "wg_name"})),
+    "references.csv": ("REFERENCES", ("Document", {"doc_id": "source_doc_id"}),
+                       ("Document", {"doc_id": "cited_doc_id"})),
+    "appears_in.csv": ("APPEARS_IN", ("Document", {"doc_id": "doc_id"}),
+                       ("Agenda", {"agenda_id": "agenda_id", "meeting_id": "meeting_id"})),
+}
+DELTA_KINDS = ("added", "removed", "changed_new", "changed_old")
 
-# ── Write Node CSVs ───────────────────────────────────────────────────────────
+def read_previous_tables(fieldnames_by_file):
+    """The CSVs currently in OUTPUT_FOLDER, projected onto the current columns."""
+    tables = {}
+    for filename, fieldnames in fieldnames_by_file.items():
+        try:
+            with open(os.path.join(OUTPUT_FOLDER, filename), newline="", encoding="utf-8") as f:
+                tables[filename] = [{k: row.get(k) or "" for k in fieldnames} for row in csv.DictReader(f)]
+        except FileNotFoundError:
+            tables[filename] = []
+    return tables
 
-write_csv("authors.csv", ["name", "aliases"], [
-    {"name": name, "aliases": aliases}
-    for name, aliases in authors
-])
+def delta_key_columns(filename):
+    if filename in DELTA_NODES:
+        return DELTA_NODES[filename][1]
+    _, (_, start), (_, end) = DELTA_RELATIONSHIPS[filename]
+    return list(start.values()) + list(end.values())
 
-write_csv("documents.csv", [
-    "doc_id", "version", "title", "release", "type", "tags",
-    "summary", "topic", "keywords", "meeting_id", "status", "source_path",
-], [
-    {
-        "doc_id": doc_id, "version": ver, "title": title, "release": rel,
-        "type": typ, "tags": tags, "summary": summ, "topic": topic,
-        "keywords": kw, "meeting_id": mid, "status": status, "source_path": link,
+def diff_table(old_rows, new_rows, fieldnames, key_columns):
+    def index(rows, columns):
+        return {tuple(row[c] for c in columns): row for row in rows}
+
+    old, new = index(old_rows, key_columns), index(new_rows, key_columns)
+    if len(old) != len(old_rows) or len(new) != len(new_rows):
+        # Key not unique in this generation: fall back to whole-row identity
+        old, new = index(old_rows, fieldnames), index(new_rows, fieldnames)
+    return {
+        "added": [new[k] for k in sorted(new.keys() - old.keys())],
+        "removed": [old[k] for k in sorted(old.keys() - new.keys())],
+        "changed_new": [new[k] for k in sorted(new.keys() & old.keys()) if new[k] != old[k]],
+        "changed_old": [old[k] for k in sorted(new.keys() & old.keys()) if new[k] != old[k]],
+    }
+
+def cypher_value(column):
+    if column in ("tags", "keywords", "aliases"):
+        return f"split(row.{column}, '{ARRAY_DELIMITER}')"
+    if column in ("frequency", "release_num"):
+        return f"toIntegerOrNull(row.{column})"
+    return f"row.{column}"
+
+def delta_statement(filename, fieldnames, kind_file, upsert):
+    load = f"LOAD CSV WITH HEADERS FROM 'file:///{os.path.basename(DELTA_FOLDER)}/{kind_file}' AS row\n"
+    if filename in DELTA_NODES:
+        label, keys = DELTA_NODES[filename]
+        match = f"(n:{label} {{{', '.join(f'{k}: row.{k}' for k in keys)}}})"
+        if not upsert:
+            return load + f"MATCH {match}\nDETACH DELETE n;"
+        sets = ", ".join(f"n.{c} = {cypher_value(c)}" for c in fieldnames if c not in keys)
+        return load + f"MERGE {match}" + (f"\nSET {sets};" if sets else ";")
+
+    rel_type, (start_label, start), (end_label, end) = DELTA_RELATIONSHIPS[filename]
+    start_map = ", ".join(f"{k}: row.{c}" for k, c in start.items())
+    end_map = ", ".join(f"{k}: row.{c}" for k, c in end.items())
+    if not upsert:
+        return load + f"MATCH (s:{start_label} {{{start_map}}})-[r:{rel_type}]->(e:{end_label} {{{end_map}}})\nDELETE r;"
+    props = [c for c in fieldnames if c not in set(start.values()) | set(end.values())]
+    sets = ", ".join(f"r.{c} = {cypher_value(c)}" for c in props)
+    return (load + f"MATCH (s:{start_label} {{{start_map}}})\nMATCH (e:{end_label} {{{end_map}}})\n"
+            + f"MERGE (s)-[r:{rel_type}]->(e)" + (f"\nSET {sets};" if sets else ";"))
+
+def delta_script(diffs, fieldnames_by_file, deletes, upserts):
+    """Relationship deletes, node deletes, node upserts, relationship upserts — in that order."""
+    node_files = [f for f in fieldnames_by_file if f in DELTA_NODES]
+    rel_files = [f for f in fieldnames_by_file if f in DELTA_RELATIONSHIPS]
+    steps = [(rel_files, deletes, False), (node_files, deletes, False),
+             (node_files, upserts, True), (rel_files, upserts, True)]
+    statements = []
+    for files, kinds, upsert in steps:
+        for filename in files:
+            for kind in kinds:
+                if diffs[filename][kind]:
+                    kind_file = filename.replace(".csv", f".{kind}.csv")
+                    statements.append(delta_statement(filename, fieldnames_by_file[filename], kind_file, upsert))
+    return "\n\n".join(statements) + "\n"
+
+def write_delta(previous, tables):
+    """Diff the new tables against the previous generation and write DELTA_FOLDER."""
+    os.makedirs(DELTA_FOLDER, exist_ok=True)
+    for name in os.listdir(DELTA_FOLDER):
+        os.remove(os.path.join(DELTA_FOLDER, name))
+
+    fieldnames_by_file = {filename: fieldnames for filename, fieldnames, _ in tables}
+    diffs = {}
+    for filename, fieldnames, rows in tables:
+        diffs[filename] = diff_table(previous[filename], rows, fieldnames, delta_key_columns(filename))
+        for kind, kind_rows in diffs[filename].items():
+            if kind_rows:
+                with open(os.path.join(DELTA_FOLDER, filename.replace(".csv", f".{kind}.csv")),
+                          "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(kind_rows)
+
+    with open(os.path.join(DELTA_FOLDER, "apply.cypher"), "w", encoding="utf-8") as f:
+        f.write(delta_script(diffs, fieldnames_by_file, ["removed"], ["added", "changed_new"]))
+    with open(os.path.join(DELTA_FOLDER, "retract.cypher"), "w", encoding="utf-8") as f:
+        f.write(delta_script(diffs, fieldnames_by_file, ["added"], ["removed", "changed_old"]))
+
+    print(f"Delta written to: {DELTA_FOLDER}")
+    for filename, diff in diffs.items():
+        if any(diff.values()):
+            print(f"  {filename:<24} +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['changed_new'])}")
+
+
+# ── Columnar export (optional pyarrow) ────────────────────────────────────────
+#
+# The same 11 tables as typed Arrow columns: pipe-joined arrays and the
+# "; "-joined agenda topics/descriptions become list<string>, release /
+# meeting_id / type and their normalized keys are dictionary-encoded (a few
+# hundred distinct values over ~10k rows), frequency and release_num are
+# integers. Parquet files are zstd-compressed, the
+# long text columns at a higher level. --arrow additionally writes
+# uncompressed Arrow IPC files that can be memory-mapped and column-projected
+# without reading the whole table.
+
+LIST_COLUMNS = {"tags": ARRAY_DELIMITER, "keywords": ARRAY_DELIMITER, "aliases": ARRAY_DELIMITER,
+                "topics": "; ", "descriptions": "; "}
+DICTIONARY_COLUMNS = {"release", "meeting_id", "type", "meeting_key", "doc_class"}
+INT_COLUMNS = {"frequency", "release_num"}
+TEXT_COLUMNS = {"summary", "description", "details", "context"}
+PARQUET_COMPRESSION_LEVEL = 3
+PARQUET_TEXT_COMPRESSION_LEVEL = 9
+
+def arrow_table(fieldnames, rows):
+    import pyarrow as pa
+
+    columns = {}
+    for name in fieldnames:
+        values = [row[name] for row in rows]
+        if name in LIST_COLUMNS:
+            sep = LIST_COLUMNS[name]
+            columns[name] = pa.array([[v for v in value.split(sep) if v] if value else [] for value in values],
+                                     type=pa.list_(pa.string()))
+        elif name in DICTIONARY_COLUMNS:
+            columns[name] = pa.array(values, type=pa.string()).dictionary_encode()
+        elif name in INT_COLUMNS:
+            columns[name] = pa.array([int(v) if v.isdigit() else None for v in values], type=pa.int32())
+        else:
+            columns[name] = pa.array(values, type=pa.string())
+    return pa.table(columns)
+
+def write_columnar(tables, arrow_ipc=False):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("  pyarrow is not installed; skipping the Parquet/Arrow export (pip install pyarrow)")
+        return
+
+    os.makedirs(PARQUET_FOLDER, exist_ok=True)
+    for filename, fieldnames, rows in tables:
+        table = arrow_table(fieldnames, rows)
+        stem = filename[:-len(".csv")]
+        levels = {name: PARQUET_TEXT_COMPRESSION_LEVEL if name in TEXT_COLUMNS else PARQUET_COMPRESSION_LEVEL
+                  for name in fieldnames}
+        pq.write_table(table, os.path.join(PARQUET_FOLDER, f"{stem}.parquet"),
+                       compression="zstd", compression_level=levels)
+        if arrow_ipc:
+            with pa.OSFile(os.path.join(PARQUET_FOLDER, f"{stem}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+    print(f"Parquet{' + Arrow IPC' if arrow_ipc else ''} files written to: {PARQUET_FOLDER}")
+
+
+# ── neo4j-admin bulk-import layout ────────────────────────────────────────────
+#
+# `neo4j-admin database import full` builds the store directly from CSVs with
+# typed headers: no transactions, no MERGE, no post-import dedup. IDs live in
+# one ID space per label; Agenda gets the composite ID "agenda_id@meeting_id".
+# Every ID must be unique and every relationship endpoint must exist, so nodes
+# are deduplicated on their ID (rows sorted, first wins; alias/tag arrays are
+# unioned) and relationships with a missing endpoint are dropped and counted.
+
+def write_bulk_csv(filename, header, rows):
+    path = os.path.join(BULK_IMPORT_FOLDER, filename)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def agenda_node_id(agenda_id, meeting_id):
+    return f"{agenda_id}@{meeting_id}"
+
+def to_int_or_empty(val):
+    try:
+        return str(int(float(val)))
+    except (TypeError, ValueError):
+        return ""
+
+def bulk_nodes(agg):
+    """Node rows keyed by their import ID: {label: {id: row}}."""
+    documents = {}
+    for row in sorted(agg.documents):
+        if row[0] in documents:
+            kept = documents[row[0]]
+            # Same doc_id from several files: keep the first row, union its arrays
+            documents[row[0]] = kept[:5] + (merge_arrays(kept[5], row[5]),) + kept[6:8] \
+                + (merge_arrays(kept[8], row[8]),) + kept[9:]
+        else:
+            documents[row[0]] = row
+    for doc_id, row in documents.items():
+        documents[doc_id] = row + tuple(document_keys(row).values())
+
+    contributors = {}
+    for name, aliases in sorted(agg.authors):
+        contributors[name] = (name, merge_arrays(contributors.get(name, ("", ""))[1], aliases))
+
+    tech_entities = {}
+    for name, aliases, desc in sorted(agg.tech_entities):
+        if name in tech_entities:
+            _, kept_aliases, kept_desc = tech_entities[name]
+            tech_entities[name] = (name, merge_arrays(kept_aliases, aliases), kept_desc or desc)
+        else:
+            tech_entities[name] = (name, merge_arrays(aliases), desc)
+
+    working_groups = {}
+    for (wg_id, wg_name), desc in agg.wg_dict.items():
+        working_groups.setdefault(wg_id, (wg_id, wg_name, desc))
+
+    meetings = {}
+    for row in sorted(agg.meetings):
+        meetings.setdefault(row[0], row + (meeting_key(row[0]),))
+
+    agendas = {}
+    for (agenda_id, meeting_id), info in sorted(agg.agenda_dict.items()):
+        agendas[agenda_node_id(agenda_id, meeting_id)] = (
+            agenda_node_id(agenda_id, meeting_id), agenda_id, meeting_id, info["release"],
+            "; ".join(sorted(info["topics"])), "; ".join(sorted(info["descriptions"])),
+            release_num(info["release"]), meeting_key(meeting_id),
+        )
+
+    return {
+        "Document": documents, "Contributor": contributors, "TechnologyEntity": tech_entities,
+        "WorkingGroup": working_groups, "Meeting": meetings, "Agenda": agendas,
     }
-    for doc_id, ver, title, rel, typ, tags, summ, topic, kw, mid, status, link in documents
-])
-
-write_csv("technology_entities.csv", ["canonical_name", "aliases", "description"], [
-    {"canonical_name": name, "aliases": aliases, "description": desc}
-    for name, aliases, desc in tech_entities
-])
-
-write_csv("working_groups.csv", ["id", "name", "description"], [
-    {"id": wg_id, "name": wg_name, "description": desc}
-    for (wg_id, wg_name), desc in wg_dict.items()
-])
-
-write_csv("meetings.csv", ["meeting_id", "venue", "wg", "topic"], [
-    {"meeting_id": mid, "venue": v, "wg": wg, "topic": t}
-    for mid, v, wg, t in meetings
-])
-
-# Agendas: one row per (agenda_id, meeting_id).
-# topics and descriptions are semicolon-separated unique values aggregated from
-# all documents that reference this agenda item at this meeting.
-# Column names are topics/descriptions (plural) to match live Neo4j properties
-# and the full-text index definition.
-write_csv("agendas.csv", ["agenda_id", "meeting_id", "release", "topics", "descriptions"], [
-    {
-        "agenda_id":    agenda_id,
-        "meeting_id":   meeting_id,
-        "release":      info["release"],
-        "topics":       "; ".join(sorted(info["topics"])),
-        "descriptions": "; ".join(sorted(info["descriptions"])),
+
+def bulk_relationships(agg, nodes):
+    """Relationship rows per type, dropping rows whose start or end node does not exist."""
+    docs = nodes["Document"]
+    rels = {
+        "AUTHORED": sorted(
+            (name, did, ctype) for name, did, ctype in agg.authored_rels
+            if name in nodes["Contributor"] and did in docs),
+        "MENTIONS": sorted(
+            (did, entity, ctx, to_int_or_empty(freq)) for did, entity, ctx, freq in agg.mentions_rels
+            if did in docs and entity in nodes["TechnologyEntity"]),
+        "BELONGS_TO": sorted(
+            (did, wg, role) for did, wg, role in agg.belongs_to_rels
+            if did in docs and wg in nodes["WorkingGroup"]),
+        "APPEARS_IN": sorted(
+            (did, agenda_node_id(aid, mid), rel, pr) for aid, mid, rel, did, pr in agg.appears_in_rels
+            if did in docs and agenda_node_id(aid, mid) in nodes["Agenda"]),
+        "REFERENCES": sorted(
+            (src, cited, rtype, details) for src, cited, rtype, details in agg.references_rels
+            if src in docs and cited in docs and src != cited),
+    }
+    totals = {
+        "AUTHORED": len(agg.authored_rels), "MENTIONS": len(agg.mentions_rels),
+        "BELONGS_TO": len(agg.belongs_to_rels), "APPEARS_IN": len(agg.appears_in_rels),
+        "REFERENCES": len(agg.references_rels),
     }
-    for (agenda_id, meeting_id), info in sorted(agenda_dict.items())
-])
-
-
-# ── Write Relationship CSVs ───────────────────────────────────────────────────
-
-write_csv("authored.csv", ["contributor_name", "doc_id", "contribution_type"], [
-    {"contributor_name": name, "doc_id": did, "contribution_type": ctype}
-    for name, did, ctype in authored_rels
-])
-
-write_csv("mentions.csv", ["doc_id", "entity_name", "context", "frequency"], [
-    {"doc_id": did, "entity_name": entity, "context": ctx, "frequency": freq}
-    for did, entity, ctx, freq in mentions_rels
-])
-
-write_csv("belongs_to.csv", ["doc_id", "wg_name", "role_in_group"], [
-    {"doc_id": did, "wg_name": wg, "role_in_group": role}
-    for did, wg, role in belongs_to_rels
-])
-
-write_csv("references.csv", ["source_doc_id", "cited_doc_id", "type_of_reference", "details"], [
-    {"source_doc_id": src, "cited_doc_id": cited, "type_of_reference": rtype, "details": details}
-    for src, cited, rtype, details in references_rels
-])
-
-# appears_in now includes meeting_id so LOAD CSV can MERGE Agenda on
-# the composite key (agenda_id, meeting_id).
-write_csv("appears_in.csv", ["agenda_id", "meeting_id", "release", "doc_id", "page_range"], [
-    {"agenda_id": aid, "meeting_id": mid, "release": rel, "doc_id": did, "page_range": pr}
-    for aid, mid, rel, did, pr in appears_in_rels
-])
-
-print(f"CSVs written to: {OUTPUT_FOLDER}")
-print(f"  documents:          {len(documents)}")
-print(f"  authors:            {len(authors)}")
-print(f"  technology_entities:{len(tech_entities)}")
-print(f"  working_groups:     {len(wg_dict)}")
-print(f"  meetings:           {len(meetings)}")
-print(f"  agendas:            {len(agenda_dict)}  (unique agenda_id+meeting_id pairs)")
-print(f"  authored rels:      {len(authored_rels)}")
-print(f"  mentions rels:      {len(mentions_rels)}")
-print(f"  belongs_to rels:    {len(belongs_to_rels)}")
-print(f"  references rels:    {len(references_rels)}")
-print(f"  appears_in rels:    {len(appears_in_rels)}")
+    dropped = {rel_type: totals[rel_type] - len(rows) for rel_type, rows in rels.items()}
+    return rels, dropped
+
+BULK_NODE_FILES = [
+    # (label, file, header)
+    ("Document", "documents.csv", [
+        "doc_id:ID(Document)", "version", "title", "release", "type", "tags:string[]",
+        "summary", "topic", "keywords:string[]", "meeting_id", "status", "source_path",
+        "release_num:int", "meeting_key", "doc_class",
+    ]),
+    ("Contributor", "contributors.csv", ["name:ID(Contributor)", "aliases:string[]"]),
+    ("TechnologyEntity", "technology_entities.csv",
+     ["canonical_name:ID(TechnologyEntity)", "aliases:string[]", "description"]),
+    ("WorkingGroup", "working_groups.csv", ["id:ID(WorkingGroup)", "name", "description"]),
+    ("Meeting", "meetings.csv", ["meeting_id:ID(Meeting)", "venue", "wg", "topic", "meeting_key"]),
+    # The composite ID is only used to wire up APPEARS_IN; it is not stored as a property
+    ("Agenda", "agendas.csv",
+     [":ID(Agenda)", "agenda_id", "meeting_id", "release", "topics", "descriptions",
+      "release_num:int", "meeting_key"]),
+]
+
+BULK_RELATIONSHIP_FILES = [
+    # (type, file, header)
+    ("AUTHORED", "authored.csv", [":START_ID(Contributor)", ":END_ID(Document)", "contribution_type"]),
+    ("MENTIONS", "mentions.csv", [":START_ID(Document)", ":END_ID(TechnologyEntity)", "context", "frequency:int"]),
+    ("BELONGS_TO", "belongs_to.csv", [":START_ID(Document)", ":END_ID(WorkingGroup)", "role_in_group"]),
+    ("APPEARS_IN", "appears_in.csv", [":START_ID(Document)", ":END_ID(Agenda)", "release", "page_range"]),
+    ("REFERENCES", "references.csv", [":START_ID(Document)", ":END_ID(Document)", "type_of_reference", "details"]),
+]
+
+def bulk_import_command(database="neo4j"):
+    args = [f"neo4j-admin database import full {database}", "--overwrite-destination",
+            f"--array-delimiter='{ARRAY_DELIMITER}'", "--multiline-fields=true"]
+    args += [f"--nodes={label}=import/bulk_import/{file}" for label, file, _ in BULK_NODE_FILES]
+    args += [f"--relationships={rel_type}=import/bulk_import/{file}" for rel_type, file, _ in BULK_RELATIONSHIP_FILES]
+    return " \\\n    ".join(args)
+
+def write_bulk_import(agg):
+    os.makedirs(BULK_IMPORT_FOLDER, exist_ok=True)
+    nodes = bulk_nodes(agg)
+    rels, dropped = bulk_relationships(agg, nodes)
+
+    for label, file, header in BULK_NODE_FILES:
+        write_bulk_csv(file, header, list(nodes[label].values()))
+    for rel_type, file, header in BULK_RELATIONSHIP_FILES:
+        write_bulk_csv(file, header, rels[rel_type])
+    with open(os.path.join(BULK_IMPORT_FOLDER, "import.sh"), "w", encoding="utf-8") as f:
+        f.write("#!/bin/sh\n# Run from the Neo4j home directory with the database stopped.\n")
+        f.write(bulk_import_command() + "\n")
+
+    print(f"neo4j-admin bulk-import files written to: {BULK_IMPORT_FOLDER}")
+    print("  nodes:  " + ", ".join(f"{label}={len(rows)}" for label, rows in nodes.items()))
+    print("  rels:   " + ", ".join(f"{rel_type}={len(rows)}" for rel_type, rows in rels.items()))
+    print("  dropped (missing endpoint or self-reference): "
+          + ", ".join(f"{rel_type}={n}" for rel_type, n in dropped.items()))
+
+
+def report_memory():
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    print(f"Peak RSS: {own / 2**20:.0f} MB" + (f" (largest worker: {workers / 2**20:.0f} MB)" if workers else ""))
+
+
+def print_summary(agg):
+    print(f"CSVs written to: {OUTPUT_FOLDER}")
+    print(f"  documents:          {len(agg.documents)}")
+    print(f"  authors:            {len(agg.authors)}")
+    print(f"  technology_entities:{len(agg.tech_entities)}")
+    print(f"  working_groups:     {len(agg.wg_dict)}")
+    print(f"  meetings:           {len(agg.meetings)}")
+    print(f"  agendas:            {len(agg.agenda_dict)}  (unique agenda_id+meeting_id pairs)")
+    print(f"  authored rels:      {len(agg.authored_rels)}")
+    print(f"  mentions rels:      {len(agg.mentions_rels)}")
+    print(f"  belongs_to rels:    {len(agg.belongs_to_rels)}")
+    print(f"  references rels:    {len(agg.references_rels)}")
+    print(f"  appears_in rels:    {len(agg.appears_in_rels)}")
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def generate(state, manifest, contributions, spill_dir, *, bulk_import, load, delta, parquet, arrow_ipc):
+    """Update the contributions from INPUT_FOLDER and write the outputs (everything main() does after loading state)."""
+    paths = list_json_files(INPUT_FOLDER)
+    previous_manifest = dict(manifest)
+    added, changed, removed, partial = update_contributions(manifest, contributions, paths, WORKERS, spill_dir)
+    print(f"{len(paths)} JSON files: {added} new, {changed} changed, {removed} deleted"
+          + ("" if state else " (full scan)"))
+
+    outputs_exist = all(os.path.exists(os.path.join(OUTPUT_FOLDER, name)) for name in CSV_FILES)
+    if bulk_import:
+        outputs_exist = outputs_exist and all(
+            os.path.exists(os.path.join(BULK_IMPORT_FOLDER, file)) for _, file, _ in BULK_NODE_FILES + BULK_RELATIONSHIP_FILES)
+    # --load, --delta and --parquet are explicit requests for output, even when the CSVs are current
+    if state and not (added or changed or removed) and outputs_exist and not (load or delta or parquet):
+        print(f"CSVs in {OUTPUT_FOLDER} are up to date.")
+        if manifest != previous_manifest:
+            save_state(manifest, contributions)  # only mtimes moved; don't re-hash them next run
+        return
+
+    if not state:
+        # Full scan: the shards covered every file, in sorted path order
+        agg = partial
+    else:
+        agg = Aggregate(spill_dir)
+        for path in sorted(contributions):
+            contribution = contributions[path]
+            if contribution is not None:
+                agg.add(contribution)
+
+    if RESOLVE_ENTITIES:
+        resolve_entities(agg)
+    if COLLAPSE_DUPLICATES:
+        collapse_duplicates(agg)
+    report_normalization(agg)
+    tables = csv_tables(agg)
+    if delta:
+        write_delta(read_previous_tables({f: fields for f, fields, _ in tables}), tables)
+    write_outputs(tables)
+    if parquet:
+        write_columnar(tables, arrow_ipc)
+    save_state(manifest, contributions)
+    print_summary(agg)
+    if bulk_import:
+        write_bulk_import(agg)
+    if load:
+        # Push the aggregation straight into the live database (graph_loader.py)
+        from graph_loader import load_aggregate
+        load_aggregate(agg)
+
+
+def main():
+    full = "--full" in sys.argv[1:]
+    bulk_import = "--bulk-import" in sys.argv[1:]
+    load = "--load" in sys.argv[1:]
+    delta = "--delta" in sys.argv[1:]
+    arrow_ipc = "--arrow" in sys.argv[1:]
+    parquet = "--parquet" in sys.argv[1:] or arrow_ipc
+    low_memory = LOW_MEMORY or "--low-memory" in sys.argv[1:]
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+    state = None if full else load_state(low_memory)
+    manifest = state["manifest"] if state else {}
+    contributions = open_contributions(state, low_memory)
+    # Sorted runs of the SpillSets; same disk as the output, removed at the end
+    spill = tempfile.TemporaryDirectory(prefix=".spill-", dir=OUTPUT_FOLDER) if low_memory else None
+    try:
+        generate(state, manifest, contributions, spill.name if spill else None,
+                 bulk_import=bulk_import, load=load, delta=delta, parquet=parquet, arrow_ipc=arrow_ipc)
+    finally:
+        if low_memory:
+            contributions.close()
+            spill.cleanup()
+    report_memory()
+
+if __name__ == "__main__":
+    main()
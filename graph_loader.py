@@ -0,0 +1,293 @@
+"""
+Batched UNWIND loader for a live Neo4j database
+===============================================
+
+Writes the 11 tables produced by generate_csv.py into a running database
+through the neo4j Python driver, for incremental updates where the offline
+neo4j-admin import can't be used. Statements are the README's LOAD CSV
+MERGEs, run as `UNWIND $rows` batches of BATCH_SIZE rows.
+
+Order and parallelism
+---------------------
+1. Uniqueness constraints (MERGE relies on them for index lookups) and
+   range indexes on the normalized meeting_key / release_num / doc_class.
+2. Nodes: each label is loaded serially, different labels in parallel —
+   they never touch the same node.
+3. Relationships, one type after another. Within a type, rows are split
+   into a REL_WORKERS x REL_WORKERS grid by hash of the start and end node
+   key ("mix and batch"). Each round runs one cell per row and column of
+   the grid in parallel, so no two concurrent transactions lock the same
+   start or end node. Document→Document REFERENCES are loaded serially:
+   one node can be a start in one cell and an end in another.
+4. The (:GraphMeta {name: 'graph'}) node's version is incremented. The
+   search apps cache results per graph version, so a finished load
+   invalidates their caches.
+
+Transient errors (deadlocks, leader switches, lost connections) are retried
+with backoff. A rows/sec summary per label and relationship type is printed
+at the end.
+
+Usage:
+    python graph_loader.py [csv_folder]          # default: ./neo4j_csv_output2
+    python generate_csv.py --load                # load the in-memory aggregation
+"""
+
+import os
+import sys
+import csv
+import time
+import zlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError, ServiceUnavailable, SessionExpired
+
+NEO4J_URI = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "your_password")
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE", "neo4j")
+CSV_FOLDER = "./neo4j_csv_output2"
+
+BATCH_SIZE = 5000
+NODE_WORKERS = 6
+REL_WORKERS = 4
+MAX_RETRIES = 5
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT doc_unique       IF NOT EXISTS FOR (d:Document)         REQUIRE d.doc_id IS UNIQUE",
+    "CREATE CONSTRAINT contrib_unique   IF NOT EXISTS FOR (c:Contributor)       REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT tech_unique      IF NOT EXISTS FOR (t:TechnologyEntity)  REQUIRE t.canonical_name IS UNIQUE",
+    "CREATE CONSTRAINT meeting_unique   IF NOT EXISTS FOR (m:Meeting)           REQUIRE m.meeting_id IS UNIQUE",
+    "CREATE CONSTRAINT wg_unique        IF NOT EXISTS FOR (w:WorkingGroup)      REQUIRE w.id IS UNIQUE",
+    "CREATE CONSTRAINT agenda_unique    IF NOT EXISTS FOR (a:Agenda)            REQUIRE (a.agenda_id, a.meeting_id) IS NODE KEY",
+    # Range indexes on the normalized keys, for exact-match meeting/release filters
+    "CREATE INDEX doc_meeting_key     IF NOT EXISTS FOR (d:Document) ON (d.meeting_key)",
+    "CREATE INDEX doc_release_num     IF NOT EXISTS FOR (d:Document) ON (d.release_num)",
+    "CREATE INDEX doc_class           IF NOT EXISTS FOR (d:Document) ON (d.doc_class)",
+    "CREATE INDEX meeting_key         IF NOT EXISTS FOR (m:Meeting)  ON (m.meeting_key)",
+    "CREATE INDEX agenda_meeting_key  IF NOT EXISTS FOR (a:Agenda)   ON (a.meeting_key)",
+    "CREATE INDEX agenda_release_num  IF NOT EXISTS FOR (a:Agenda)   ON (a.release_num)",
+]
+
+# Bumped after every load; beta_testing/app.py drops its query cache when it changes
+GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {name: 'graph'})
+SET m.version = coalesce(m.version, 0) + 1, m.loaded_at = datetime()
+RETURN m.version AS version
+"""
+
+ARRAY_FIELDS = {"tags", "keywords", "aliases"}
+INT_FIELDS = {"frequency", "release_num"}
+
+# label → (csv file, key columns, property columns)
+NODES = {
+    "Document": ("documents.csv", ["doc_id"], [
+        "version", "title", "release", "type", "tags", "summary", "topic",
+        "keywords", "meeting_id", "status", "source_path", "release_num", "meeting_key", "doc_class",
+    ]),
+    "Contributor": ("authors.csv", ["name"], ["aliases"]),
+    "TechnologyEntity": ("technology_entities.csv", ["canonical_name"], ["aliases", "description"]),
+    "WorkingGroup": ("working_groups.csv", ["id"], ["name", "description"]),
+    "Meeting": ("meetings.csv", ["meeting_id"], ["venue", "wg", "topic", "meeting_key"]),
+    "Agenda": ("agendas.csv", ["agenda_id", "meeting_id"], ["release", "topics", "descriptions", "release_num", "meeting_key"]),
+}
+
+# type → (csv file, (start label, {node key: csv column}), (end label, {node key: csv column}), rel properties)
+RELATIONSHIPS = {
+    "AUTHORED": ("authored.csv", ("Contributor", {"name": "contributor_name"}),
+                 ("Document", {"doc_id": "doc_id"}), ["contribution_type"]),
+    "MENTIONS": ("mentions.csv", ("Document", {"doc_id": "doc_id"}),
+                 ("TechnologyEntity", {"canonical_name": "entity_name"}), ["context", "frequency"]),
+    "BELONGS_TO": ("belongs_to.csv", ("Document", {"doc_id": "doc_id"}),
+                   ("WorkingGroup", {"id": "wg_name"}), ["role_in_group"]),
+    "APPEARS_IN": ("appears_in.csv", ("Document", {"doc_id": "doc_id"}),
+                   ("Agenda", {"agenda_id": "agenda_id", "meeting_id": "meeting_id"}), ["release", "page_range"]),
+    "REFERENCES": ("references.csv", ("Document", {"doc_id": "source_doc_id"}),
+                   ("Document", {"doc_id": "cited_doc_id"}), ["type_of_reference", "details"]),
+}
+
+
+# ── Row preparation ───────────────────────────────────────────────────────────
+
+def convert(field, value):
+    if field in ARRAY_FIELDS:
+        return [v for v in value.split("|") if v] if value else []
+    if field in INT_FIELDS:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+    return value
+
+def read_tables(folder):
+    """{filename: rows} read from a generate_csv.py output folder."""
+    tables = {}
+    for file, *_ in list(NODES.values()) + list(RELATIONSHIPS.values()):
+        with open(os.path.join(folder, file), newline="", encoding="utf-8") as f:
+            tables[file] = list(csv.DictReader(f))
+    return tables
+
+def node_query(label, keys):
+    key_map = ", ".join(f"{k}: row.{k}" for k in keys)
+    return f"UNWIND $rows AS row MERGE (n:{label} {{{key_map}}}) SET n += row.props"
+
+def node_rows(rows, keys, props):
+    return [
+        {**{k: row[k] for k in keys}, "props": {p: convert(p, row.get(p, "")) for p in props}}
+        for row in rows
+        if row.get(keys[0])
+    ]
+
+def rel_query(rel_type, start, end, props):
+    start_label, start_keys = start
+    end_label, end_keys = end
+    start_map = ", ".join(f"{k}: row.s_{k}" for k in start_keys)
+    end_map = ", ".join(f"{k}: row.e_{k}" for k in end_keys)
+    # One relationship per endpoint pair (generate_csv collapses the rows):
+    # MERGE on the endpoints and SET the properties, so a re-import with
+    # changed properties updates the edge instead of adding a second one
+    sets = ", ".join(f"r.{p} = row.{p}" for p in props)
+    where = " WHERE s <> e" if start_label == end_label else ""
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (s:{start_label} {{{start_map}}}) "
+        f"MATCH (e:{end_label} {{{end_map}}}){where} "
+        f"MERGE (s)-[r:{rel_type}]->(e)"
+        + (f" SET {sets}" if sets else "")
+    )
+
+def rel_rows(rows, start, end, props):
+    prepared = []
+    for row in rows:
+        r = {f"s_{k}": row.get(col, "") for k, col in start[1].items()}
+        r.update({f"e_{k}": row.get(col, "") for k, col in end[1].items()})
+        r.update({p: convert(p, row.get(p, "")) for p in props})
+        prepared.append(r)
+    return prepared
+
+
+# ── Execution ─────────────────────────────────────────────────────────────────
+
+class GraphLoader:
+
+    def __init__(self, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE,
+                 batch_size=BATCH_SIZE, node_workers=NODE_WORKERS, rel_workers=REL_WORKERS):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.database = database
+        self.batch_size = batch_size
+        self.node_workers = node_workers
+        self.rel_workers = rel_workers
+        self.stats = {}  # name → [rows, seconds, retries]
+
+    def close(self):
+        self.driver.close()
+
+    def run_batch(self, query, rows):
+        """Run one UNWIND batch in a write transaction; returns the number of retries it needed."""
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                with self.driver.session(database=self.database) as session:
+                    session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+                return attempt - 1
+            except (TransientError, ServiceUnavailable, SessionExpired) as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = min(30, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"  transient error ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def run_batches(self, query, rows):
+        retries = 0
+        for i in range(0, len(rows), self.batch_size):
+            retries += self.run_batch(query, rows[i:i + self.batch_size])
+        return retries
+
+    def create_constraints(self):
+        with self.driver.session(database=self.database) as session:
+            for statement in CONSTRAINTS:
+                session.run(statement).consume()
+
+    def load_nodes(self, tables):
+        def load_label(label):
+            file, keys, props = NODES[label]
+            rows = node_rows(tables[file], keys, props)
+            start = time.perf_counter()
+            retries = self.run_batches(node_query(label, keys), rows)
+            self.stats[label] = [len(rows), time.perf_counter() - start, retries]
+
+        with ThreadPoolExecutor(max_workers=self.node_workers) as pool:
+            list(pool.map(load_label, NODES))
+
+    def partition(self, rows, start_keys, end_keys):
+        """Grid cell (start bucket, end bucket) → rows, by stable hash of each endpoint's key."""
+        n = self.rel_workers
+        grid = {}
+        for row in rows:
+            s = zlib.crc32("\0".join(str(row[f"s_{k}"]) for k in start_keys).encode("utf-8")) % n
+            e = zlib.crc32("\0".join(str(row[f"e_{k}"]) for k in end_keys).encode("utf-8")) % n
+            grid.setdefault((s, e), []).append(row)
+        return grid
+
+    def load_relationships(self, tables):
+        with ThreadPoolExecutor(max_workers=self.rel_workers) as pool:
+            for rel_type, (file, start, end, props) in RELATIONSHIPS.items():
+                rows = rel_rows(tables[file], start, end, props)
+                query = rel_query(rel_type, start, end, props)
+                t0 = time.perf_counter()
+                if start[0] == end[0] or self.rel_workers == 1:
+                    retries = self.run_batches(query, rows)
+                else:
+                    grid = self.partition(rows, start[1], end[1])
+                    n = self.rel_workers
+                    retries = 0
+                    for shift in range(n):
+                        # Cells (i, i + shift): every start bucket and every end bucket appears once
+                        cells = [grid.get((i, (i + shift) % n), []) for i in range(n)]
+                        retries += sum(pool.map(lambda cell: self.run_batches(query, cell), cells))
+                self.stats[rel_type] = [len(rows), time.perf_counter() - t0, retries]
+
+    def load(self, tables):
+        """Load {filename: rows} (from read_tables or generate_csv.csv_tables)."""
+        total_start = time.perf_counter()
+        self.create_constraints()
+        self.load_nodes(tables)
+        self.load_relationships(tables)
+        version = self.bump_version()
+        self.report(time.perf_counter() - total_start)
+        print(f"Graph version: {version}")
+
+    def bump_version(self):
+        with self.driver.session(database=self.database) as session:
+            return session.execute_write(lambda tx: tx.run(GRAPH_VERSION_QUERY).single()["version"])
+
+    def report(self, total_seconds):
+        print(f"{'label / type':<20}{'rows':>10}{'seconds':>10}{'rows/s':>10}{'retries':>9}")
+        for name, (rows, seconds, retries) in self.stats.items():
+            rate = rows / seconds if seconds else 0.0
+            print(f"{name:<20}{rows:>10}{seconds:>10.1f}{rate:>10.0f}{retries:>9}")
+        print(f"Total load time: {total_seconds:.1f}s")
+
+
+def load_aggregate(agg, **kwargs):
+    """Load a generate_csv.Aggregate without going through the CSV files."""
+    from generate_csv import csv_tables
+    tables = {filename: rows for filename, _, rows in csv_tables(agg)}
+    loader = GraphLoader(**kwargs)
+    try:
+        loader.load(tables)
+    finally:
+        loader.close()
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else CSV_FOLDER
+    loader = GraphLoader()
+    try:
+        loader.load(read_tables(folder))
+    finally:
+        loader.close()
+
+
+if __name__ == "__main__":
+    main()
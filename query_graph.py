@@ -1,4 +1,3 @@
-from neo4j import GraphDatabase
 import pandas as pd
 import requests
 import os
@@ -7,6 +6,8 @@ import shutil
 from tqdm import tqdm 
 import json
 
+from search_client import SearchClient
+
 def clear_directory(path):
     for item in os.listdir(path):
         item_path = os.path.join(path, item)
@@ -18,85 +19,12 @@ def clear_directory(path):
 output_dir = "downloaded_docs"
 
 os.makedirs(output_dir, exist_ok= True)
-uri = "bolt:172.26.189.83:7687"
 generate_uri = "http://172.26.189.83:4005/generate"
-uname = "neo4j"
-pswd = "login123"
-
-driver = GraphDatabase.driver(uri, auth = (uname,pswd))
-
-query = """
-// Collect directly matched document IDs and their scores
-CALL () {
-  CALL db.index.fulltext.queryNodes("docIndex", $query)
-  YIELD node, score
-  WHERE $meeting IS NULL OR node.meeting_id CONTAINS $meeting
-  RETURN
-    collect(node.doc_id) AS direct_doc_ids,
-    collect({doc_id: node.doc_id, score: score}) AS direct_docs
-}
-WITH direct_doc_ids, direct_docs  // <-- pass both forward
-
-// Agenda matches (boost if linked to direct docs)
-CALL (direct_doc_ids) {
-  WITH direct_doc_ids  // <-- explicitly import into subquery
-  CALL db.index.fulltext.queryNodes("agendaIndex", $query)
-  YIELD node, score AS agenda_score
-  MATCH (node)<-[:APPEARS_IN]-(d:Document)
-  WITH d,
-       CASE
-         WHEN d.doc_id IN direct_doc_ids
-           THEN agenda_score * 2.3    // boost if linked to direct doc
-         ELSE agenda_score * 0.8
-       END AS agenda_rel_score
-  RETURN collect({doc_id: d.doc_id, score: agenda_rel_score}) AS agenda_docs
-}
-WITH direct_docs, agenda_docs  // <-- carry results forward
-
-// Tech entity matches
-CALL() {
-  CALL db.index.fulltext.queryNodes("techEntityIndex", $query)
-  YIELD node, score AS entity_score
-  MATCH (d:Document)-[:MENTIONS]->(node)
-  RETURN collect({doc_id: d.doc_id, score: entity_score * 0.7}) AS entity_docs
-}
-WITH direct_docs, agenda_docs, entity_docs
-
-// Combine all document matches and compute total score
-WITH direct_docs + agenda_docs + entity_docs AS all_docs
-UNWIND all_docs AS doc_entry
-WITH doc_entry.doc_id AS doc_id, sum(doc_entry.score) AS total_score
-MATCH (d:Document {doc_id: doc_id})
-
-// Apply title-based boosting
-WITH d, total_score,
-CASE
-  WHEN d.title CONTAINS 'Feature Lead Summary' THEN total_score * 2.0
-  WHEN d.title CONTAINS 'Feature Lead' THEN total_score * 1.5
-  ELSE total_score
-END AS boosted_score
-
-// Return both raw and boosted scores for debugging
-RETURN
-  d.doc_id,
-  d.title,
-  d.source_path,
-  d.meeting_id,
-  d.release,
-  total_score,
-  boosted_score
-ORDER BY boosted_score DESC
-LIMIT 25;
-"""
 query_str = input("Enter your Query: ")
 meeting = input("Entery the Meeting (Leave Empty if not sure): ")
 
-params = {"query": query_str,
-        "meeting": meeting}
-
-with driver.session() as session:
-    result = session.run(query,params)
-    data = [record.data() for record in result]
+with SearchClient() as client:
+    data = client.search(query_str, meeting, limit=25)
 
 df = pd.DataFrame(data)
 clear_directory(output_dir)
@@ -145,5 +73,4 @@ except Exception as e:
 
 
 
-df.to_csv("search_results.csv")
-driver.close()
\ No newline at end of file
+df.to_csv("search_results.csv")
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Shared Neo4j search client
+==========================
+
+One long-lived driver per process for the Chat3GPP ranking query, used by
+query_graph.py and beta_testing/app.py instead of a driver per search.
+
+- The driver keeps a pool of up to POOL_SIZE Bolt connections. Connections
+  are reused across searches and health-checked after LIVENESS_CHECK_SECONDS
+  idle, so a search pays no connection setup or handshake.
+- The ranking query runs as a parameterized read transaction
+  (execute_read). With a neo4j:// URI it is routed to a reader of the
+  cluster and retried on transient errors.
+- get_client() returns the process-wide SearchClient. It is thread-safe, so
+  concurrent Gradio requests (each on its own worker thread) share it.
+  AsyncSearchClient / get_async_client() are the asyncio equivalents for
+  async handlers.
+
+Connection settings come from NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD and
+NEO4J_DATABASE.
+"""
+
+import os
+import atexit
+import threading
+
+from neo4j import GraphDatabase, AsyncGraphDatabase
+
+from utils.normalize import meeting_key
+
+NEO4J_URI = os.environ.get("NEO4J_URI", "neo4j://172.26.189.83:7687")
+NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "login123")
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE", "neo4j")
+
+POOL_SIZE = 50
+ACQUISITION_TIMEOUT_SECONDS = 30
+MAX_CONNECTION_LIFETIME_SECONDS = 3600
+LIVENESS_CHECK_SECONDS = 30
+DEFAULT_LIMIT = 15
+
+# Direct docIndex hits, agenda hits (2.3x when the document is also a direct
+# hit, 0.8x otherwise), technology entity hits (0.7x), summed per document and
+# boosted 2x / 1.5x for Feature Lead (Summary) titles.
+SEARCH_QUERY = """
+CALL () {
+  CALL db.index.fulltext.queryNodes("docIndex", $query)
+  YIELD node, score
+  // Exact match on the normalized key; substring match for input normalize can't parse
+  // and for documents imported before meeting_key existed
+  WHERE ($meeting_key IS NULL OR node.meeting_key = $meeting_key
+         OR (node.meeting_key IS NULL AND node.meeting_id CONTAINS $meeting_raw))
+    AND ($meeting IS NULL OR node.meeting_id CONTAINS $meeting)
+  RETURN
+    collect(node.doc_id) AS direct_doc_ids,
+    collect({doc_id: node.doc_id, score: score}) AS direct_docs
+}
+WITH direct_doc_ids, direct_docs
+CALL (direct_doc_ids) {
+  WITH direct_doc_ids
+  CALL db.index.fulltext.queryNodes("agendaIndex", $query)
+  YIELD node, score AS agenda_score
+  MATCH (node)<-[:APPEARS_IN]-(d:Document)
+  WITH d,
+       CASE
+         WHEN d.doc_id IN direct_doc_ids THEN agenda_score * 2.3
+         ELSE agenda_score * 0.8
+       END AS agenda_rel_score
+  RETURN collect({doc_id: d.doc_id, score: agenda_rel_score}) AS agenda_docs
+}
+WITH direct_docs, agenda_docs
+CALL () {
+  CALL db.index.fulltext.queryNodes("techEntityIndex", $query)
+  YIELD node, score AS entity_score
+  MATCH (d:Document)-[:MENTIONS]->(node)
+  RETURN collect({doc_id: d.doc_id, score: entity_score * 0.7}) AS entity_docs
+}
+WITH direct_docs, agenda_docs, entity_docs
+WITH direct_docs + agenda_docs + entity_docs AS all_docs
+UNWIND all_docs AS doc_entry
+WITH doc_entry.doc_id AS doc_id, sum(doc_entry.score) AS total_score
+MATCH (d:Document {doc_id: doc_id})
+WITH d, total_score,
+CASE
+  WHEN d.title CONTAINS 'Feature Lead Summary' THEN total_score * 2.0
+  WHEN d.title CONTAINS 'Feature Lead' THEN total_score * 1.5
+  ELSE total_score
+END AS boosted_score
+RETURN
+  d.doc_id,
+  d.title,
+  d.source_path,
+  d.meeting_id,
+  d.release,
+  total_score,
+  boosted_score
+ORDER BY boosted_score DESC
+LIMIT $limit
+"""
+
+
+# Incremented by graph_loader.py (or the README's LOAD CSV steps) after each import
+GRAPH_VERSION_QUERY = "OPTIONAL MATCH (m:GraphMeta {name: 'graph'}) RETURN m.version AS version"
+
+
+def search_params(query, meeting=None, limit=DEFAULT_LIMIT):
+    """
+    Query parameters. "RAN1#118bis", "RAN WG1 #118bis" and "RAN1_118b" all
+    select meeting_key RAN1_118b; meeting input that doesn't parse as a
+    meeting falls back to a substring match on meeting_id, as do documents
+    without a meeting_key (graphs imported before it was added).
+    """
+    meeting = meeting.strip() if meeting and meeting.strip() else None
+    key = meeting_key(meeting) if meeting else ""
+    return {"query": query, "meeting_key": key or None, "meeting_raw": meeting if key else None,
+            "meeting": None if key else meeting, "limit": int(limit)}
+
+
+def driver_config():
+    return {
+        "auth": (NEO4J_USER, NEO4J_PASSWORD),
+        "max_connection_pool_size": POOL_SIZE,
+        "connection_acquisition_timeout": ACQUISITION_TIMEOUT_SECONDS,
+        "max_connection_lifetime": MAX_CONNECTION_LIFETIME_SECONDS,
+        "liveness_check_timeout": LIVENESS_CHECK_SECONDS,
+        "keep_alive": True,
+    }
+
+
+class SearchClient:
+
+    def __init__(self, uri=NEO4J_URI, database=NEO4J_DATABASE, **config):
+        self.driver = GraphDatabase.driver(uri, **{**driver_config(), **config})
+        self.database = database
+
+    def close(self):
+        self.driver.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(self, query, meeting=None, limit=DEFAULT_LIMIT):
+        """Ranked documents as dicts keyed by the RETURN columns (d.doc_id, d.title, ...)."""
+        params = search_params(query, meeting, limit)
+        with self.driver.session(database=self.database) as session:
+            return session.execute_read(lambda tx: tx.run(SEARCH_QUERY, params).data())
+
+    def graph_version(self):
+        """The GraphMeta import version, or None for a graph loaded without one."""
+        with self.driver.session(database=self.database) as session:
+            return session.execute_read(lambda tx: tx.run(GRAPH_VERSION_QUERY).single()["version"])
+
+
+class AsyncSearchClient:
+
+    def __init__(self, uri=NEO4J_URI, database=NEO4J_DATABASE, **config):
+        self.driver = AsyncGraphDatabase.driver(uri, **{**driver_config(), **config})
+        self.database = database
+
+    async def close(self):
+        await self.driver.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def search(self, query, meeting=None, limit=DEFAULT_LIMIT):
+        params = search_params(query, meeting, limit)
+
+        async def read(tx):
+            result = await tx.run(SEARCH_QUERY, params)
+            return await result.data()
+
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_read(read)
+
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide SearchClient, created on first use and closed at exit."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = SearchClient()
+            atexit.register(_client.close)
+        return _client
+
+
+def get_async_client():
+    """
+    The process-wide AsyncSearchClient. Its connections belong to the event
+    loop that first uses it, so call it from the application's loop.
+    """
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = AsyncSearchClient()
+        return _async_client
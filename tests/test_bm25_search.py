@@ -0,0 +1,62 @@
+import csv
+import os
+import time
+
+import pytest
+
+import bm25_search
+
+
+def write_csv(folder, filename, rows):
+    with open(os.path.join(folder, filename), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def folders(tmp_path):
+    csv_folder, index_folder = str(tmp_path / "csv"), str(tmp_path / "bm25")
+    os.makedirs(csv_folder)
+    write_csv(csv_folder, "documents.csv", [
+        {"doc_id": "R1-2408001", "title": "Beam management for AI/ML", "summary": "beam prediction",
+         "keywords": "beam|AI/ML", "topic": "", "tags": "", "source_path": "a.zip",
+         "meeting_id": "RAN1#118bis", "release": "Rel-19", "meeting_key": "RAN1_118b"},
+        {"doc_id": "R1-2408002", "title": "Feature Lead Summary on beam management", "summary": "",
+         "keywords": "", "topic": "", "tags": "", "source_path": "b.zip",
+         "meeting_id": "RAN1#118bis", "release": "Rel-19", "meeting_key": ""},
+        {"doc_id": "R1-2405003", "title": "Positioning accuracy", "summary": "", "keywords": "", "topic": "",
+         "tags": "", "source_path": "c.zip", "meeting_id": "RAN1#117", "release": "Rel-19", "meeting_key": "RAN1_117"},
+    ])
+    return csv_folder, index_folder
+
+
+def test_search_ranks_and_filters_by_meeting(folders):
+    bm25_search.build(*folders)
+    engine = bm25_search.BM25Engine(folders[1])
+    rows = engine.search("beam management")
+    assert [r["d.doc_id"] for r in rows] == ["R1-2408002", "R1-2408001"]  # Feature Lead Summary boost
+    # meeting_key from the CSV, or derived from meeting_id when the column is empty
+    assert {r["d.doc_id"] for r in engine.search("beam", "RAN WG1 #118bis")} == {"R1-2408001", "R1-2408002"}
+    assert engine.search("beam", "RAN1#117") == []
+    assert engine.search("AND OR") == []
+
+
+def test_rebuild_changes_version_and_reloads_engine(folders):
+    csv_folder, index_folder = folders
+    bm25_search.build(csv_folder, index_folder)
+    engine = bm25_search.get_engine(index_folder)
+    assert bm25_search.get_engine(index_folder) is engine
+    assert engine.graph_version() == engine.version
+
+    time.sleep(0.01)
+    write_csv(csv_folder, "documents.csv", [
+        {"doc_id": "R1-2411001", "title": "Positioning integrity", "source_path": "d.zip",
+         "meeting_id": "RAN1#119", "release": "Rel-19"},
+    ])
+    bm25_search.build(csv_folder, index_folder)
+    assert engine.graph_version() != engine.version  # read from disk, not the loaded index
+
+    reloaded = bm25_search.get_engine(index_folder)
+    assert reloaded is not engine
+    assert [r["d.doc_id"] for r in reloaded.search("positioning")] == ["R1-2411001"]
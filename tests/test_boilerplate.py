@@ -0,0 +1,138 @@
+import logging
+
+from utils.boilerplate import BoilerplatePruner
+
+TDOC_HEADER = """3GPP TSG RAN WG1 #118bis\tR1-2408123
+Hefei, China, October 14th – 18th, 2024
+
+Agenda item:\t9.1.2
+Source:\tNokia
+Title:\tDiscussion on AI/ML for beam management
+Document for:\tDiscussion and Decision"""
+
+COPYRIGHT_NOTICE = """3GPP
+
+Postal address
+
+3GPP support office address
+
+650 Route des Lucioles - Sophia Antipolis
+Valbonne - FRANCE
+Tel.: +33 4 92 94 42 00 Fax: +33 4 93 65 47 16
+
+Internet
+
+http://www.3gpp.org
+
+Copyright Notification
+
+No part may be reproduced except as authorized by written permission.
+The copyright and the foregoing restriction extend to reproduction in all media.
+
+© 2024, 3GPP Organizational Partners (ARIB, ATIS, CCSA, ETSI, TSDSI, TTA, TTC).
+All rights reserved.
+
+UMTS™ is a Trade Mark of ETSI registered for the benefit of its members"""
+
+FOREWORD = """Foreword
+
+This Technical Specification has been produced by the 3rd Generation Partnership Project (3GPP).
+
+The contents of the present document are subject to continuing work within the TSG and may change following formal TSG approval. Should the TSG modify the contents of the present document, it will be re-released by the TSG with an identifying change of release date and an increase in version number as follows:"""
+
+TOC = """Contents
+
+Foreword\t5
+1\tScope\t6
+2\tReferences\t6
+3\tDefinitions of terms, symbols and abbreviations\t7
+5.1\tGeneral\t12"""
+
+HISTORY = """Change history
+
+2024-08 RAN#105 RP-241234 0001 F Correction of beam reporting 18.1.0
+2024-11 RAN#106 RP-242345 0003 B Introduction of AI/ML beam management 19.0.0"""
+
+BODY = [
+    "Proposal 1: Support beam prediction in the spatial domain with Set B a subset of Set A.",
+    "Observation 2: The copyright of the training dataset is out of scope for RAN1.",
+    "The Organizational Partners of 3GPP are listed in the TS 21.900 annex.",
+]
+
+
+def prune(text, rules=None):
+    return BoilerplatePruner(rules).prune(text)
+
+
+def test_tdoc_keeps_header_and_body():
+    text = "\n\n".join([TDOC_HEADER, COPYRIGHT_NOTICE, FOREWORD, TOC, *BODY, HISTORY])
+    pruned, removed = prune(text)
+    assert pruned.startswith(TDOC_HEADER)
+    for paragraph in BODY:
+        assert paragraph in pruned
+    for gone in ("650 Route des Lucioles", "All rights reserved", "has been produced by",
+                 "Definitions of terms", "Correction of beam reporting"):
+        assert gone not in pruned
+    assert set(removed) == {"copyright", "foreword", "toc", "revision_history"}
+
+
+def test_lone_copyright_mentions_stay():
+    text = "\n\n".join([TDOC_HEADER, *BODY])
+    pruned, removed = prune(text)
+    assert pruned == text
+    assert removed == {}
+
+
+def test_minutes_keep_repeated_markers():
+    items = []
+    for i in range(1, 6):
+        items += [f"8.1.{i}\tBeam management item {i}", f"R1-24081{i:02d}\tFL summary #{i}\tModerator (Samsung)",
+                  "Agreement:", f"Support option {i} for the beam report.", "Conclusion:", "Yes", "No"]
+    text = "\n\n".join(items)
+    pruned, removed = prune(text)
+    assert "repeated" not in removed
+    assert pruned.count("Agreement:") == 5
+    assert pruned.count("Conclusion:") == 5
+    assert pruned.count("Yes") == 5
+
+
+def test_page_headers_and_footers_keep_first_copy():
+    pages = [
+        f"3GPP TS 38.214 V18.4.0 (2024-09)\n\n{40 + i}\n\nRelease 18\n\nSection text of page {i}.\n\nNokia confidential\f"
+        for i in range(4)
+    ]
+    pruned, removed = prune("".join(pages))
+    assert pruned.count("3GPP TS 38.214 V18.4.0 (2024-09)") == 1
+    assert pruned.count("Release 18") == 1
+    assert pruned.count("Nokia confidential") < 4
+    for i in range(4):
+        assert f"Section text of page {i}." in pruned
+        assert f"{40 + i}" in pruned
+    assert removed["repeated"] > 0
+
+
+def test_long_spec_excerpt_is_compressed():
+    excerpt = "\n\n".join(f"5.2.{i}\tProcedure text {'x' * 400}" for i in range(30))
+    text = "\n\n".join(["Start of change 1", excerpt, "End of change 1", "Proposal 3: Adopt the TP."])
+    pruned, removed = prune(text)
+    assert "characters of quoted specification text omitted" in pruned
+    assert pruned.startswith("Start of change 1\n\n5.2.0")
+    assert pruned.endswith("End of change 1\n\nProposal 3: Adopt the TP.")
+    assert removed["spec_excerpt"] > 0
+
+
+def test_rules_can_be_disabled():
+    text = "\n\n".join([TDOC_HEADER, COPYRIGHT_NOTICE, TOC])
+    pruned, removed = prune(text, {"copyright": {"enabled": False}, "toc": {"enabled": False}})
+    assert pruned == text
+    assert removed == {}
+
+
+def test_record_and_report_totals(caplog):
+    pruner = BoilerplatePruner()
+    pruner.record(1000, 800, {"copyright": 500})
+    pruner.record(500, 500, {})
+    with caplog.at_level(logging.INFO):
+        pruner.report(logging.getLogger("test"))
+    assert "200 of 1500 tokens removed (13.3%) over 2 documents" in caplog.text
+    assert "copyright=500" in caplog.text
@@ -0,0 +1,137 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from utils import doc_store
+from utils.doc_store import DocumentStore
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+class FakeResponse:
+
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeServer:
+    """Stands in for requests.get: serves ZIPs by URL and records the conditional headers it got."""
+
+    def __init__(self):
+        self.zips = {}
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if url not in self.zips:
+            return FakeResponse(404)
+        if (headers or {}).get("If-None-Match") == "v1":
+            return FakeResponse(304)
+        return FakeResponse(200, self.zips[url], {"ETag": "v1"})
+
+
+def keep(path):
+    return path
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(doc_store.requests, "get", server.get)
+    return server
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_second_fetch_is_served_from_the_store(server, tmp_path):
+    server.zips["http://x/R1-1.zip"] = make_zip({"R1-1.docx": b"doc one", "__MACOSX/._R1-1.docx": b"junk"})
+    store = DocumentStore(str(tmp_path / "store"))
+    first = store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "a"))
+    second = store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "b"))
+    assert [os.path.basename(p) for p in first] == ["R1-1.docx"]
+    assert read(first[0]) == read(second[0]) == b"doc one"
+    stats = store.stats()
+    assert (stats["downloads"], stats["hits"]) == (1, 1)
+    assert len(server.requests) == 1
+    assert store._pins == {}
+
+
+def test_stale_entry_is_revalidated(server, tmp_path):
+    server.zips["http://x/R1-1.zip"] = make_zip({"R1-1.docx": b"doc one"})
+    store = DocumentStore(str(tmp_path / "store"), revalidate_seconds=0)
+    store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "a"))
+    paths = store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "b"))
+    assert read(paths[0]) == b"doc one"
+    assert server.requests[-1][1] == {"If-None-Match": "v1"}
+    assert (store.stats()["downloads"], store.stats()["revalidated"]) == (1, 1)
+
+
+def test_failed_conversion_is_not_kept(server, tmp_path):
+    server.zips["http://x/R1-1.zip"] = make_zip({"R1-1.doc": b"legacy", "R1-1.docx": b"doc one"})
+    store = DocumentStore(str(tmp_path / "store"))
+    fail_doc = lambda path: None if path.endswith(".doc") else path
+    paths = store.fetch("http://x/R1-1.zip", "R1-1", fail_doc, str(tmp_path / "a"))
+    assert [os.path.basename(p) for p in paths] == ["R1-1.docx"]
+    store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "b"))
+    assert store.stats()["downloads"] == 2
+
+
+def test_same_member_in_two_zips_is_stored_once(server, tmp_path):
+    server.zips["http://x/a.zip"] = make_zip({"R1-1.docx": b"shared content"})
+    server.zips["http://x/b.zip"] = make_zip({"copy/R1-1.docx": b"shared content"})
+    store = DocumentStore(str(tmp_path / "store"))
+    store.fetch("http://x/a.zip", "a", keep, str(tmp_path / "a"))
+    store.fetch("http://x/b.zip", "b", keep, str(tmp_path / "b"))
+    assert store._total_bytes == len(b"shared content")
+    assert len(list(store._scan())) == 1
+
+
+def test_eviction_keeps_the_blobs_being_linked(server, tmp_path):
+    server.zips["http://x/old.zip"] = make_zip({"old.docx": b"o" * 100})
+    server.zips["http://x/new.zip"] = make_zip({"new.docx": b"n" * 100})
+    store = DocumentStore(str(tmp_path / "store"), max_bytes=150)
+    store.fetch("http://x/old.zip", "old", keep, str(tmp_path / "a"))
+    paths = store.fetch("http://x/new.zip", "new", keep, str(tmp_path / "b"))
+    assert read(paths[0]) == b"n" * 100
+    assert store.stats()["evictions"] == 1
+    assert store._total_bytes == 100
+    assert store._pins == {}
+
+    # A manifest whose blob was evicted counts as a miss
+    store.fetch("http://x/old.zip", "old", keep, str(tmp_path / "c"))
+    assert store.stats()["downloads"] == 3
+
+
+def test_budget_smaller_than_one_fetch_still_links_it(server, tmp_path):
+    server.zips["http://x/big.zip"] = make_zip({"a.docx": b"a" * 100, "b.docx": b"b" * 100})
+    store = DocumentStore(str(tmp_path / "store"), max_bytes=50)
+    paths = store.fetch("http://x/big.zip", "big", keep, str(tmp_path / "a"))
+    assert sorted(read(p) for p in paths) == [b"a" * 100, b"b" * 100]
+    assert store._pins == {}
+
+
+def test_failed_download_releases_pins(server, tmp_path):
+    server.zips["http://x/R1-1.zip"] = make_zip({"R1-1.docx": b"doc one"})
+    store = DocumentStore(str(tmp_path / "store"), revalidate_seconds=0)
+    store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "a"))
+    del server.zips["http://x/R1-1.zip"]
+    with pytest.raises(RuntimeError):
+        store.fetch("http://x/R1-1.zip", "R1-1", keep, str(tmp_path / "b"))
+    assert store._pins == {}
@@ -0,0 +1,76 @@
+import csv
+import os
+
+import generate_csv
+from generate_csv import diff_table, delta_script, write_delta
+
+DOC_FIELDS = ["doc_id", "title", "release"]
+MENTION_FIELDS = ["doc_id", "entity_name", "frequency"]
+
+
+def doc(doc_id, title, release="Rel-19"):
+    return {"doc_id": doc_id, "title": title, "release": release}
+
+
+def test_diff_table_on_node_keys():
+    old = [doc("R1-1", "Beam"), doc("R1-2", "Positioning"), doc("R1-3", "Gone")]
+    new = [doc("R1-1", "Beam"), doc("R1-2", "Positioning accuracy"), doc("R1-4", "New")]
+    diff = diff_table(old, new, DOC_FIELDS, ["doc_id"])
+    assert diff == {
+        "added": [doc("R1-4", "New")],
+        "removed": [doc("R1-3", "Gone")],
+        "changed_new": [doc("R1-2", "Positioning accuracy")],
+        "changed_old": [doc("R1-2", "Positioning")],
+    }
+
+
+def test_diff_table_falls_back_to_whole_rows_for_duplicate_keys():
+    old = [doc("R1-1", "Beam"), doc("R1-1", "Beam v2")]
+    new = [doc("R1-1", "Beam"), doc("R1-1", "Beam v3")]
+    diff = diff_table(old, new, DOC_FIELDS, ["doc_id"])
+    assert diff["added"] == [doc("R1-1", "Beam v3")]
+    assert diff["removed"] == [doc("R1-1", "Beam v2")]
+    assert diff["changed_new"] == diff["changed_old"] == []
+
+
+def test_delta_script_orders_deletes_before_upserts():
+    diffs = {
+        "documents.csv": {"added": [doc("R1-4", "New")], "removed": [doc("R1-3", "Gone")],
+                          "changed_new": [], "changed_old": []},
+        "mentions.csv": {"added": [{"doc_id": "R1-4", "entity_name": "NR", "frequency": "2"}],
+                         "removed": [{"doc_id": "R1-3", "entity_name": "NR", "frequency": "1"}],
+                         "changed_new": [], "changed_old": []},
+    }
+    fields = {"documents.csv": DOC_FIELDS, "mentions.csv": MENTION_FIELDS}
+    script = delta_script(diffs, fields, ["removed"], ["added", "changed_new"])
+    statements = script.strip().split("\n\n")
+    assert [s.splitlines()[0].split("/")[-1] for s in statements] == [
+        "mentions.removed.csv' AS row", "documents.removed.csv' AS row",
+        "documents.added.csv' AS row", "mentions.added.csv' AS row",
+    ]
+    assert statements[0].endswith("DELETE r;")
+    assert statements[1].endswith("DETACH DELETE n;")
+    assert "MERGE (n:Document {doc_id: row.doc_id})\nSET n.title = row.title, n.release = row.release;" in statements[2]
+    assert "MERGE (s)-[r:MENTIONS]->(e)\nSET r.frequency = toIntegerOrNull(row.frequency);" in statements[3]
+
+
+def test_write_delta_files_and_retract(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_csv, "DELTA_FOLDER", str(tmp_path / "delta"))
+    previous = {"documents.csv": [doc("R1-1", "Beam"), doc("R1-2", "Old title")]}
+    tables = [("documents.csv", DOC_FIELDS, [doc("R1-2", "New title"), doc("R1-5", "Added")])]
+    write_delta(previous, tables)
+
+    delta = tmp_path / "delta"
+    assert sorted(os.listdir(delta)) == [
+        "apply.cypher", "documents.added.csv", "documents.changed_new.csv",
+        "documents.changed_old.csv", "documents.removed.csv", "retract.cypher",
+    ]
+    with open(delta / "documents.changed_old.csv", newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == [doc("R1-2", "Old title")]
+    retract = (delta / "retract.cypher").read_text(encoding="utf-8")
+    assert "documents.added.csv" in retract and "DETACH DELETE" in retract
+    assert "documents.changed_old.csv" in retract and "documents.changed_new.csv" not in retract
+
+    # A second run starts from an empty folder
+    write_delta({"documents.csv": tables[0][2]}, tables)
+    assert sorted(os.listdir(delta)) == ["apply.cypher", "retract.cypher"]
@@ -0,0 +1,59 @@
+import os
+import random
+
+import pytest
+
+import generate_csv
+from generate_csv import SpillSet, keep, sort_by
+
+
+@pytest.fixture
+def spill_dir(tmp_path):
+    return str(tmp_path)
+
+
+def test_iterates_distinct_rows_in_order(spill_dir):
+    rng = random.Random(0)
+    rows = [(rng.randrange(50), "x") for _ in range(500)]
+    spilled = SpillSet(spill_dir, max_rows=16)
+    spilled.update(rows)
+    assert spilled.runs  # rows went to disk
+    assert list(spilled) == sorted(set(rows))
+    assert len(spilled) == len(set(rows))
+
+
+def test_union_takes_over_runs(spill_dir):
+    a, b = SpillSet(spill_dir, max_rows=4), SpillSet(spill_dir, max_rows=4)
+    a.update((i,) for i in range(0, 20, 2))
+    b.update((i,) for i in range(0, 20, 3))
+    a |= b
+    a |= {(100,), (0,)}
+    assert b.runs == []
+    assert list(a) == sorted({(i,) for i in range(0, 20, 2)} | {(i,) for i in range(0, 20, 3)} | {(100,)})
+
+
+def test_runs_are_compacted(spill_dir, monkeypatch):
+    monkeypatch.setattr(generate_csv, "SPILL_MAX_RUNS", 2)
+    spilled = SpillSet(spill_dir, max_rows=2)
+    spilled.update((i,) for i in range(20))
+    assert len(spilled.runs) <= 2
+    assert list(spilled) == [(i,) for i in range(20)]
+    assert len(os.listdir(spill_dir)) == len(spilled.runs)
+
+
+def test_close_removes_runs(spill_dir):
+    spilled = SpillSet(spill_dir, max_rows=2)
+    spilled.update((i,) for i in range(10))
+    spilled.close()
+    assert os.listdir(spill_dir) == []
+    assert list(spilled) == []
+
+
+@pytest.mark.parametrize("make", [lambda d: set(), lambda d: SpillSet(d, max_rows=3)])
+def test_helpers_agree_for_sets_and_spill_sets(spill_dir, make):
+    rows = make(spill_dir)
+    rows.update([("b", 2), ("a", 3), ("c", 1), ("a", 1)])
+    assert list(sort_by(rows, key=lambda row: row[1])) == [("a", 1), ("c", 1), ("b", 2), ("a", 3)]
+    kept = keep(rows, lambda row: row[0] == "a")
+    assert sorted(kept) == [("a", 1), ("a", 3)]
+    assert type(kept) is type(rows)
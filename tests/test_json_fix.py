@@ -0,0 +1,93 @@
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from utils.json_fix import repair_json, coerce_to_schema, is_empty_extraction
+
+
+class Item(BaseModel):
+    name: str
+    count: Optional[int] = None
+    tags: List[str] = []
+
+
+class Extraction(BaseModel):
+    items: List[Item]
+    others: List[Item]
+
+
+# ── repair_json ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('Here is the JSON:\n```json\n{"a": 1}\n```\nHope this helps!', {"a": 1}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ("{'a': 'don't stop', 'b': 'x'}", {"a": "don't stop", "b": "x"}),
+    ('{"title": "He said "hi" today"}', {"title": 'He said "hi" today'}),
+    ('{"a": "x"  "b": "y"}', {"a": "x", "b": "y"}),
+    ('{"a": [1 2 3] "b": {"c": true} "d": null}', {"a": [1, 2, 3], "b": {"c": True}, "d": None}),
+    ('{"a": True, "b": None, "c": False}', {"a": True, "b": None, "c": False}),
+    ('{"path": "C:\\Temp\\x"}', {"path": "C:\\Temp\\x"}),
+    ('{"text": "line one\nline two"}', {"text": "line one\nline two"}),
+    ('{a: "x", b: 2}', {"a": "x", "b": 2}),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"items": [{"name": "a"}, {"name": "b', {"items": [{"name": "a"}, {"name": "b"}]}),
+    ('{"items": [{"name": "a"}], "others":', {"items": [{"name": "a"}]}),
+    ('{"items": [{"name": "a"}], "oth', {"items": [{"name": "a"}]}),
+    ('{"items": [{"name": "a",', {"items": [{"name": "a"}]}),
+])
+def test_repair_json_truncated(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "{{{:::]]]"])
+def test_repair_json_gives_up(text):
+    assert repair_json(text) is None
+
+
+# ── coerce_to_schema ─────────────────────────────────────────────────────────
+
+def test_coerce_fixes_field_types():
+    data = {"items": {"name": 7, "count": "12 times", "tags": "x"}, "others": None}
+    assert coerce_to_schema(data, Extraction) == {
+        "items": [{"name": "7", "count": 12, "tags": ["x"]}],
+        "others": [],
+    }
+
+
+def test_coerce_drops_only_invalid_items():
+    data = {"items": [{"name": "a"}, "not an object", {"count": 3}, {"name": ["b", "c"]}], "others": []}
+    assert coerce_to_schema(data, Extraction)["items"] == [
+        {"name": "a", "count": None, "tags": []},
+        {"name": "b, c", "count": None, "tags": []},
+    ]
+
+
+def test_coerce_unwraps_single_element_list():
+    assert coerce_to_schema([{"items": [{"name": "a"}]}], Extraction)["items"][0]["name"] == "a"
+
+
+def test_coerce_rejects_non_objects():
+    assert coerce_to_schema("text", Extraction) is None
+    assert coerce_to_schema([{"items": []}, {"items": []}], Extraction) is None
+
+
+@pytest.mark.parametrize("data", [
+    {"result": {"items": [{"name": "a"}]}},  # wrapper object
+    {"Items": [{"name": "a"}], "other": []},  # misnamed keys
+    {"items": [], "others": []},              # truncated before the first item
+])
+def test_coerce_of_malformed_output_is_empty(data):
+    assert is_empty_extraction(coerce_to_schema(data, Extraction))
+
+
+def test_is_empty_extraction():
+    assert is_empty_extraction(None)
+    assert is_empty_extraction({})
+    assert not is_empty_extraction({"items": [], "others": [{"name": "a"}]})
@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from utils.llm_cache import LLMResponseCache, make_cache_key
+from utils.text_cache import ExtractedTextCache
+
+
+def disk_bytes(cache):
+    return sum(size for _, _, size in cache._scan())
+
+
+def test_cache_key_covers_text_schema_and_model():
+    key = make_cache_key("text", {"a": 1}, "model")
+    assert key == make_cache_key("text", {"a": 1}, "model")
+    assert len({key, make_cache_key("text2", {"a": 1}, "model"),
+                make_cache_key("text", {"a": 2}, "model"), make_cache_key("text", {"a": 1}, "model2")}) == 4
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, {"documents": [{"doc_id": "R1-1"}]})
+    assert cache.get("ab" * 32) == {"documents": [{"doc_id": "R1-1"}]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+
+
+def test_overwrite_counts_only_the_size_difference(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    for size in (100, 10, 50):
+        cache.put("ab" * 32, {"x": "y" * size})
+    assert cache._total_bytes == disk_bytes(cache)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_bytes=350)  # room for three entries
+    for i, key in enumerate(("aa", "bb", "cc")):
+        cache.put(key * 32, {"x": "y" * 100})
+        os.utime(cache._path(key * 32), (time.time() - 100 + i,) * 2)
+    cache.get("aa" * 32)  # now the most recently used
+    cache.put("dd" * 32, {"x": "y" * 100})
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("bb" * 32) is None
+    assert cache.get("aa" * 32) is not None
+    assert cache._total_bytes == disk_bytes(cache) <= 350
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_age_days=1)
+    cache.put("ab" * 32, {"x": 1})
+    os.utime(cache._path("ab" * 32), (0, 0))
+    assert cache.get("ab" * 32) is None
+    assert cache._total_bytes == 0
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    path = cache._path("ab" * 32)
+    path.parent.mkdir(parents=True)
+    path.write_text('{"x": ', encoding="utf-8")
+    assert cache.get("ab" * 32) is None
+
+
+@pytest.mark.parametrize("text", ["", "Agenda item 8.1\n\nÜbersicht – ✓"])
+def test_text_cache_round_trip(tmp_path, text):
+    cache = ExtractedTextCache(str(tmp_path))
+    cache.put_text("cd" * 32, text, 42)
+    assert cache.get_text("cd" * 32) == (text, 42)
+    assert cache._total_bytes == disk_bytes(cache)
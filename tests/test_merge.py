@@ -0,0 +1,54 @@
+from utils.merge import merge_extractions, SECTIONS
+
+
+def test_every_section_is_present():
+    merged = merge_extractions([{}, {"documents": None}])
+    assert merged == {section: [] for section in SECTIONS}
+
+
+def test_first_chunk_wins_and_later_chunks_fill_gaps():
+    first = {"documents": [{"doc_id": "R1-2408001", "title": "Beam management", "release": "",
+                            "keywords": ["beam"], "summary": "Part one."}]}
+    second = {"documents": [{"doc_id": " r1-2408001 ", "title": "Other title", "release": "Rel-19",
+                             "keywords": ["Beam", "AI/ML"], "summary": "Part two."}]}
+    [doc] = merge_extractions([first, second])["documents"]
+    assert doc["doc_id"] == "R1-2408001"
+    assert doc["title"] == "Beam management"
+    assert doc["release"] == "Rel-19"
+    assert doc["keywords"] == ["beam", "AI/ML"]
+    assert doc["summary"] == "Part one.\n\nPart two."
+
+
+def test_repeated_summary_is_not_duplicated():
+    chunk = {"documents": [{"doc_id": "R1-1", "summary": "Same."}]}
+    assert merge_extractions([chunk, chunk])["documents"][0]["summary"] == "Same."
+
+
+def test_mention_frequencies_are_summed():
+    partials = [
+        {"mentions": [{"doc_id": "R1-1", "entity_name": "NR", "frequency": 3}]},
+        {"mentions": [{"doc_id": "R1-1", "entity_name": "nr", "frequency": 2},
+                      {"doc_id": "R1-1", "entity_name": "LTE", "frequency": 1}]},
+    ]
+    mentions = merge_extractions(partials)["mentions"]
+    assert [(m["entity_name"], m["frequency"]) for m in mentions] == [("NR", 5), ("LTE", 1)]
+
+
+def test_agendas_are_keyed_per_meeting():
+    partials = [
+        {"agendas": [{"agenda_id": "9.1", "meeting_id": "RAN1#118", "topics": ["AI"]}]},
+        {"agendas": [{"agenda_id": "9.1", "meeting_id": "RAN1#118", "topics": ["AI", "beam"]},
+                     {"agenda_id": "9.1", "meeting_id": "RAN1#119", "topics": ["AI"]}]},
+    ]
+    agendas = merge_extractions(partials)["agendas"]
+    assert [(a["meeting_id"], a["topics"]) for a in agendas] == [("RAN1#118", ["AI", "beam"]), ("RAN1#119", ["AI"])]
+
+
+def test_non_dict_records_are_skipped():
+    assert merge_extractions([{"authors": ["Nokia", {"name": "Nokia"}]}])["authors"] == [{"name": "Nokia"}]
+
+
+def test_inputs_are_not_modified():
+    first = {"authors": [{"name": "Nokia", "affiliation": ""}]}
+    merge_extractions([first, {"authors": [{"name": "Nokia", "affiliation": "Nokia Bell Labs"}]}])
+    assert first == {"authors": [{"name": "Nokia", "affiliation": ""}]}
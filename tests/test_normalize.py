@@ -0,0 +1,74 @@
+import pytest
+
+from utils.normalize import release_num, meeting_key, doc_class
+
+MEETING_KEYS = [
+    ("RAN WG1 #118bis", "RAN1_118b"),
+    ("3GPP TSG RAN WG1 #118bis", "RAN1_118b"),
+    ("RAN1#118bis", "RAN1_118b"),
+    ("RAN1_118b", "RAN1_118b"),
+    ("TSGR1_118b", "RAN1_118b"),
+    ("3GPP TSG RAN WG1 Meeting #118-bis", "RAN1_118b"),
+    ("RAN1#104-e", "RAN1_104e"),
+    ("RAN2#99ter", "RAN2_99t"),
+    ("CT WG4 Meeting #124", "CT4_124"),
+    ("TSG RAN #104", "RAN_104"),
+    ("RAN#104", "RAN_104"),
+    ("RAN_104", "RAN_104"),
+    ("TSGS_100", "SA_100"),
+    ("SA_100", "SA_100"),
+    ("3GPP TSG SA WG2 #160", "SA2_160"),
+    ("tsg ran wg4 #112", "RAN4_112"),
+    ("", ""),
+    ("Plenary", ""),
+    ("Hefei, China", ""),
+]
+
+
+@pytest.mark.parametrize("value, key", MEETING_KEYS)
+def test_meeting_key(value, key):
+    assert meeting_key(value) == key
+
+
+@pytest.mark.parametrize("value", [value for value, key in MEETING_KEYS if key])
+def test_meeting_key_round_trips(value):
+    key = meeting_key(value)
+    assert meeting_key(key) == key
+
+
+@pytest.mark.parametrize("value, num", [
+    ("Rel-18", "18"),
+    ("Release 19", "19"),
+    ("R19", "19"),
+    ("Rel. 17", "17"),
+    ("3GPP Release 18+", "18"),
+    ("Rel-18/Rel-19", "19"),
+    ("Rel-18/19", "19"),
+    ("Release 18 and 19", "19"),
+    ("18", "18"),
+    ("Pre-Rel-18", ""),
+    ("NR", ""),
+    ("5G-Advanced", ""),
+    ("2024-10", ""),
+    ("Rel-99", ""),
+])
+def test_release_num(value, num):
+    assert release_num(value) == num
+
+
+@pytest.mark.parametrize("value, cls", [
+    ("Feature Lead Summary", "feature_lead_summary"),
+    ("Draft CR", "change_request"),
+    ("pCR", "change_request"),
+    ("LS out", "liaison"),
+    ("Way Forward", "way_forward"),
+    ("TP for TS 38.214", "text_proposal"),
+    ("WID", "work_item"),
+    ("Technical Report", "technical_report"),
+    ("Meeting minutes", "report"),
+    ("Discussion and Decision", "discussion"),
+    ("", ""),
+    ("Other", ""),
+])
+def test_doc_class(value, cls):
+    assert doc_class(value) == cls
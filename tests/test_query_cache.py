@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import query_cache
+from utils.query_cache import QueryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_keys_are_normalized():
+    cache = QueryCache()
+    cache.put("docs", "  AI/ML  Beam Management? ", "RAN1#118bis", ["row"])
+    assert cache.get("docs", "ai/ml beam management", "RAN WG1 #118bis") == ["row"]
+    assert cache.get("docs", "ai/ml beam management", "RAN1_118b") == ["row"]
+    assert cache.get("docs", "ai/ml beam management", None) is None
+    assert cache.get("answer", "ai/ml beam management", "RAN1_118b") is None
+
+
+def test_unparsed_meeting_is_compared_casefolded():
+    cache = QueryCache()
+    cache.put("docs", "q", "Hefei", 1)
+    assert cache.get("docs", "q", "hefei ") == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put("docs", "a", None, 1)
+    cache.put("docs", "b", None, 2)
+    assert cache.get("docs", "a") == 1  # b is now the least recently used
+    cache.put("docs", "c", None, 3)
+    assert cache.get("docs", "b") is None
+    assert cache.get("docs", "a") == 1
+    assert cache.get("docs", "c") == 3
+    assert cache.stats()["kinds"]["docs"]["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(ttl=60)
+    cache.put("answer", "q", None, "text")
+    clock[0] += 60
+    assert cache.get("answer", "q") == "text"
+    clock[0] += 1
+    assert cache.get("answer", "q") is None
+    counts = cache.stats()["kinds"]["answer"]
+    assert (counts["hits"], counts["misses"], counts["expired"]) == (1, 1, 1)
+
+
+def test_version_change_clears_entries():
+    cache = QueryCache()
+    assert cache.set_version(1)
+    cache.put("docs", "q", None, 1)
+    assert not cache.set_version(1)
+    assert cache.get("docs", "q") == 1
+    assert cache.set_version(2)
+    assert cache.get("docs", "q") is None
+    stats = cache.stats()
+    assert stats["version"] == 2
+    assert stats["invalidations"] == 1
+
+
+def test_stats_hit_rate():
+    cache = QueryCache()
+    cache.put("docs", "q", None, 1)
+    cache.get("docs", "q")
+    cache.get("docs", "q")
+    cache.get("docs", "other")
+    kinds = cache.stats()["kinds"]
+    assert kinds["docs"]["hit_rate"] == pytest.approx(2 / 3)
@@ -0,0 +1,237 @@
+"""
+Rule-based pruning of 3GPP boilerplate before LLM extraction.
+
+Works on the extracted text split into paragraphs (blank-line separated, as
+both Unstructured and utils/docx_text produce it). Each rule can be switched
+off or tuned through the `rules` dict passed to BoilerplatePruner. The tdoc
+header (meeting, agenda item, source, title) is never touched: it is where
+the DataModel's ids come from.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_RULES: Dict[str, dict] = {
+    # Copyright / ETSI address blocks of TS, TR and CR templates: runs of adjacent
+    # paragraphs that together carry at least min_markers distinct notice phrases,
+    # one of them a phrase only the notice uses (_COPYRIGHT_ANCHOR)
+    "copyright": {"enabled": True, "min_markers": 2, "max_chars": 1500},
+    # Standard TS/TR foreword ("This Technical Specification has been produced by ...")
+    "foreword": {"enabled": True},
+    # Tables of contents: runs of "5.1<tab>General<tab>12" style entries
+    "toc": {"enabled": True, "min_entries": 3},
+    # "Change history" / "Revision history" tables
+    "revision_history": {"enabled": True},
+    # Page headers/footers repeated through the document; keep the first copy. Only
+    # header-shaped paragraphs (_PAGE_FURNITURE) or ones next to a form feed count, so
+    # repeated "Agreement:" markers or "Yes"/"No" answers in minutes stay
+    "repeated": {"enabled": True, "min_repeats": 3, "max_chars": 200},
+    # Pasted spec text between "Start of change" / "End of change" style markers,
+    # compressed to its head and tail when longer than max_chars
+    "spec_excerpt": {"enabled": True, "max_chars": 6000, "keep_chars": 1500},
+}
+
+_COPYRIGHT = re.compile(
+    r"(©|\bcopyright\b|all rights reserved|no part may be reproduced|organizational partners"
+    r"|postal address|support office address|650 route des lucioles|valbonne|https?://www\.3gpp\.org"
+    r"|tel\.?\s*:\s*\+33|trade ?mark of etsi|^\s*internet\s*:?\s*$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_COPYRIGHT_ANCHOR = re.compile(
+    r"(©|all rights reserved|no part may be reproduced|support office address|650 route des lucioles"
+    r"|tel\.?\s*:\s*\+33|trade ?mark of etsi)",
+    re.IGNORECASE,
+)
+_FOREWORD = re.compile(
+    r"(has been produced by the 3rd generation partnership project"
+    r"|contents of the present document are subject to continuing work"
+    r"|re-released by the tsg with an identifying change of release date"
+    r"|^version x\.y\.z$|^\s*[xyz]\s+the (first|second|third) digit)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Section number (or Annex/Foreword/...), title, then a tab or dot leader before the page number
+_TOC_ENTRY = re.compile(r"^((?i:annex)\s+[A-Z0-9]+|(?i:foreword|scope|references|introduction)|\d+(\.\d+)*|[A-Z](\.\d+)+)"
+                        r"\b.{0,150}?(\t|\.{3,}\s*)\d{1,4}$")
+# Running headers of specs and tdocs: "3GPP TS 38.331 V17.0.0 (2022-03)", "Release 17",
+# "3GPP TSG RAN WG1 Meeting #118 ... R1-2401234", "ETSI TS 138 331 V17.0.0"
+_PAGE_FURNITURE = re.compile(
+    r"^((3gpp|etsi)\s+t[sr]\s+\d+(\.\d+)*(\s+v\d+\.\d+\.\d+)?(\s*\(\d{4}-\d{2}\))?"
+    r"|release\s+\d+|3gpp\s+tsg\b.*#\s*\d+.*)$",
+    re.IGNORECASE,
+)
+_TOC_HEADING = re.compile(r"^(table of )?contents$", re.IGNORECASE)
+_HISTORY_HEADING = re.compile(r"^(change|revision|document)\s+history$", re.IGNORECASE)
+_HISTORY_ROW = re.compile(r"(\b(19|20)\d{2}[-/.]\d{2}\b|\b\d+\.\d+\.\d+\b|\bTSG\s*#?\d+)", re.IGNORECASE)
+_EXCERPT_START = re.compile(r"(start|beginning) of (the )?(\w+ )?(changes?|text proposal|tp|excerpt|modifications?)",
+                            re.IGNORECASE)
+_EXCERPT_END = re.compile(r"end of (the )?(\w+ )?(changes?|text proposal|tp|excerpt|modifications?)", re.IGNORECASE)
+
+
+class BoilerplatePruner:
+    """Applies the enabled pruning rules and keeps running totals of what each removed."""
+
+    def __init__(self, rules: Optional[Dict[str, dict]] = None):
+        self.rules = {name: dict(cfg) for name, cfg in DEFAULT_RULES.items()}
+        for name, cfg in (rules or {}).items():
+            self.rules.setdefault(name, {}).update(cfg)
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.chars_removed: Dict[str, int] = {name: 0 for name in self.rules}
+
+    def _enabled(self, name: str) -> bool:
+        return self.rules.get(name, {}).get("enabled", False)
+
+    def prune(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """Return the pruned text and the number of characters each rule removed."""
+        # A page break (form feed) starts the next paragraph, so the repeated rule can see it
+        text = re.sub(r"[^\S\n]*\n?[^\S\n]*\f\s*", "\n\n\f", text)
+        paragraphs = [p for p in re.split(r"\n[^\S\f]*\n", text) if p.strip()]
+        removed: Dict[str, int] = {}
+
+        def drop(name: str, kept: List[str]):
+            nonlocal paragraphs
+            removed[name] = removed.get(name, 0) + sum(map(len, paragraphs)) - sum(map(len, kept))
+            paragraphs = kept
+
+        if self._enabled("copyright"):
+            drop("copyright", self._drop_copyright(paragraphs))
+        if self._enabled("foreword"):
+            drop("foreword", [p for p in paragraphs if not _FOREWORD.search(p)])
+        if self._enabled("toc"):
+            drop("toc", self._drop_toc(paragraphs))
+        if self._enabled("revision_history"):
+            drop("revision_history", self._drop_history(paragraphs))
+        if self._enabled("repeated"):
+            drop("repeated", self._drop_repeated(paragraphs))
+        if self._enabled("spec_excerpt"):
+            drop("spec_excerpt", self._compress_excerpts(paragraphs))
+
+        return "\n\n".join(paragraphs), {k: v for k, v in removed.items() if v}
+
+    def _drop_copyright(self, paragraphs: List[str]) -> List[str]:
+        # A lone "copyright" or "organizational partners" is content; the notice is a block of them
+        cfg = self.rules["copyright"]
+        min_markers, max_chars = cfg.get("min_markers", 2), cfg.get("max_chars", 1500)
+        kept, run, markers, anchored = [], [], set(), False
+        for p in paragraphs + [""]:
+            found = _COPYRIGHT.findall(p) if len(p) < max_chars else []
+            if found:
+                run.append(p)
+                markers.update(" ".join(m.lower().split()) for m in found)
+                anchored = anchored or bool(_COPYRIGHT_ANCHOR.search(p))
+                continue
+            if len(markers) < min_markers or not anchored:
+                kept.extend(run)
+            else:
+                # Within the notice, keep sentences that only mention a weak marker
+                kept.extend(r for r in run if not _COPYRIGHT_ANCHOR.search(r) and r.rstrip().endswith((".", "!", "?")))
+            run, markers, anchored = [], set(), False
+            if p:
+                kept.append(p)
+        return kept
+
+    def _drop_toc(self, paragraphs: List[str]) -> List[str]:
+        min_entries = self.rules["toc"].get("min_entries", 3)
+        kept, run = [], []
+        for p in paragraphs + [""]:
+            lines = [line.strip() for line in p.strip().splitlines() if line.strip()]
+            is_entry = bool(lines) and all(_TOC_ENTRY.match(line) for line in lines)
+            if is_entry or (not run and _TOC_HEADING.match(p.strip())):
+                run.append(p)
+                continue
+            entries = sum(len(r.splitlines()) for r in run if not _TOC_HEADING.match(r.strip()))
+            if entries < min_entries:
+                kept.extend(run)
+            run = []
+            if p:
+                kept.append(p)
+        return kept
+
+    def _drop_history(self, paragraphs: List[str]) -> List[str]:
+        kept, in_history = [], False
+        for p in paragraphs:
+            if _HISTORY_HEADING.match(p.strip()):
+                in_history = True
+                continue
+            if in_history and len(_HISTORY_ROW.findall(p)) >= 2:
+                continue
+            in_history = False
+            kept.append(p)
+        return kept
+
+    @staticmethod
+    def _at_page_break(paragraphs: List[str], i: int) -> bool:
+        """First paragraph of a page (header) or last one before a page break (footer)."""
+        return paragraphs[i].startswith("\f") or (i + 1 < len(paragraphs) and paragraphs[i + 1].startswith("\f"))
+
+    def _drop_repeated(self, paragraphs: List[str]) -> List[str]:
+        cfg = self.rules["repeated"]
+        counts: Dict[str, int] = {}
+        keys = []
+        for i, p in enumerate(paragraphs):
+            key = " ".join(p.split())  # also drops form feeds
+            if len(p) > cfg.get("max_chars", 200) or not (_PAGE_FURNITURE.match(key) or self._at_page_break(paragraphs, i)):
+                key = None
+            keys.append(key)
+            if key:
+                counts[key] = counts.get(key, 0) + 1
+        seen, kept = set(), []
+        for p, key in zip(paragraphs, keys):
+            if key and counts[key] >= cfg.get("min_repeats", 3):
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(p)
+        return kept
+
+    def _compress_excerpts(self, paragraphs: List[str]) -> List[str]:
+        cfg = self.rules["spec_excerpt"]
+        max_chars, keep_chars = cfg.get("max_chars", 6000), cfg.get("keep_chars", 1500)
+        kept, excerpt = [], None
+        for p in paragraphs:
+            if excerpt is None:
+                kept.append(p)
+                if _EXCERPT_START.search(p) and len(p) < 300:
+                    excerpt = []
+                continue
+            if _EXCERPT_END.search(p) and len(p) < 300:
+                kept.extend(self._squeeze(excerpt, max_chars, keep_chars))
+                kept.append(p)
+                excerpt = None
+            else:
+                excerpt.append(p)
+        if excerpt:
+            kept.extend(self._squeeze(excerpt, max_chars, keep_chars))
+        return kept
+
+    @staticmethod
+    def _squeeze(block: List[str], max_chars: int, keep_chars: int) -> List[str]:
+        text = "\n\n".join(block)
+        if len(text) <= max_chars:
+            return block
+        omitted = len(text) - 2 * keep_chars
+        return [text[:keep_chars], f"[... {omitted} characters of quoted specification text omitted ...]",
+                text[-keep_chars:]]
+
+    def record(self, tokens_before: int, tokens_after: int, removed: Dict[str, int]):
+        with self._lock:
+            self.documents += 1
+            self.tokens_before += tokens_before
+            self.tokens_after += tokens_after
+            for name, chars in removed.items():
+                self.chars_removed[name] = self.chars_removed.get(name, 0) + chars
+
+    def report(self, logger):
+        with self._lock:
+            if not self.documents:
+                return
+            saved = self.tokens_before - self.tokens_after
+            share = saved / self.tokens_before if self.tokens_before else 0.0
+            by_rule = ", ".join(f"{name}={chars}" for name, chars in self.chars_removed.items() if chars)
+            logger.info(
+                f"Boilerplate pruning: {saved} of {self.tokens_before} tokens removed ({share:.1%}) "
+                f"over {self.documents} documents in this process; chars by rule: {by_rule or 'none'}"
+            )
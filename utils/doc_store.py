@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+# Sanitizer: extracted member path → path of the file to keep (may be the same), or None if it failed
+Sanitizer = Callable[[str], Optional[str]]
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class DocumentStore:
+    """
+    Persistent store of downloaded 3GPP ZIPs, kept as their sanitized members.
+
+    One manifest per source URL (entries/<sha of url>.json) records the
+    doc_id, the ETag / Last-Modified of the ZIP and the files it produced.
+    The files themselves are content-addressed blobs (blobs/<sha[:2]>/<sha><ext>),
+    so a tdoc shipped in several ZIPs is stored once. A manifest younger than
+    revalidate_seconds is served without touching the network. An older one
+    is revalidated with a conditional GET, and a 304 costs neither a download
+    nor a conversion.
+
+    fetch() hardlinks the files into a directory, falling back to symlinks
+    across filesystems and to copies where neither works. Blob mtimes double
+    as last-access times: blobs are evicted least recently used first once
+    they exceed max_bytes. A fetch pins its blobs from the moment it finds or
+    stores them until they are linked, and eviction skips pinned blobs, so a
+    concurrent request (or the fetch's own budget check) never deletes a blob
+    that is about to be linked. A manifest whose blobs were evicted counts as
+    a miss.
+    """
+
+    label = "Document store"
+
+    def __init__(self, store_dir: str = "doc_store", max_bytes: int = 10 * 1024**3,
+                 revalidate_seconds: float = 24 * 3600, timeout: float = 20):
+        self.store_dir = Path(store_dir)
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.timeout = timeout
+        for sub in ("blobs", "entries", "tmp"):
+            (self.store_dir / sub).mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._pins: Dict[str, int] = {}  # blob → fetches that still have to link it
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self.conversions = 0
+        self.evictions = 0
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    # ── Layout ───────────────────────────────────────────────────────────────
+
+    def _entry_path(self, url: str) -> Path:
+        key = _sha256(url.encode("utf-8"))
+        return self.store_dir / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.store_dir / "blobs" / blob[:2] / blob
+
+    def _scan(self):
+        for blob in (self.store_dir / "blobs").glob("*/*"):
+            try:
+                stat = blob.stat()
+            except FileNotFoundError:
+                continue
+            yield blob, stat.st_mtime, stat.st_size
+
+    def _read_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._entry_path(url).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]):
+        path = self._entry_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _pin(self, blob: str):
+        with self._lock:
+            self._pins[blob] = self._pins.get(blob, 0) + 1
+
+    def _unpin(self, blobs: List[str]):
+        with self._lock:
+            for blob in blobs:
+                self._pins[blob] -= 1
+                if not self._pins[blob]:
+                    del self._pins[blob]
+
+    def _claim(self, files: List[Dict[str, str]]) -> bool:
+        """Pin a manifest's blobs and mark them used; False (nothing pinned) if one was evicted."""
+        blobs = [file["blob"] for file in files]
+        for blob in blobs:
+            self._pin(blob)
+        try:
+            for blob in blobs:
+                os.utime(self._blob_path(blob))
+        except FileNotFoundError:
+            self._unpin(blobs)
+            return False
+        return True
+
+    # ── Fetch ────────────────────────────────────────────────────────────────
+
+    def fetch(self, url: str, doc_id: str, sanitize: Sanitizer, directory: str) -> List[str]:
+        """
+        Link the sanitized files of the ZIP at url into directory; returns their
+        paths. Downloads and converts only when the store has no valid copy.
+        Concurrent fetches of one URL wait for each other instead of
+        downloading twice.
+        """
+        files = self._fetch(url, doc_id, sanitize)
+        try:
+            paths = self._link(files, directory)
+            if self._total_bytes > self.max_bytes:
+                self.evict()  # still pinned: never the blobs this fetch just linked
+        finally:
+            self._unpin([file["blob"] for file in files])
+        return paths
+
+    def _fetch(self, url: str, doc_id: str, sanitize: Sanitizer) -> List[Dict[str, str]]:
+        """The ZIP's files as [{"name", "blob"}], with every blob pinned."""
+        with self._url_lock(url):
+            entry = self._read_entry(url)
+            # Evicted blobs make the entry unusable: refetch rather than revalidate
+            if entry and not self._claim(entry["files"]):
+                entry = None
+            if entry and time.time() - entry["checked_at"] < self.revalidate_seconds:
+                with self._lock:
+                    self.hits += 1
+                return entry["files"]
+
+            try:
+                headers = {}
+                if entry and entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry and entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+                response = requests.get(url, headers=headers, timeout=self.timeout)
+                if entry and response.status_code == 304:
+                    entry["checked_at"] = time.time()
+                    self._write_entry(url, entry)
+                    with self._lock:
+                        self.revalidated += 1
+                    return entry["files"]
+                response.raise_for_status()
+            except BaseException:
+                if entry:
+                    self._unpin([file["blob"] for file in entry["files"]])
+                raise
+            if entry:
+                self._unpin([file["blob"] for file in entry["files"]])
+            with self._lock:
+                self.downloads += 1
+
+            files, complete = self._ingest(response.content, sanitize)
+            if complete:
+                # An entry with a failed conversion isn't kept, so the next fetch retries it
+                self._write_entry(url, {
+                    "url": url, "doc_id": doc_id, "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "checked_at": time.time(), "files": files,
+                })
+            return files
+
+    def _ingest(self, zip_bytes: bytes, sanitize: Sanitizer):
+        """Extract, sanitize and store the members of one ZIP; returns (files, all members succeeded)."""
+        files = []
+        try:
+            complete = self._extract(zip_bytes, sanitize, files)
+        except BaseException:
+            self._unpin([file["blob"] for file in files])
+            raise
+        return files, complete
+
+    def _extract(self, zip_bytes: bytes, sanitize: Sanitizer, files: List[Dict[str, str]]) -> bool:
+        """Append the stored (pinned) members to files; False if a member failed to sanitize."""
+        complete = True
+        with tempfile.TemporaryDirectory(dir=self.store_dir / "tmp") as tmp:
+            zip_path = os.path.join(tmp, "download.zip")
+            with open(zip_path, "wb") as f:
+                f.write(zip_bytes)
+            extract_dir = os.path.join(tmp, "extracted")
+            with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                for member in zip_ref.namelist():
+                    if not (member.startswith("__MACOSX/") or member.endswith(".DS_Store")):
+                        zip_ref.extract(member, extract_dir)
+            for root, _, names in os.walk(extract_dir):
+                for name in names:
+                    src_path = os.path.join(root, name)
+                    clean_path = sanitize(src_path)
+                    if clean_path != src_path:
+                        with self._lock:
+                            self.conversions += 1
+                    if clean_path is None:
+                        complete = False
+                        continue
+                    files.append({"name": os.path.basename(clean_path), "blob": self._store_blob(clean_path)})
+        return complete
+
+    def _store_blob(self, path: str) -> str:
+        """Move a file into the blob store; the blob comes back pinned."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        blob = digest.hexdigest() + Path(path).suffix.lower()
+        blob_path = self._blob_path(blob)
+        self._pin(blob)  # before it exists, so no eviction can slip in between
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            new = not blob_path.exists()
+        os.replace(path, blob_path)  # same content when it already exists; also marks it used
+        if new:
+            with self._lock:
+                self._total_bytes += blob_path.stat().st_size
+        return blob
+
+    # ── Use ──────────────────────────────────────────────────────────────────
+
+    def _link(self, files: List[Dict[str, str]], directory: str) -> List[str]:
+        """Hardlink (else symlink, else copy) the files into directory under their names; returns the paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for file in files:
+            blob_path = self._blob_path(file["blob"])
+            dst = os.path.join(directory, file["name"])
+            if os.path.lexists(dst):
+                os.remove(dst)
+            try:
+                os.link(blob_path, dst)
+            except OSError:
+                try:
+                    os.symlink(blob_path.resolve(), dst)
+                except OSError:
+                    shutil.copyfile(blob_path, dst)
+            paths.append(dst)
+        return paths
+
+    def _remove(self, path: Path, size: int) -> bool:
+        """Delete an unpinned blob; False if it is pinned or already gone."""
+        with self._lock:
+            if path.name in self._pins:
+                return False
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                return False
+            self._total_bytes -= size
+            self.evictions += 1
+            return True
+
+    def evict(self):
+        """Drop least recently used unpinned blobs until under max_bytes."""
+        entries = sorted(self._scan(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path, size):
+                total -= size
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.downloads
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "downloads": self.downloads,
+                "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+                "conversions": self.conversions,
+                "evictions": self.evictions,
+                "size_mb": self._total_bytes / 1024**2,
+            }
+
+    def report(self, logger):
+        s = self.stats()
+        logger.info(
+            f"{self.label}: {s['hits']} fresh hits, {s['revalidated']} revalidated, "
+            f"{s['downloads']} downloads (hit rate {s['hit_rate']:.1%}), {s['conversions']} conversions, "
+            f"{s['evictions']} evictions, {s['size_mb']:.1f} MB on disk"
+        )
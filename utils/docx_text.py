@@ -0,0 +1,85 @@
+"""
+Lightweight .docx body-text extractor.
+
+Streams word/document.xml with an incremental XML parser instead of building
+the full Unstructured element tree. Paragraphs and tables are emitted in
+document order; tables are rendered one row per line with cells separated by
+spaces. Tracked changes are resolved to the "accept all" view that 3GPP tdocs
+are read in: inserted and moved-to text is kept, deleted and moved-from text
+is dropped.
+"""
+
+import io
+import zipfile
+from typing import IO, List, Union
+from xml.etree.ElementTree import iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_P, _T, _TAB, _BR, _CR = W + "p", W + "t", W + "tab", W + "br", W + "cr"
+_TBL, _TR, _TC = W + "tbl", W + "tr", W + "tc"
+# Revision containers whose text is not part of the accepted document
+_REJECTED = {W + "del", W + "moveFrom"}
+
+
+def _render_table(rows: List[List[List[str]]]) -> str:
+    lines = []
+    for row in rows:
+        cells = [" ".join(p for p in cell if p) for cell in row]
+        line = " ".join(c for c in cells if c)
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def extract_docx_text(source: Union[str, bytes, IO[bytes]]) -> str:
+    """Return the body text of a .docx given its path, bytes or a binary file object."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    blocks: List[str] = []
+    tables: List[List[List[List[str]]]] = []  # stack of tables -> rows -> cells -> paragraphs
+    runs: List[str] = []
+    rejected_depth = 0
+
+    with zipfile.ZipFile(source) as docx, docx.open("word/document.xml") as xml:
+        for event, elem in iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag in _REJECTED:
+                    rejected_depth += 1
+                elif tag == _TBL:
+                    tables.append([])
+                elif tag == _TR and tables:
+                    tables[-1].append([])
+                elif tag == _TC and tables and tables[-1]:
+                    tables[-1][-1].append([])
+                continue
+
+            if tag in _REJECTED:
+                rejected_depth -= 1
+            elif rejected_depth:
+                pass
+            elif tag == _T:
+                runs.append(elem.text or "")
+            elif tag == _TAB:
+                runs.append("\t")
+            elif tag in (_BR, _CR):
+                runs.append("\n")
+            elif tag == _P:
+                text = "".join(runs).strip()
+                runs = []
+                if tables and tables[-1] and tables[-1][-1]:
+                    tables[-1][-1][-1].append(text)
+                elif text:
+                    blocks.append(text)
+                elem.clear()
+            elif tag == _TBL:
+                text = _render_table(tables.pop())
+                if tables and tables[-1] and tables[-1][-1]:
+                    tables[-1][-1][-1].append(text)  # nested table inside a cell
+                elif text:
+                    blocks.append(text)
+                elem.clear()
+
+    return "\n\n".join(blocks)
@@ -0,0 +1,291 @@
+"""
+Local repair of LLM JSON output.
+
+repair_json fixes what reasoner output usually gets wrong, in a single pass
+over the text: code fences and chatter around the object, trailing commas,
+missing commas between members, single-quoted strings, unescaped quotes,
+raw newlines and invalid escapes inside strings, Python literals, and output
+truncated mid-object (open strings, arrays and objects are closed, a
+dangling key or comma is dropped). A quote only closes a string when a
+comma, colon, bracket, another quote or the end of the text follows it.
+
+coerce_to_schema then bends the parsed value into a pydantic model's shape:
+missing sections become empty lists, scalars are wrapped or stringified to
+match the field types, and items that still fail validation are dropped
+instead of failing the whole document. A result with no items in any section
+(a wrapper object, misnamed keys, truncated output) is_empty_extraction and
+counts as a failed parse, not as a document with nothing in it.
+
+FallbackStats counts which tier of Process_3GPP_Docs.safe_complete (structured
+output, plain reasoner JSON, local repair, formatter LLM) produced each result.
+"""
+
+import json
+import threading
+import typing
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_VALID_ESCAPES = set('"\\/bfnrtu')
+# What may follow a string's closing quote; any other quote is part of the text
+_AFTER_STRING = set(',:}]"\'')
+# Last character of a complete value: a string, number, literal or container
+_VALUE_END = set('"}]el') | set("0123456789")
+
+
+def _closes_string(text: str, i: int) -> bool:
+    """Whether the quote at text[i] ends the string: only if the next non-blank character allows it."""
+    j = i + 1
+    while j < len(text) and text[j].isspace():
+        j += 1
+    return j == len(text) or text[j] in _AFTER_STRING
+
+
+def _last_char(out: List[str]) -> str:
+    for chunk in reversed(out):
+        stripped = chunk.rstrip()
+        if stripped:
+            return stripped[-1]
+    return ""
+
+
+def _separate(out: List[str]):
+    """Insert the comma an LLM dropped between a completed value and the next key or value."""
+    if _last_char(out) in _VALUE_END:
+        out.append(",")
+
+
+def _scan(text: str) -> str:
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    quote = '"'
+    i, n = 0, len(text)
+
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if ch == "\\":
+                nxt = text[i + 1] if i + 1 < n else ""
+                if nxt in _VALID_ESCAPES and nxt:
+                    out.append(ch + nxt)
+                    i += 2
+                    continue
+                out.append("\\\\")  # lone backslash, e.g. a Windows path or LaTeX
+            elif ch == quote and _closes_string(text, i):
+                out.append('"')
+                in_string = False
+            elif ch == '"':
+                out.append('\\"')  # unescaped quote inside the text, or a double quote in a single-quoted string
+            elif ch == quote:
+                out.append(ch)  # apostrophe inside a single-quoted string
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\r":
+                out.append("\\r")
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            _separate(out)
+            in_string, quote = True, ch
+            out.append('"')
+        elif ch in "{[":
+            _separate(out)
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())  # also fixes mismatched closers
+        elif ch.isdigit() or (ch == "-" and i + 1 < n and text[i + 1].isdigit()):
+            _separate(out)
+            j = i + 1
+            while j < n and (text[j].isdigit() or text[j] in ".eE+-"):
+                j += 1
+            out.append(text[i:j])
+            i = j
+            continue
+        elif ch.isalpha() or ch == "_":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in "_-"):
+                j += 1
+            word = text[i:j]
+            word = _LITERALS.get(word, word)
+            _separate(out)
+            # Bare words other than JSON literals are unquoted keys or values
+            out.append(word if word in ("true", "false", "null") else json.dumps(word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Truncated output: close the open string, drop a dangling key/comma, close containers
+    if in_string:
+        out.append('"')
+    while stack:
+        _strip_dangling(out, stack[-1])
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _last_string_start(text: str) -> int:
+    """Index of the opening quote of the string that ends text (which ends with '"')."""
+    i = len(text) - 2
+    while i >= 0:
+        if text[i] == '"':
+            backslashes = 0
+            while i - 1 - backslashes >= 0 and text[i - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return -1
+
+
+def _strip_dangling(out: List[str], closer: str):
+    text = "".join(out).rstrip()
+    # `"key":` with no value
+    if text.endswith(":"):
+        text = text[:-1].rstrip()
+        if text.endswith('"'):
+            start = _last_string_start(text)
+            text = text[:start].rstrip() if start != -1 else text
+    # `{"key"` or `, "key"`: a key cut off before its colon
+    elif closer == "}" and text.endswith('"'):
+        start = _last_string_start(text)
+        if start != -1 and text[:start].rstrip()[-1:] in ("{", ","):
+            text = text[:start].rstrip()
+    if text.endswith(","):
+        text = text[:-1].rstrip()
+    out[:] = [text]
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Best-effort parse of malformed JSON; returns None if it still can't be parsed."""
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+    try:
+        return json.loads(_scan(text[start:]))
+    except json.JSONDecodeError:
+        pass
+
+    # Chatter after the object: cut at the last closing brace and retry
+    end = text.rfind("}")
+    if end > start:
+        try:
+            return json.loads(_scan(text[start:end + 1]))
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+    origin = typing.get_origin(annotation)
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+
+    if origin is typing.Union:
+        return _coerce_value(value, args[0]) if len(args) == 1 and value is not None else value
+    if origin in (list, List):
+        if value is None:
+            return []
+        items = value if isinstance(value, list) else [value]
+        return [_coerce_value(item, args[0]) if args else item for item in items]
+    if annotation is str and isinstance(value, (int, float)):
+        return str(value)
+    if annotation is str and isinstance(value, list):
+        return ", ".join(str(v) for v in value if v is not None)
+    if annotation is int and isinstance(value, str):
+        digits = "".join(c for c in value if c.isdigit())
+        return int(digits) if digits else None
+    return value
+
+
+def _coerce_item(item: Any, model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    if not isinstance(item, dict):
+        return None
+    fixed = {}
+    for name, field in model.model_fields.items():
+        value = item.get(name)
+        if value is None and not field.is_required():
+            fixed[name] = field.get_default(call_default_factory=True)
+            continue
+        fixed[name] = _coerce_value(value, field.annotation)
+    try:
+        return model.model_validate(fixed).model_dump()
+    except ValidationError:
+        return None
+
+
+def coerce_to_schema(obj: Any, model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """Fit a parsed value to a top-level model whose fields are lists of sub-models."""
+    if isinstance(obj, list) and len(obj) == 1:
+        obj = obj[0]
+    if not isinstance(obj, dict):
+        return None
+
+    result: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        args = typing.get_args(field.annotation)
+        item_model = args[0] if args and isinstance(args[0], type) and issubclass(args[0], BaseModel) else None
+        value = obj.get(name)
+        if item_model is None:
+            result[name] = value
+            continue
+        items = value if isinstance(value, list) else ([value] if isinstance(value, dict) else [])
+        result[name] = [c for c in (_coerce_item(item, item_model) for item in items) if c is not None]
+    return result
+
+
+def is_empty_extraction(data: Optional[Dict[str, Any]]) -> bool:
+    """True when no section of an extraction holds any item."""
+    return not data or not any(isinstance(value, list) and value for value in data.values())
+
+
+class FallbackStats:
+    """Counts how often each extraction fallback tier produced the result, and how long those calls took."""
+
+    TIERS = ("structured", "reasoner_json", "local_repair", "formatter_llm", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {tier: 0 for tier in self.TIERS}
+        self.seconds: Dict[str, float] = {tier: 0.0 for tier in self.TIERS}
+
+    def record(self, tier: str, seconds: float):
+        with self._lock:
+            self.counts[tier] = self.counts.get(tier, 0) + 1
+            self.seconds[tier] = self.seconds.get(tier, 0.0) + seconds
+
+    def report(self, logger):
+        with self._lock:
+            total = sum(self.counts.values())
+            if not total:
+                return
+            parts = [
+                f"{tier}={count} ({count / total:.1%}, avg {self.seconds[tier] / count:.1f}s)"
+                for tier, count in self.counts.items() if count
+            ]
+            logger.info(f"Extraction fallback tiers over {total} LLM calls in this process: {', '.join(parts)}")
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"  # over the token limit; retried when the ledger is opened with retry_skipped
+
+
+class IngestionLedger:
+    """
+    Document-level record of what Process_3GPP_Docs has already ingested.
+
+    Backed by SQLite in WAL mode, one row per (zip, member) with status, token
+    count, duration and output path. Every update is a single-row upsert, so a
+    10k-document run does O(N) small writes instead of rewriting a JSON list
+    per ZIP. Statuses are mirrored in memory for O(1) "already done" checks,
+    and one connection guarded by a lock makes it safe for concurrent threads;
+    the busy timeout covers other processes writing the same file.
+    """
+
+    def __init__(self, db_path: str = "ingestion_ledger.db", legacy_json_path: Optional[str] = None,
+                 retry_skipped: bool = False):
+        self.db_path = db_path
+        # A ZIP is finished once none of its documents needs another attempt
+        self._final_statuses = {DONE} if retry_skipped else {DONE, SKIPPED}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                zip_path    TEXT NOT NULL,
+                member      TEXT NOT NULL,
+                status      TEXT NOT NULL,
+                token_count INTEGER,
+                duration    REAL,
+                output_path TEXT,
+                error       TEXT,
+                updated_at  REAL NOT NULL,
+                PRIMARY KEY (zip_path, member)
+            );
+            CREATE TABLE IF NOT EXISTS zips (
+                zip_path   TEXT PRIMARY KEY,
+                status     TEXT NOT NULL,
+                doc_count  INTEGER,
+                updated_at REAL NOT NULL
+            );
+        """)
+        # zip_path -> {member: status}
+        self._doc_status: Dict[str, Dict[str, str]] = {}
+        for zip_path, member, status in self._conn.execute("SELECT zip_path, member, status FROM documents"):
+            self._doc_status.setdefault(zip_path, {})[member] = status
+        self._zip_status: Dict[str, str] = dict(self._conn.execute("SELECT zip_path, status FROM zips"))
+
+        if legacy_json_path and not self._zip_status and os.path.exists(legacy_json_path):
+            self._import_legacy(legacy_json_path)
+
+    @staticmethod
+    def _key(zip_path) -> str:
+        return str(Path(zip_path).resolve())
+
+    def _import_legacy(self, legacy_json_path: str):
+        """Seed the ledger from the old processed_files.json (ZIP-level entries only)."""
+        with open(legacy_json_path, "r") as f:
+            legacy = json.load(f)
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO zips (zip_path, status, doc_count, updated_at) VALUES (?, ?, NULL, ?)",
+                [(zip_path, DONE, now) for zip_path in legacy],
+            )
+            for zip_path in legacy:
+                self._zip_status[zip_path] = DONE
+
+    def is_zip_done(self, zip_path) -> bool:
+        key = self._key(zip_path)
+        if self._zip_status.get(key) != DONE:
+            return False
+        # ZIPs finished with skipped documents reopen once skipped documents are retried
+        return all(status in self._final_statuses for status in self._doc_status.get(key, {}).values())
+
+    def is_done(self, zip_path, member: str) -> bool:
+        return self._doc_status.get(self._key(zip_path), {}).get(member) in self._final_statuses
+
+    def done_members(self, zip_path) -> Set[str]:
+        statuses = self._doc_status.get(self._key(zip_path), {})
+        return {member for member, status in list(statuses.items()) if status in self._final_statuses}
+
+    def record(self, zip_path, member: str, status: str, token_count: Optional[int] = None,
+               duration: Optional[float] = None, output_path: Optional[Path] = None, error: Optional[str] = None):
+        key = self._key(zip_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(zip_path, member, status, token_count, duration, output_path, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, member, status, token_count, duration,
+                 str(output_path) if output_path else None, error, time.time()),
+            )
+            self._doc_status.setdefault(key, {})[member] = status
+
+    def finish_zip(self, zip_path, members: Iterable[str]) -> bool:
+        """Mark the ZIP done if every member is done or skipped; returns whether it was."""
+        key = self._key(zip_path)
+        members = list(members)
+        statuses = self._doc_status.get(key, {})
+        complete = all(statuses.get(m) in self._final_statuses for m in members)
+        status = DONE if complete else FAILED
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO zips (zip_path, status, doc_count, updated_at) VALUES (?, ?, ?, ?)",
+                (key, status, len(members), time.time()),
+            )
+            self._zip_status[key] = status
+        return complete
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM documents GROUP BY status"))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(text: str, schema: Dict[str, Any], model_name: str) -> str:
+    """Content address for an LLM extraction: document text + output schema + model."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(schema, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent on-disk cache of extraction results, one JSON file per key.
+
+    Entries are sharded by the first two hex chars of the key. The file mtime
+    doubles as the last-access time, so eviction is LRU by size and hard
+    expiry by age. Subclasses change the on-disk format by overriding
+    suffix, _read and _write.
+    """
+
+    suffix = ".json"
+    label = "LLM cache"
+
+    def __init__(self, cache_dir: str = "llm_cache", max_bytes: int = 2 * 1024**3,
+                 max_age_days: Optional[float] = 90):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _read(self, path: Path) -> Any:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, path: Path, value: Any):
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(value, f)
+
+    def _scan(self):
+        for entry in self.cache_dir.glob(f"*/*{self.suffix}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            yield entry, stat.st_mtime, stat.st_size
+
+    def _expired(self, mtime: float) -> bool:
+        return self.max_age_seconds is not None and time.time() - mtime > self.max_age_seconds
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self._expired(stat.st_mtime):
+                self._remove(path, stat.st_size)
+                raise FileNotFoundError(path)
+            value = self._read(path)
+            os.utime(path)  # mark as recently used
+        except (OSError, EOFError, ValueError):  # missing, or a corrupt/partial entry
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        self._write(tmp_path, value)
+        new_size = tmp_path.stat().st_size
+        with self._lock:
+            # Overwriting an entry only adds the difference; the lock keeps concurrent writers of a key consistent
+            try:
+                old_size = path.stat().st_size
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)  # atomic, so concurrent readers never see partial JSON
+            self.writes += 1
+            self._total_bytes += new_size - old_size
+            over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _remove(self, path: Path, size: int):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        entries = sorted(self._scan(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, mtime, size in entries:
+            if self._expired(mtime) or total > self.max_bytes:
+                self._remove(path, size)
+                total -= size
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "size_mb": self._total_bytes / 1024**2,
+            }
+
+    def report(self, logger):
+        s = self.stats()
+        logger.info(
+            f"{self.label}: {s['hits']} hits, {s['misses']} misses "
+            f"(hit rate {s['hit_rate']:.1%}), {s['writes']} writes, "
+            f"{s['evictions']} evictions, {s['size_mb']:.1f} MB on disk"
+        )
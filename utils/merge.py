@@ -0,0 +1,84 @@
+"""
+Merge DataModel extractions of several chunks of the same document.
+
+Each section of the DataModel is deduplicated on its natural key (the same
+keys generate_csv.py aggregates on), compared case- and whitespace-
+insensitively. The first chunk's values win, later chunks only fill in
+empty fields and extend list fields. Mention frequencies are summed because
+every chunk counts only its own part of the text; document summaries are
+concatenated so the merged summary covers the whole document.
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+LIST_FIELDS = {"aliases", "tags", "keywords", "agenda_id", "working_groups"}
+
+
+def _norm(value) -> str:
+    return " ".join(str(value).split()).lower() if value is not None else ""
+
+
+def _merge_list(existing: List, new: List) -> List:
+    seen = {_norm(v) for v in existing}
+    merged = list(existing)
+    for v in new or []:
+        if _norm(v) not in seen:
+            seen.add(_norm(v))
+            merged.append(v)
+    return merged
+
+
+def _merge_record(base: Dict[str, Any], new: Dict[str, Any]):
+    for field, value in new.items():
+        if field in LIST_FIELDS or isinstance(value, list):
+            base[field] = _merge_list(base.get(field) or [], value)
+        elif base.get(field) in (None, "") and value not in (None, ""):
+            base[field] = value
+
+
+def _merge_documents(base: Dict[str, Any], new: Dict[str, Any]):
+    summaries = [base.get("summary"), new.get("summary")]
+    _merge_record(base, new)
+    distinct = _merge_list([], [s for s in summaries if s])
+    if distinct:
+        base["summary"] = "\n\n".join(distinct)
+
+
+def _merge_mentions(base: Dict[str, Any], new: Dict[str, Any]):
+    total = (base.get("frequency") or 0) + (new.get("frequency") or 0)
+    _merge_record(base, new)
+    base["frequency"] = total or base.get("frequency")
+
+
+# section -> (key function, merge function)
+SECTIONS: Dict[str, Tuple[Callable[[Dict], Tuple], Callable[[Dict, Dict], None]]] = {
+    "authors":             (lambda r: (_norm(r.get("name")),), _merge_record),
+    "documents":           (lambda r: (_norm(r.get("doc_id")),), _merge_documents),
+    "technology_entities": (lambda r: (_norm(r.get("canonical_name")),), _merge_record),
+    "working_groups":      (lambda r: (_norm(r.get("id")),), _merge_record),
+    "meetings":            (lambda r: (_norm(r.get("meeting_id")),), _merge_record),
+    "agendas":             (lambda r: (_norm(r.get("agenda_id")), _norm(r.get("meeting_id"))), _merge_record),
+    "mentions":            (lambda r: (_norm(r.get("doc_id")), _norm(r.get("entity_name"))), _merge_mentions),
+    "authored":            (lambda r: (_norm(r.get("doc_id")), _norm(r.get("contributor_name"))), _merge_record),
+    "belongs_to":          (lambda r: (_norm(r.get("doc_id")), _norm(r.get("wg_name"))), _merge_record),
+    "references":          (lambda r: (_norm(r.get("cited_doc_id")),), _merge_record),
+    "appears_in":          (lambda r: (_norm(r.get("agenda_id")), _norm(r.get("doc_id"))), _merge_record),
+}
+
+
+def merge_extractions(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-chunk extraction dicts (in chunk order) into one DataModel-shaped dict."""
+    merged: Dict[str, Any] = {}
+    for section, (key_fn, merge_fn) in SECTIONS.items():
+        by_key: Dict[Tuple, Dict[str, Any]] = {}
+        for partial in partials:
+            for record in partial.get(section) or []:
+                if not isinstance(record, dict):
+                    continue
+                key = key_fn(record)
+                if key in by_key:
+                    merge_fn(by_key[key], record)
+                else:
+                    by_key[key] = dict(record)
+        merged[section] = list(by_key.values())
+    return merged
@@ -0,0 +1,109 @@
+"""
+Canonical keys for the free-text release, meeting and document type values
+the LLM extracts.
+
+    release_num("Rel-18/Rel-19")            -> "19"
+    meeting_key("3GPP TSG RAN WG1 #118bis") -> "RAN1_118b"
+    doc_class("Draft CR")                   -> "change_request"
+
+Each function returns "" for a value it can't map. generate_csv.py writes the
+keys next to the raw values (documents.csv, meetings.csv, agendas.csv) and
+reports what stayed unmapped; the search apps normalize the user's meeting
+input with the same meeting_key, so a filter is an exact match on an indexed
+property. Stdlib only: generate_csv.py and the apps import it without the
+extraction dependencies.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+# ── Release ──────────────────────────────────────────────────────────────────
+# "Rel-18", "Release 19", "R19", "Rel. 19", "3GPP Release 18+", and lists such
+# as "Rel-18/19" or "Release 18 and 19" (the latest release is the key: that is
+# the release the work targets). "Pre-Rel-18" / "Post-Rel-18" span several
+# releases and are ignored; "NR", "5G-Advanced", dates etc. stay unmapped.
+
+_RELEASE_RUN = re.compile(
+    r"(?:\bREL(?:EASE)?|\bR)[\s.\-]*(\d{1,2})\b"
+    r"((?:\s*(?:/|,|&|\bAND\b|\bOR\b)\s*(?:REL(?:EASE)?[\s.\-]*)?\d{1,2}\b)*)"
+)
+_RELEASE_SPAN = re.compile(r"\b(?:PRE|POST)[\s\-]*REL(?:EASE)?[\s.\-]*\d{1,2}\b")
+_MIN_RELEASE, _MAX_RELEASE = 4, 30
+
+
+@lru_cache(maxsize=None)
+def release_num(value: str) -> str:
+    text = _RELEASE_SPAN.sub(" ", (value or "").upper())
+    if text.strip().isdigit():
+        numbers = [int(text.strip())]
+    else:
+        numbers = [int(n) for first, rest in _RELEASE_RUN.findall(text) for n in [first] + re.findall(r"\d+", rest)]
+    numbers = [n for n in numbers if _MIN_RELEASE <= n <= _MAX_RELEASE]
+    return str(max(numbers)) if numbers else ""
+
+
+# ── Meeting ──────────────────────────────────────────────────────────────────
+# "RAN WG1 #118bis", "3GPP TSG RAN WG1 #118bis", "RAN1#118bis", "RAN1_118b",
+# "TSGR1_118b", "CT WG4 Meeting #124", "TSG RAN #104" all become
+# <group><wg>_<number><suffix>, the form of the 3GPP FTP meeting folders:
+# RAN1_118b, CT4_124, RAN_104. bis → b, ter → t, e-meetings (#104-e) → e. A
+# WG digit is only taken when no digit follows, so plenary keys (RAN_104,
+# SA_100) map to themselves: meeting_key(meeting_key(x)) == meeting_key(x).
+
+_MEETING = re.compile(
+    r"\b(?:TSG[\s_\-]*)?(RAN|SA|CT)[\s_\-]*(?:WG[\s_\-]*)?(\d(?!\d))?\s*(?:MEETING\s*)?[#_\s\-]*(\d{2,3})"
+    r"(?:[\s_\-]*(BIS|TER|B|T|E)\b)?"
+)
+_MEETING_FOLDER = re.compile(r"\bTSG([RSC])(\d)?_(\d{2,3})(BIS|TER|B|T|E)?\b")
+_GROUPS = {"R": "RAN", "S": "SA", "C": "CT"}
+_SUFFIXES = {"BIS": "b", "B": "b", "TER": "t", "T": "t", "E": "e"}
+
+
+@lru_cache(maxsize=None)
+def meeting_key(value: str) -> str:
+    text = (value or "").upper()
+    m = _MEETING.search(text)
+    if m:
+        group, wg, number, suffix = m.groups()
+    else:
+        m = _MEETING_FOLDER.search(text)
+        if not m:
+            return ""
+        letter, wg, number, suffix = m.groups()
+        group = _GROUPS[letter]
+    return f"{group}{wg or ''}_{int(number)}{_SUFFIXES.get(suffix, '')}"
+
+
+# ── Document type ────────────────────────────────────────────────────────────
+# First matching rule wins, so the specific classes come before the generic ones
+
+_DOC_CLASSES: List[Tuple[str, re.Pattern]] = [
+    ("feature_lead_summary", re.compile(r"feature lead|\bfl\b|moderator")),
+    ("change_request", re.compile(r"\bp?crs?\b|change request")),
+    ("liaison", re.compile(r"\bls\b|liaison")),
+    ("way_forward", re.compile(r"way forward|\bwf\b")),
+    ("text_proposal", re.compile(r"\btps?\b|text proposal")),
+    ("work_item", re.compile(r"\bwid\b|work item")),
+    ("study_item", re.compile(r"\bsid\b|study item")),
+    ("technical_specification", re.compile(r"technical specification|\bts\b")),
+    ("technical_report", re.compile(r"technical report|\btr\b")),
+    ("report", re.compile(r"report|minutes|notes")),
+    ("agenda", re.compile(r"agenda")),
+    ("summary", re.compile(r"summary")),
+    ("discussion", re.compile(r"discussion|decision|approval|agreement|endorsement|information|contribution|proposal")),
+]
+
+
+@lru_cache(maxsize=None)
+def doc_class(value: str) -> str:
+    text = (value or "").lower()
+    return next((name for name, pattern in _DOC_CLASSES if pattern.search(text)), "")
+
+
+# raw column → normalizer
+NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "release": release_num,
+    "meeting_id": meeting_key,
+    "type": doc_class,
+}
@@ -0,0 +1,148 @@
+import time
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a StagedPipeline.
+
+    `func` takes one item from the stage's input queue and returns an iterable
+    of items for the next stage (or None). Each stage runs `workers` threads;
+    CPU-bound stages should hand the work to a process pool from inside `func`.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Optional[Iterable[Any]]], workers: int = 1,
+                 queue_size: int = 100):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.input = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self._lock = threading.Lock()
+        self._running = workers
+
+    def sample_depth(self):
+        depth = self.input.qsize()
+        with self._lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.depth_max = max(self.depth_max, depth)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "processed": self.processed,
+                "errors": self.errors,
+                "queue_depth": self.input.qsize(),
+                "queue_capacity": self.input.maxsize,
+                "avg_depth": self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+                "max_depth": self.depth_max,
+                "busy_seconds": self.busy_seconds,
+            }
+
+
+class StagedPipeline:
+    """
+    Chain of stages connected by bounded queues.
+
+    Bounded queues give back-pressure: a slow stage fills its input queue and
+    the stages before it block instead of piling up work in memory. A monitor
+    thread samples every queue's depth; the stage whose input queue sits near
+    capacity is the bottleneck.
+    """
+
+    def __init__(self, stages: List[Stage], logger, sample_interval: float = 1.0, log_interval: float = 60.0):
+        self.stages = stages
+        self.logger = logger
+        self.sample_interval = sample_interval
+        self.log_interval = log_interval
+        self._finished = threading.Event()
+
+    def _worker(self, index: int):
+        stage = self.stages[index]
+        output = self.stages[index + 1].input if index + 1 < len(self.stages) else None
+
+        while True:
+            item = stage.input.get()
+            if item is _DONE:
+                with stage._lock:
+                    stage._running -= 1
+                    last = stage._running == 0
+                if last:
+                    if output is not None:
+                        output.put(_DONE)
+                else:
+                    stage.input.put(_DONE)  # let sibling workers see it too
+                return
+
+            start = time.monotonic()
+            try:
+                results = list(stage.func(item) or ())
+            except Exception as e:
+                with stage._lock:
+                    stage.errors += 1
+                    stage.busy_seconds += time.monotonic() - start
+                self.logger.error(f"Stage '{stage.name}' failed on {item!r:.200}: {e}", exc_info=True)
+                continue
+            with stage._lock:
+                stage.processed += 1
+                stage.busy_seconds += time.monotonic() - start
+
+            # Time blocked on a full downstream queue is back-pressure, not work
+            if output is not None:
+                for result in results:
+                    output.put(result)
+
+    def _monitor(self):
+        last_log = time.monotonic()
+        while not self._finished.wait(self.sample_interval):
+            for stage in self.stages:
+                stage.sample_depth()
+            if time.monotonic() - last_log >= self.log_interval:
+                last_log = time.monotonic()
+                self.logger.info("Pipeline queues: " + ", ".join(
+                    f"{s.name}={s.input.qsize()}/{s.input.maxsize}" for s in self.stages
+                ))
+
+    def run(self, source: Iterable[Any]):
+        threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+            for i, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        monitor = threading.Thread(target=self._monitor, name="pipeline-monitor", daemon=True)
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        monitor.start()
+
+        for item in source:
+            self.stages[0].input.put(item)
+        self.stages[0].input.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        self._finished.set()
+        monitor.join()
+        self.report(time.monotonic() - start)
+
+    def report(self, elapsed: float):
+        self.logger.info(f"Pipeline finished in {elapsed:.1f}s")
+        for s in (stage.stats() for stage in self.stages):
+            utilisation = s["busy_seconds"] / (elapsed * s["workers"]) if elapsed else 0.0
+            self.logger.info(
+                f"  {s['stage']:<12} workers={s['workers']:<3} processed={s['processed']:<6} "
+                f"errors={s['errors']:<4} avg_queue={s['avg_depth']:.1f}/{s['queue_capacity']} "
+                f"max_queue={s['max_depth']} busy={utilisation:.0%}"
+            )
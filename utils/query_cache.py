@@ -0,0 +1,102 @@
+"""
+In-process LRU + TTL cache for search results and generated answers.
+
+beta_testing/app.py keeps two kinds of entry per (query, meeting):
+"docs" (the ranked document rows) and "answer" (the generated response).
+Keys are normalized: case, whitespace and trailing punctuation of the query
+don't matter, and the meeting filter is reduced to its meeting_key, so
+"RAN1#118bis" and "RAN WG1 #118bis" share entries.
+
+Entries expire after ttl seconds and the least recently used one is evicted
+beyond max_entries. Everything is dropped when the graph version changes
+(set_version), so a new import never serves stale rankings. stats() gives
+hits, misses and hit rate per kind, to size the cache.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from utils.normalize import meeting_key
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").split()).casefold().rstrip("?!. ")
+
+
+def normalize_meeting(meeting: Optional[str]) -> str:
+    meeting = (meeting or "").strip()
+    return meeting_key(meeting) or meeting.casefold()
+
+
+class QueryCache:
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version: Hashable = None
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._invalidations = 0
+
+    def key(self, kind: str, query: str, meeting: Optional[str]) -> Tuple[str, str, str]:
+        return kind, normalize_query(query), normalize_meeting(meeting)
+
+    def _count(self, kind: str, outcome: str) -> None:
+        counts = self._counts.setdefault(kind, {"hits": 0, "misses": 0, "expired": 0, "evictions": 0})
+        counts[outcome] += 1
+
+    def set_version(self, version: Hashable) -> bool:
+        """Record the graph version; clears the cache and returns True if it changed."""
+        with self._lock:
+            if version == self.version:
+                return False
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self.version = version
+            return True
+
+    def get(self, kind: str, query: str, meeting: Optional[str] = None) -> Any:
+        """The cached value, or None on a miss."""
+        key = self.key(kind, query, meeting)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(kind, "misses")
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._count(kind, "expired")
+                self._count(kind, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(kind, "hits")
+            return value
+
+    def put(self, kind: str, query: str, meeting: Optional[str], value: Any) -> None:
+        key = self.key(kind, query, meeting)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {}
+            for kind, counts in self._counts.items():
+                lookups = counts["hits"] + counts["misses"]
+                kinds[kind] = {**counts, "hit_rate": counts["hits"] / lookups if lookups else 0.0}
+            return {
+                "entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                "version": self.version, "invalidations": self._invalidations, "kinds": kinds,
+            }
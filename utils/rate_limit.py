@@ -0,0 +1,132 @@
+import time
+import asyncio
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 / rate-limit errors raised by the OpenAI-compatible clients."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket for an asyncio event loop.
+
+    `rate_per_minute` units are added evenly over each minute, up to `capacity`.
+    A request larger than the capacity waits for a full bucket and drains it,
+    so oversized documents are slowed down rather than blocked forever.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        # The lock makes waiters queue in FIFO order instead of racing for refills.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateBudget:
+    """Requests/min and tokens/min budgets that must both allow a call before it is sent."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, token_count: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(token_count)
+
+
+class AIMDController:
+    """
+    Adaptive concurrency limit (additive increase, multiplicative decrease).
+
+    Every successful call grows the limit by roughly `increase` per window of
+    `limit` calls. A 429, or a latency well above the best observed so far,
+    multiplies the limit by `decrease`; at most once per cooldown so a burst of
+    errors from the same window only counts once.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_tolerance: float = 2.0, cooldown: float = 10.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._latency_ewma = None
+        self._latency_floor = None
+        self._last_decrease = 0.0
+        self.rate_limited = 0
+        self.slowdowns = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency: float = None, token_count: int = 0, rate_limited: bool = False):
+        async with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self._back_off()
+            elif latency is not None:
+                self._observe_latency(latency, token_count)
+            self._condition.notify_all()
+
+    def _observe_latency(self, latency: float, token_count: int):
+        # Normalise by input size so a single huge document doesn't look like congestion
+        per_unit = latency / (1 + token_count / 1000)
+        alpha = 0.2
+        self._latency_ewma = per_unit if self._latency_ewma is None else (
+            alpha * per_unit + (1 - alpha) * self._latency_ewma
+        )
+        if self._latency_floor is None or self._latency_ewma < self._latency_floor:
+            self._latency_floor = self._latency_ewma
+
+        if self._latency_ewma > self._latency_floor * self.latency_tolerance:
+            self.slowdowns += 1
+            self._back_off()
+        else:
+            self._limit = min(self.max_limit, self._limit + self.increase / max(self._limit, 1.0))
+
+    def _back_off(self):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.decrease)
+        # Let the floor drift up so a permanently slower provider doesn't pin us at min_limit
+        if self._latency_floor is not None and self._latency_ewma is not None:
+            self._latency_floor = (self._latency_floor + self._latency_ewma) / 2
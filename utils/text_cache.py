@@ -0,0 +1,45 @@
+"""
+Persistent cache of text extracted from Word documents.
+
+Keyed on a fingerprint of the full file content (plus the extractor that
+produced the text), so a re-run that only changes tokenization, chunking or
+the extraction prompt never parses the same .doc/.docx twice. Entries are
+gzip-compressed JSON holding the plain text and its token count, laid out
+and evicted like LLMResponseCache.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.llm_cache import LLMResponseCache
+
+
+class ExtractedTextCache(LLMResponseCache):
+
+    suffix = ".txt.gz"
+    label = "Extracted-text cache"
+
+    def __init__(self, cache_dir: str = "text_cache", max_bytes: int = 5 * 1024**3,
+                 max_age_days: Optional[float] = None):
+        super().__init__(cache_dir, max_bytes=max_bytes, max_age_days=max_age_days)
+
+    def _read(self, path: Path) -> Dict[str, Any]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, path: Path, value: Dict[str, Any]):
+        # Level 6 is ~3x faster to write than 9 and within a few percent of its size on prose
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(value, f)
+
+    def get_text(self, key: str) -> Optional[Tuple[str, int]]:
+        """Return (text, token_count) for a fingerprint, or None on a miss."""
+        value = self.get(key)
+        if value is None:
+            return None
+        return value["text"], value["token_count"]
+
+    def put_text(self, key: str, text: str, token_count: int):
+        self.put(key, {"text": text, "token_count": token_count})
@@ -3,7 +3,6 @@ import sys
 import hashlib
 import logging
 from logging.handlers import RotatingFileHandler
-from pathlib import Path
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 def setup_logging():
@@ -39,33 +38,37 @@ def split_document_text(text: str, chunk_size: int = 1000, chunk_overlap: int =
     )
     return splitter.split_text(text)
 
-def generate_cache_file_name(file_path: str, cache_dir: str = "cache") -> str:
-    """Generates a cache file name based on the first and last 4096 bytes of the file."""
-    
-    # Check if file is too small to process
-    if os.path.getsize(file_path) < 4096:
-        error_exit(f"File {file_path} too small to process.")
-
-    # Read the first and last 4096 bytes
-    with open(file_path, "rb") as f:
-        first_block = f.read(4096)
-        f.seek(-4096, os.SEEK_END)
-        last_block = f.read(4096)
+def split_document_by_tokens(text: str, chunk_tokens: int = 32000, overlap_tokens: int = 500,
+                             encoding_name: str = "cl100k_base") -> list[str]:
+    """Split document text into chunks of at most chunk_tokens tiktoken tokens, with overlap."""
+    splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=encoding_name,
+        chunk_size=chunk_tokens,
+        chunk_overlap=overlap_tokens,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return splitter.split_text(text)
 
-    # Generate MD5 hashes for the first and last blocks
-    first_md5_hash = hashlib.md5(first_block).hexdigest()
-    last_md5_hash = hashlib.md5(last_block).hexdigest()
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
 
-    # Ensure the cache directory exists
-    os.makedirs(cache_dir, exist_ok=True)
+def _fingerprint_digest(salt: str):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(salt.encode("utf-8") + b"\0")
+    return digest
 
-    # Return the full path to the cache file
-    return os.path.join(cache_dir, f"{first_md5_hash}_{last_md5_hash}.txt")
+def fingerprint_bytes(data: bytes, salt: str = "") -> str:
+    """Fingerprint of the full content (BLAKE2b, faster than MD5/SHA-256 on 64-bit CPUs)."""
+    digest = _fingerprint_digest(salt)
+    digest.update(data)
+    return digest.hexdigest()
 
-def is_file_cached(file_path: str, cache_dir: str = "cache") -> bool:
-    """Checks if a file is already cached."""
-    cache_file_name = generate_cache_file_name(file_path, cache_dir)
-    return Path(cache_file_name).is_file()
+def fingerprint_file(file_path: str, salt: str = "") -> str:
+    """Same fingerprint as fingerprint_bytes, streamed from disk in 1 MB blocks."""
+    digest = _fingerprint_digest(salt)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 def show_usage_and_exit():
     error_exit("Please pass name of directory or file to process.")